@@ -1,5 +1,8 @@
 -- Georgian Budget Sub-Departments Database Schema
 
+-- Trigram matching, so ILIKE '%name%' filters can use GIN indexes
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Create departments table (matches main GitHub data)
 CREATE TABLE departments (
     id SERIAL PRIMARY KEY,
@@ -39,6 +42,12 @@ CREATE INDEX idx_sub_departments_dept_id ON sub_departments(department_id);
 CREATE INDEX idx_sub_department_budgets_year ON sub_department_budgets(year);
 CREATE INDEX idx_sub_department_budgets_sub_dept_id ON sub_department_budgets(sub_department_id);
 
+-- Trigram indexes for substring name search (a leading wildcard cannot use B-tree)
+CREATE INDEX IF NOT EXISTS idx_departments_name_english_trgm ON departments USING GIN (name_english gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_departments_name_georgian_trgm ON departments USING GIN (name_georgian gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_sub_departments_name_english_trgm ON sub_departments USING GIN (name_english gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_sub_departments_name_georgian_trgm ON sub_departments USING GIN (name_georgian gin_trgm_ops);
+
 -- Create a view for easy drill-down queries
 CREATE VIEW budget_drill_down AS
 SELECT
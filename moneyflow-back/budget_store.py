@@ -0,0 +1,1004 @@
+"""
+Columnar in-memory store for the Georgian budget dataset
+"""
+
+import hashlib
+import json
+import logging
+import struct
+import threading
+import zipfile
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from name_index import NgramIndex
+
+logger = logging.getLogger(__name__)
+
+# Layout of the columnar binary artifact written by the data pipeline
+NPZ_FORMAT_VERSION = 1
+NPZ_COLUMNS = ("year", "budget", "department_id", "department_name")
+
+
+def _group_rows(keys: np.ndarray) -> Dict[int, np.ndarray]:
+    """Build a hash index mapping each key to its row ids, in dataset order"""
+    order = np.argsort(keys, kind="stable")
+    unique_keys, starts = np.unique(keys[order], return_index=True)
+
+    index = {}
+    for key, rows in zip(unique_keys.tolist(), np.split(order, starts[1:])):
+        rows.setflags(write=False)
+        index[key] = rows
+    return index
+
+
+def _department_year_keys(department_ids, years) -> np.ndarray:
+    """Pack (department id, year) pairs into sortable int64 keys"""
+    department_ids = np.asarray(department_ids, dtype=np.int64)
+    years = np.asarray(years, dtype=np.int64)
+    return (department_ids << 32) | (years & 0xFFFFFFFF)
+
+
+def _mmap_npz(path: str) -> Dict[str, np.ndarray]:
+    """
+    Memory-map every array of an uncompressed ``.npz`` archive
+
+    ``np.load`` ignores ``mmap_mode`` for archives, but members written with
+    ``np.savez`` are stored uncompressed, so each ``.npy`` payload can be mapped
+    directly at its offset inside the zip file.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"Cannot memory-map compressed member {info.filename}")
+
+            # Skip the zip local file header to reach the .npy payload
+            f.seek(info.header_offset)
+            local_header = f.read(30)
+            name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            name = info.filename[: -len(".npy")]
+            if dtype.hasobject or not np.prod(shape):
+                arrays[name] = np.load(archive.open(info), allow_pickle=False)
+            else:
+                arrays[name] = np.memmap(
+                    path,
+                    dtype=dtype,
+                    mode="r",
+                    offset=f.tell(),
+                    shape=shape,
+                    order="F" if fortran_order else "C",
+                )
+    return arrays
+
+
+def _parse_year(value) -> int:
+    """Coerce a raw year value (int, float or numeric string) to int"""
+    if value is None or value == "":
+        return 0
+    return int(float(value))
+
+
+def _parse_budget(value) -> float:
+    """Coerce a raw budget value to float, treating missing values as 0"""
+    if value is None or value == "":
+        return 0.0
+    return float(value)
+
+
+@dataclass(frozen=True)
+class DatasetStats:
+    """Immutable summary statistics computed once per dataset load"""
+
+    records: int
+    year_range: Optional[Tuple[int, int]]
+    departments: Tuple[str, ...]
+    total_budget: float
+    content_hash: str
+    version: str
+
+    @property
+    def departments_count(self) -> int:
+        return len(self.departments)
+
+    @property
+    def is_complete(self) -> bool:
+        """Whether the dataset has the years, departments and rows endpoints need"""
+        return bool(self.records and self.year_range and self.departments)
+
+    @classmethod
+    def from_store(
+        cls, store: "BudgetStore", version: Optional[str] = None
+    ) -> "DatasetStats":
+        """Compute statistics and a content hash for a budget store"""
+        digest = hashlib.sha256()
+        for column in (store.years, store.budgets, store.department_ids):
+            digest.update(np.ascontiguousarray(column).tobytes())
+        digest.update("\0".join(store.department_names).encode("utf-8"))
+        content_hash = digest.hexdigest()
+
+        years = store.years[store.years > 0]
+        year_range = (int(years.min()), int(years.max())) if len(years) else None
+
+        return cls(
+            records=len(store),
+            year_range=year_range,
+            departments=tuple(sorted(name for name in store.department_names if name)),
+            total_budget=float(store.budgets.sum()),
+            content_hash=content_hash,
+            version=version or content_hash[:16],
+        )
+
+
+class BudgetStoreBuilder:
+    """
+    Accumulate records one at a time into compact typed columns
+
+    Columns grow as ``array.array`` buffers (4-8 bytes per value instead of a
+    Python object per field), so records can be streamed in without holding
+    the source list of dicts.
+    """
+
+    def __init__(self):
+        self._name_ids: Dict[str, int] = {}
+        self._years = array("i")
+        self._budgets = array("d")
+        self._department_ids = array("i")
+
+    def __len__(self) -> int:
+        return len(self._years)
+
+    def add(self, record: dict):
+        """Append one ``{"year", "budget", "name"}`` record"""
+        if not isinstance(record, dict):
+            raise ValueError("Budget records must be JSON objects")
+
+        name = record.get("name")
+        name = str(name) if name else ""
+        dept_id = self._name_ids.get(name)
+        if dept_id is None:
+            dept_id = self._name_ids[name] = len(self._name_ids)
+
+        self._years.append(_parse_year(record.get("year")))
+        self._budgets.append(_parse_budget(record.get("budget")))
+        self._department_ids.append(dept_id)
+
+    def build(
+        self,
+        version: Optional[str] = None,
+        cagr_windows: Optional[Iterable[int]] = None,
+    ) -> "BudgetStore":
+        """Create the store, viewing the column buffers without copying"""
+        return BudgetStore(
+            np.frombuffer(self._years, dtype=np.int32),
+            np.frombuffer(self._budgets, dtype=np.float64),
+            np.frombuffer(self._department_ids, dtype=np.int32),
+            self._name_ids.keys(),
+            version=version,
+            cagr_windows=cagr_windows,
+        )
+
+
+class BudgetStore:
+    """
+    Typed, columnar view of the budget dataset
+
+    Each record is a row across three parallel NumPy columns (year, budget and
+    department id). Department names are interned once in ``department_names``
+    so rows only carry a small integer id.
+
+    Hash indexes by year and by department, and a sorted key index by
+    (department, year), are built once at construction so lookups cost
+    O(matches) instead of a full scan.
+    Partial name matches go through a trigram index over the distinct,
+    lowercased department names and then through the department index.
+    Budget ranges are binary-searched over a budget-sorted row permutation.
+    Dataset-wide statistics are precomputed into ``stats``.
+    """
+
+    _EMPTY_ROWS = np.empty(0, dtype=np.intp)
+
+    AGGREGATE_GROUPS = ("year", "department")
+    AGGREGATE_METRICS = ("sum", "mean", "min", "max", "count")
+    # Rolling CAGR windows (in years) precomputed unless others are passed in
+    CAGR_WINDOWS = (3, 5)
+    # Sorted candidate row sets kept per store, so paging does not re-sort
+    CANDIDATE_CACHE_SIZE = 64
+
+    def __init__(
+        self,
+        years: np.ndarray,
+        budgets: np.ndarray,
+        department_ids: np.ndarray,
+        department_names: Iterable[str],
+        version: Optional[str] = None,
+        cagr_windows: Optional[Iterable[int]] = None,
+    ):
+        self.cagr_windows = tuple(
+            self.CAGR_WINDOWS if cagr_windows is None else cagr_windows
+        )
+        if any(window < 1 for window in self.cagr_windows):
+            raise ValueError("CAGR windows must be at least one year")
+
+        self.years = np.asarray(years, dtype=np.int32)
+        self.budgets = np.asarray(budgets, dtype=np.float64)
+        self.department_ids = np.asarray(department_ids, dtype=np.int32)
+        self.department_names = tuple(department_names)
+
+        if not (len(self.years) == len(self.budgets) == len(self.department_ids)):
+            raise ValueError("Budget store columns must have equal length")
+
+        # Columns are shared across requests, so make accidental writes fail loudly
+        for column in (self.years, self.budgets, self.department_ids):
+            column.setflags(write=False)
+
+        self._build_indexes()
+        self.stats = DatasetStats.from_store(self, version)
+
+    def _build_indexes(self):
+        """Build the secondary hash indexes over the columns"""
+        self._name_ids: Dict[str, int] = {
+            name: dept_id for dept_id, name in enumerate(self.department_names)
+        }
+        self._name_index = NgramIndex(self.department_names)
+        # Names pre-encoded as JSON strings for the serialization fast path
+        self._name_json = [
+            json.dumps(name, ensure_ascii=False) for name in self.department_names
+        ]
+        self._rows_by_year = _group_rows(self.years)
+        self._rows_by_department = _group_rows(self.department_ids)
+
+        # Rows permuted by ascending budget, for binary-searched range filters
+        self._budget_order = np.argsort(self.budgets, kind="stable")
+        self._sorted_budgets = self.budgets[self._budget_order]
+        self._budget_order.setflags(write=False)
+
+        # Candidate row sets in dataset order, keyed by the filter they answer
+        self._candidates: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._candidates_lock = threading.Lock()
+
+        # Sorted (department, year) keys with the first row of each, matching a
+        # linear scan; binary-searched instead of a dict of tuples per row
+        keys = _department_year_keys(self.department_ids, self.years)
+        self._department_year_keys, self._department_year_rows = np.unique(
+            keys, return_index=True
+        )
+
+        self._build_rankings()
+        self._build_matrix()
+        self._build_growth()
+
+    def _build_rankings(self):
+        """
+        Precompute each year's rows ranked by budget, largest first
+
+        ``year_rank`` is the competition rank of a row within its year (ties
+        share the best rank) and ``year_percentile`` the percentage of that
+        year's rows with a budget at or below it.
+        """
+        count = len(self.years)
+        # Year ascending, then budget descending; lexsort is stable
+        order = np.lexsort((-self.budgets, self.years))
+        years = self.years[order]
+        budgets = self.budgets[order]
+
+        positions = np.arange(count)
+        group_start = np.ones(count, dtype=bool)
+        group_start[1:] = years[1:] != years[:-1]
+        run_start = group_start.copy()
+        run_start[1:] |= budgets[1:] != budgets[:-1]
+
+        group_first = np.maximum.accumulate(np.where(group_start, positions, 0))
+        run_first = np.maximum.accumulate(np.where(run_start, positions, 0))
+        starts = np.flatnonzero(group_start)
+        sizes = np.diff(np.append(starts, count))
+        group_size = np.repeat(sizes, sizes)
+
+        rank = np.empty(count, dtype=np.intp)
+        rank[order] = run_first - group_first + 1
+        percentile = np.empty(count, dtype=np.float64)
+        percentile[order] = (group_size - (run_first - group_first)) / group_size * 100
+
+        rank.setflags(write=False)
+        percentile.setflags(write=False)
+        self.year_rank = rank
+        self.year_percentile = percentile
+
+        order.setflags(write=False)
+        self._ranked_rows_by_year: Dict[int, np.ndarray] = dict(
+            zip(years[starts].tolist(), np.split(order, starts[1:]))
+        )
+        self._year_totals: Dict[int, float] = {
+            year: float(self.budgets[rows].sum())
+            for year, rows in self._ranked_rows_by_year.items()
+        }
+
+    def _build_matrix(self):
+        """
+        Precompute the department x year grid of summed budgets
+
+        Rows follow the named departments sorted by name and columns the
+        distinct years ascending; cells without any record hold NaN. Records
+        without a year (0) are left out, as in ``DatasetStats``.
+        """
+        dated = self.years > 0
+        self.matrix_years = np.unique(self.years[dated])
+        named_ids = sorted(
+            (dept_id for dept_id, name in enumerate(self.department_names) if name),
+            key=self.department_names.__getitem__,
+        )
+        self.matrix_departments = tuple(self.department_names[i] for i in named_ids)
+
+        # Matrix row per department id, -1 for the unnamed department
+        self._matrix_row = np.full(len(self.department_names), -1, dtype=np.intp)
+        self._matrix_row[named_ids] = np.arange(len(named_ids))
+
+        rows = self._matrix_row[self.department_ids]
+        cols = np.searchsorted(self.matrix_years, self.years)
+        named = (rows >= 0) & dated
+        shape = (len(named_ids), len(self.matrix_years))
+
+        matrix = np.zeros(shape, dtype=np.float64)
+        counts = np.zeros(shape, dtype=np.intp)
+        np.add.at(matrix, (rows[named], cols[named]), self.budgets[named])
+        np.add.at(counts, (rows[named], cols[named]), 1)
+        matrix[counts == 0] = np.nan
+
+        matrix.setflags(write=False)
+        self.matrix = matrix
+
+    def _build_growth(self):
+        """
+        Precompute per department-year growth metrics over the matrix
+
+        ``yoy_change`` and ``yoy_percent`` compare each cell with the same
+        department one calendar year earlier, ``share_of_total`` is the
+        percentage of that year's named-department total. Cells whose inputs
+        are missing (or would divide by zero) hold NaN.
+        """
+        matrix = self.matrix
+        previous = self._shifted_matrix(1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            yoy_change = matrix - previous
+            yoy_percent = np.where(previous > 0, yoy_change / previous * 100, np.nan)
+
+            totals = np.nansum(matrix, axis=0)
+            share = np.where(totals > 0, matrix / totals * 100, np.nan)
+
+        for values in (yoy_change, yoy_percent, share):
+            values.setflags(write=False)
+        self.yoy_change = yoy_change
+        self.yoy_percent = yoy_percent
+        self.share_of_total = share
+
+        # Named-department total per matrix column, for per-row shares
+        self._matrix_year_totals = totals
+
+        self._cagr: Dict[int, np.ndarray] = {}
+        for window in self.cagr_windows:
+            self.cagr(window)
+
+    def _shifted_matrix(self, years: int) -> np.ndarray:
+        """Matrix values ``years`` calendar years before each column (NaN if absent)"""
+        targets = self.matrix_years - years
+        cols = np.searchsorted(self.matrix_years, targets)
+        found = cols < len(self.matrix_years)
+        found[found] = self.matrix_years[cols[found]] == targets[found]
+
+        shifted = np.full(self.matrix.shape, np.nan)
+        shifted[:, found] = self.matrix[:, cols[found]]
+        return shifted
+
+    def cagr(self, window: int) -> np.ndarray:
+        """
+        Compound annual growth (percent) over the ``window`` years ending at
+        each matrix column
+
+        Windows in ``cagr_windows`` are computed at load; others are computed
+        on first use and kept for the lifetime of the store.
+        """
+        if window < 1:
+            raise ValueError("CAGR window must be at least one year")
+
+        values = self._cagr.get(window)
+        if values is None:
+            base = self._shifted_matrix(window)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = self.matrix / base
+                values = np.where(
+                    (base > 0) & (ratio >= 0), (ratio ** (1 / window) - 1) * 100, np.nan
+                )
+            values.setflags(write=False)
+            self._cagr[window] = values
+        return values
+
+    def matrix_row(self, dept_id: int) -> Optional[int]:
+        """Matrix row of a department id, None for the unnamed department"""
+        row = int(self._matrix_row[dept_id])
+        return row if row >= 0 else None
+
+    def series_growth(self, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Growth metrics entry by entry for one department's rows sorted by year
+
+        Unlike the matrix, which sums repeated (department, year) records into
+        one cell, each row is measured on its own budget: ``yoy_change`` and
+        ``yoy_percent`` compare it with the preceding row when that row is
+        from the previous calendar year (NaN otherwise, including a repeated
+        year), and ``share_of_total`` is its percentage of the year's
+        named-department total.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        years = self.years[rows]
+        budgets = self.budgets[rows]
+
+        yoy_change = np.full(len(rows), np.nan)
+        consecutive = np.flatnonzero(np.diff(years) == 1) + 1
+        previous = budgets[consecutive - 1]
+        yoy_change[consecutive] = budgets[consecutive] - previous
+        yoy_percent = np.full(len(rows), np.nan)
+        grew = consecutive[previous > 0]
+        yoy_percent[grew] = yoy_change[grew] / budgets[grew - 1] * 100
+
+        share = np.full(len(rows), np.nan)
+        cols = np.searchsorted(self.matrix_years, years)
+        found = cols < len(self.matrix_years)
+        found[found] = self.matrix_years[cols[found]] == years[found]
+        totals = np.zeros(len(rows))
+        totals[found] = self._matrix_year_totals[cols[found]]
+        positive = totals > 0
+        share[positive] = budgets[positive] / totals[positive] * 100
+
+        return {
+            "yoy_change": yoy_change,
+            "yoy_percent": yoy_percent,
+            "share_of_total": share,
+        }
+
+    def series_cagr(self, rows: np.ndarray, window: int) -> np.ndarray:
+        """
+        Rolling CAGR (percent) entry by entry for rows sorted like
+        ``series_growth``
+
+        Each row is compared with the last row ``window`` calendar years
+        earlier, so a window of 1 matches ``yoy_percent``; repeats of a year
+        after its first row are NaN.
+        """
+        if window < 1:
+            raise ValueError("CAGR window must be at least one year")
+
+        rows = np.asarray(rows, dtype=np.intp)
+        years = self.years[rows]
+        budgets = self.budgets[rows]
+        values = np.full(len(rows), np.nan)
+        if not len(rows):
+            return values
+
+        targets = years - window
+        base_rows = np.searchsorted(years, targets, side="right") - 1
+        first_of_year = np.concatenate(([True], np.diff(years) != 0))
+        found = first_of_year & (base_rows >= 0)
+        found[found] = years[base_rows[found]] == targets[found]
+
+        base = budgets[base_rows[found]]
+        current = budgets[found]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = current / base
+            values[found] = np.where(
+                (base > 0) & (ratio >= 0), (ratio ** (1 / window) - 1) * 100, np.nan
+            )
+        return values
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[dict],
+        version: Optional[str] = None,
+        cagr_windows: Optional[Iterable[int]] = None,
+    ) -> "BudgetStore":
+        """Build a store from the pipeline's list-of-dicts JSON records"""
+        builder = BudgetStoreBuilder()
+        for record in records:
+            builder.add(record)
+        return builder.build(version=version, cagr_windows=cagr_windows)
+
+    @classmethod
+    def from_npz(
+        cls,
+        path: str,
+        version: Optional[str] = None,
+        mmap: bool = True,
+        cagr_windows: Optional[Iterable[int]] = None,
+    ) -> "BudgetStore":
+        """
+        Load a store from the pipeline's columnar ``.npz`` artifact
+
+        With ``mmap`` the columns are memory-mapped from the file instead of
+        copied, so worker processes loading the same file share its pages.
+        """
+        try:
+            if mmap:
+                arrays = _mmap_npz(path)
+            else:
+                with np.load(path, allow_pickle=False) as archive:
+                    arrays = {name: archive[name] for name in archive.files}
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"Invalid budget artifact: {e}")
+
+        format_version = int(arrays.get("format_version", 0))
+        if format_version != NPZ_FORMAT_VERSION:
+            raise ValueError(f"Unsupported budget artifact format {format_version}")
+
+        missing = [name for name in NPZ_COLUMNS if name not in arrays]
+        if missing:
+            raise ValueError(f"Budget artifact missing columns: {', '.join(missing)}")
+
+        return cls(
+            arrays["year"],
+            arrays["budget"],
+            arrays["department_id"],
+            arrays["department_name"].tolist(),
+            version=version,
+            cagr_windows=cagr_windows,
+        )
+
+    def save_npz(self, path: str):
+        """Write the store in the columnar ``.npz`` layout read by ``from_npz``"""
+        np.savez(
+            path,
+            format_version=np.array(NPZ_FORMAT_VERSION, dtype=np.int32),
+            year=self.years,
+            budget=self.budgets,
+            department_id=self.department_ids,
+            department_name=np.array(self.department_names, dtype=np.str_),
+        )
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+    def department_name(self, department_id: int) -> str:
+        """Get the interned name for a department id"""
+        return self.department_names[department_id]
+
+    def matching_department_ids(self, query: str) -> np.ndarray:
+        """Get ids of departments whose name contains ``query`` (case-insensitive)"""
+        return np.array(self._name_index.search(query), dtype=np.int32)
+
+    def year_rows(self, year: int) -> np.ndarray:
+        """Get row ids for a year"""
+        return self._rows_by_year.get(year, self._EMPTY_ROWS)
+
+    def ranked_year_rows(self, year: int, top_k: Optional[int] = None) -> np.ndarray:
+        """Get row ids for a year, largest budget first, optionally the top ``k``"""
+        rows = self._ranked_rows_by_year.get(year, self._EMPTY_ROWS)
+        return rows if top_k is None else rows[:top_k]
+
+    def year_total(self, year: int) -> float:
+        """Total budget of a year (0.0 for a year without records)"""
+        return self._year_totals.get(year, 0.0)
+
+    def department_rows(self, department_id: int) -> np.ndarray:
+        """Get row ids for a department id"""
+        return self._rows_by_department.get(department_id, self._EMPTY_ROWS)
+
+    def rows_for_departments(self, department_ids: Iterable[int]) -> np.ndarray:
+        """Get row ids for several department ids, in dataset order"""
+        parts = [self.department_rows(int(dept_id)) for dept_id in department_ids]
+        if not parts:
+            return self._EMPTY_ROWS
+        if len(parts) == 1:
+            return parts[0]
+        return np.sort(np.concatenate(parts))
+
+    def find_row(self, department: str, year: int) -> Optional[int]:
+        """Get the first row for an exact department name and year"""
+        dept_id = self._name_ids.get(department)
+        if dept_id is None or not -(2**31) <= year < 2**31:
+            return None
+        key = _department_year_keys(dept_id, year)
+        pos = int(np.searchsorted(self._department_year_keys, key))
+        if (
+            pos == len(self._department_year_keys)
+            or self._department_year_keys[pos] != key
+        ):
+            return None
+        return int(self._department_year_rows[pos])
+
+    def _budget_bounds(
+        self, min_budget: Optional[float], max_budget: Optional[float]
+    ) -> Tuple[int, int]:
+        """Binary-search the budget-sorted permutation for an inclusive range"""
+        low = 0
+        high = len(self._sorted_budgets)
+        if min_budget is not None:
+            low = int(np.searchsorted(self._sorted_budgets, min_budget, side="left"))
+        if max_budget is not None:
+            high = int(np.searchsorted(self._sorted_budgets, max_budget, side="right"))
+        return low, max(low, high)
+
+    def budget_range_rows(
+        self, min_budget: Optional[float] = None, max_budget: Optional[float] = None
+    ) -> np.ndarray:
+        """Get row ids with ``min_budget <= budget <= max_budget``, in dataset order"""
+        low, high = self._budget_bounds(min_budget, max_budget)
+        return self._sorted_candidates(
+            ("budget", low, high), lambda: np.sort(self._budget_order[low:high])
+        )
+
+    def _sorted_candidates(self, key: tuple, load) -> np.ndarray:
+        """
+        Get a candidate row set in dataset order, sorting it once per store
+
+        Pages of one query would otherwise rebuild and re-sort the same set on
+        every request; the store is immutable, so the result stays valid for
+        as long as the dataset version is served. Least recently used sets
+        are dropped beyond ``CANDIDATE_CACHE_SIZE``.
+        """
+        with self._candidates_lock:
+            rows = self._candidates.get(key)
+            if rows is not None:
+                self._candidates.move_to_end(key)
+                return rows
+
+        rows = load()
+        rows.setflags(write=False)
+        with self._candidates_lock:
+            self._candidates[key] = rows
+            while len(self._candidates) > self.CANDIDATE_CACHE_SIZE:
+                self._candidates.popitem(last=False)
+        return rows
+
+    def _candidate_rows(
+        self,
+        year: Optional[int],
+        department: Optional[str],
+        min_budget: Optional[float],
+        max_budget: Optional[float],
+    ) -> Tuple[Optional[str], Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Pick the most selective index for the filters
+
+        Returns ``(source, rows, dept_ids)``; ``rows`` is None when no filter
+        applies (every row is a candidate).
+        """
+        # Candidate row sets from the indexes as (size, source, loader), so only
+        # the most selective one is materialized
+        candidates = []
+        dept_ids = None
+        if year:
+            year_rows = self.year_rows(year)
+            candidates.append((len(year_rows), "year", lambda: year_rows))
+        if department:
+            dept_ids = self.matching_department_ids(department)
+            dept_size = sum(len(self.department_rows(int(i))) for i in dept_ids)
+            candidates.append(
+                (
+                    dept_size,
+                    "department",
+                    lambda: self._sorted_candidates(
+                        ("department", tuple(dept_ids.tolist())),
+                        lambda: self.rows_for_departments(dept_ids),
+                    ),
+                )
+            )
+        if min_budget is not None or max_budget is not None:
+            low, high = self._budget_bounds(min_budget, max_budget)
+            candidates.append(
+                (
+                    high - low,
+                    "budget",
+                    lambda: self._sorted_candidates(
+                        ("budget", low, high),
+                        lambda: np.sort(self._budget_order[low:high]),
+                    ),
+                )
+            )
+
+        if not candidates:
+            return None, None, dept_ids
+
+        size, source, load_rows = min(candidates, key=lambda candidate: candidate[0])
+        if not size:
+            return source, self._EMPTY_ROWS, dept_ids
+        return source, load_rows(), dept_ids
+
+    def _narrow_rows(
+        self,
+        rows: np.ndarray,
+        source: Optional[str],
+        dept_ids: Optional[np.ndarray],
+        year: Optional[int],
+        min_budget: Optional[float],
+        max_budget: Optional[float],
+    ) -> np.ndarray:
+        """Apply the filters not already answered by the ``source`` index"""
+        mask = np.ones(len(rows), dtype=bool)
+
+        if year and source != "year":
+            mask &= self.years[rows] == year
+
+        if dept_ids is not None and source != "department":
+            mask &= np.isin(self.department_ids[rows], dept_ids)
+
+        if source != "budget":
+            if min_budget is not None:
+                mask &= self.budgets[rows] >= min_budget
+            if max_budget is not None:
+                mask &= self.budgets[rows] <= max_budget
+
+        return rows[mask]
+
+    def filter_rows(
+        self,
+        year: Optional[int] = None,
+        department: Optional[str] = None,
+        min_budget: Optional[float] = None,
+        max_budget: Optional[float] = None,
+    ) -> np.ndarray:
+        """Get row ids matching all given filters, in dataset order"""
+        source, rows, dept_ids = self._candidate_rows(
+            year, department, min_budget, max_budget
+        )
+        if rows is None:
+            rows = np.arange(len(self))
+
+        # Narrow the smallest candidate set with the remaining filters
+        return self._narrow_rows(rows, source, dept_ids, year, min_budget, max_budget)
+
+    def page_rows(
+        self,
+        limit: int,
+        after: int = -1,
+        year: Optional[int] = None,
+        department: Optional[str] = None,
+        min_budget: Optional[float] = None,
+        max_budget: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Get up to ``limit`` matching row ids greater than ``after``
+
+        Row ids are the stable sort key, so a page resumes from a binary search
+        into the candidate index and only scans as far as it needs to fill the
+        page, instead of filtering everything and slicing.
+        """
+        if limit <= 0:
+            return self._EMPTY_ROWS
+
+        source, candidates, dept_ids = self._candidate_rows(
+            year, department, min_budget, max_budget
+        )
+        if candidates is None:
+            start, stop = after + 1, len(self)
+        else:
+            start = int(np.searchsorted(candidates, after, side="right"))
+            stop = len(candidates)
+
+        pages = []
+        found = 0
+        step = max(limit, 256)
+        while start < stop and found < limit:
+            end = min(start + step, stop)
+            window = (
+                np.arange(start, end) if candidates is None else candidates[start:end]
+            )
+            matched = self._narrow_rows(
+                window, source, dept_ids, year, min_budget, max_budget
+            )
+            pages.append(matched)
+            found += len(matched)
+            start = end
+            # Sparse matches: widen the window instead of many small scans
+            step *= 2
+
+        if not pages:
+            return self._EMPTY_ROWS
+        return np.concatenate(pages)[:limit]
+
+    def aggregate(
+        self, rows: Iterable[int], group_by: str, metric: str
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Group rows by ``"year"`` or ``"department"`` and reduce their budgets
+
+        ``metric`` is one of ``AGGREGATE_METRICS``. Returns ``(keys, values,
+        counts)`` sorted by key, where department keys are department ids.
+        """
+        if group_by not in self.AGGREGATE_GROUPS:
+            raise ValueError(f"Unknown group_by: {group_by}")
+        if metric not in self.AGGREGATE_METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+
+        rows = np.asarray(rows, dtype=np.intp)
+        column = self.years if group_by == "year" else self.department_ids
+        keys, inverse = np.unique(column[rows], return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(keys))
+        budgets = self.budgets[rows]
+
+        if not len(keys):
+            values = np.empty(0, dtype=np.float64)
+        elif metric == "count":
+            values = counts.astype(np.float64)
+        elif metric in ("sum", "mean"):
+            values = np.bincount(inverse, weights=budgets, minlength=len(keys))
+            if metric == "mean":
+                values = values / counts
+        else:
+            # Contiguous runs per group, reduced in one pass
+            order = np.argsort(inverse, kind="stable")
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            reduce = np.minimum if metric == "min" else np.maximum
+            values = reduce.reduceat(budgets[order], starts)
+
+        return keys, values, counts
+
+    def _matrix_axes(
+        self,
+        department: Optional[str] = None,
+        min_year: Optional[int] = None,
+        max_year: Optional[int] = None,
+    ) -> Tuple[Optional[np.ndarray], slice]:
+        """Matrix rows (None for all) and column slice for a matrix query"""
+        low, high = 0, len(self.matrix_years)
+        if min_year is not None:
+            low = int(np.searchsorted(self.matrix_years, min_year, side="left"))
+        if max_year is not None:
+            high = max(
+                low, int(np.searchsorted(self.matrix_years, max_year, side="right"))
+            )
+
+        rows = None
+        if department:
+            rows = self._matrix_row[self.matching_department_ids(department)]
+            rows = np.sort(rows[rows >= 0])
+        return rows, slice(low, high)
+
+    def _matrix_labels(
+        self, rows: Optional[np.ndarray], cols: slice
+    ) -> Tuple[Tuple[str, ...], np.ndarray]:
+        """Department and year labels for sliced matrix rows and columns"""
+        if rows is None:
+            return self.matrix_departments, self.matrix_years[cols]
+        departments = tuple(self.matrix_departments[i] for i in rows.tolist())
+        return departments, self.matrix_years[cols]
+
+    @staticmethod
+    def _slice_grid(
+        grid: np.ndarray, rows: Optional[np.ndarray], cols: slice
+    ) -> np.ndarray:
+        """Rows and columns of a department x year grid"""
+        return grid[:, cols] if rows is None else grid[rows, cols]
+
+    def matrix_slice(
+        self,
+        department: Optional[str] = None,
+        min_year: Optional[int] = None,
+        max_year: Optional[int] = None,
+    ) -> Tuple[Tuple[str, ...], np.ndarray, np.ndarray]:
+        """
+        Slice the precomputed matrix to matching departments and a year range
+
+        Returns ``(departments, years, values)`` where ``values`` has one row
+        per department and one column per year.
+        """
+        rows, cols = self._matrix_axes(department, min_year, max_year)
+        departments, years = self._matrix_labels(rows, cols)
+        return departments, years, self._slice_grid(self.matrix, rows, cols)
+
+    def growth_slice(
+        self,
+        department: Optional[str] = None,
+        min_year: Optional[int] = None,
+        max_year: Optional[int] = None,
+        windows: Optional[Iterable[int]] = None,
+    ) -> Tuple[Tuple[str, ...], np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Slice the precomputed growth metrics like ``matrix_slice``
+
+        Returns ``(departments, years, metrics)`` where ``metrics`` maps
+        ``budget``, ``yoy_change``, ``yoy_percent``, ``share_of_total`` and
+        ``cagr_<window>`` for each requested window to department x year grids.
+        CAGR and YoY look back across the full dataset, not just the slice.
+        """
+        if windows is None:
+            windows = self.cagr_windows
+
+        grids = {
+            "budget": self.matrix,
+            "yoy_change": self.yoy_change,
+            "yoy_percent": self.yoy_percent,
+            "share_of_total": self.share_of_total,
+        }
+        for window in windows:
+            grids[f"cagr_{window}"] = self.cagr(window)
+
+        rows, cols = self._matrix_axes(department, min_year, max_year)
+        departments, years = self._matrix_labels(rows, cols)
+        metrics = {
+            name: self._slice_grid(grid, rows, cols) for name, grid in grids.items()
+        }
+        return departments, years, metrics
+
+    def compare_years(
+        self, year_a: int, year_b: int, department: Optional[str] = None
+    ) -> Tuple[Tuple[str, ...], np.ndarray, np.ndarray]:
+        """
+        Align two years of the matrix per department
+
+        Returns ``(departments, budgets_a, budgets_b)`` for departments with a
+        record in either year, largest ``year_b`` budget first (ties by name).
+        A department missing from one year counts as 0 there.
+        """
+        rows, cols = self._matrix_axes(department)
+        departments, _ = self._matrix_labels(rows, cols)
+        grid = self._slice_grid(self.matrix, rows, cols)
+
+        def column(year: int) -> np.ndarray:
+            col = int(np.searchsorted(self.matrix_years, year))
+            if col < len(self.matrix_years) and self.matrix_years[col] == year:
+                return grid[:, col]
+            return np.full(len(grid), np.nan)
+
+        budgets_a, budgets_b = column(year_a), column(year_b)
+        present = ~(np.isnan(budgets_a) & np.isnan(budgets_b))
+        budgets_a = np.nan_to_num(budgets_a[present])
+        budgets_b = np.nan_to_num(budgets_b[present])
+
+        # Rows are name-sorted, so a stable sort keeps ties alphabetical
+        order = np.argsort(-budgets_b, kind="stable")
+        selected = np.flatnonzero(present)[order].tolist()
+        return (
+            tuple(departments[i] for i in selected),
+            budgets_a[order],
+            budgets_b[order],
+        )
+
+    def to_records(self, rows: Iterable[int]) -> List[dict]:
+        """Materialize rows as ``{"year", "budget", "name"}`` dicts"""
+        rows = np.asarray(rows, dtype=np.intp)
+        return [
+            {
+                "year": int(year),
+                "budget": float(budget),
+                "name": self.department_names[dept_id],
+            }
+            for year, budget, dept_id in zip(
+                self.years[rows].tolist(),
+                self.budgets[rows].tolist(),
+                self.department_ids[rows].tolist(),
+            )
+        ]
+
+    def to_json_objects(
+        self, rows: Iterable[int], fields: Tuple[str, ...] = ("year", "budget", "name")
+    ) -> List[str]:
+        """
+        Serialize rows as JSON object strings, one per row
+
+        Produces the same text ``json.dumps`` would for the equivalent
+        ``to_records`` dicts (keys in ``fields`` order, no whitespace), without
+        building the dicts or a model per row.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        columns = {
+            "year": lambda: map(str, self.years[rows].tolist()),
+            "budget": lambda: map(repr, self.budgets[rows].tolist()),
+            "name": lambda: map(
+                self._name_json.__getitem__, self.department_ids[rows].tolist()
+            ),
+            "rank": lambda: map(str, self.year_rank[rows].tolist()),
+            "percentile": lambda: map(repr, self.year_percentile[rows].tolist()),
+        }
+        template = "{" + ",".join(f'"{field}":%s' for field in fields) + "}"
+        return [template % values for values in zip(*(columns[f]() for f in fields))]
@@ -0,0 +1,99 @@
+"""
+Local on-disk snapshot of the last dataset loaded from Cloud Storage
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetCache:
+    """
+    Persist the raw dataset payload together with its source generation
+
+    The payload and a small metadata file (generation + SHA-256 of the payload)
+    are each written atomically. On load the checksum is verified, so a crash
+    between the two writes shows up as a cache miss rather than a mismatched
+    version.
+    """
+
+    def __init__(self, directory: str, name: str = "georgian_budget.json"):
+        self.directory = directory
+        self.data_path = os.path.join(directory, name)
+        self.meta_path = os.path.join(directory, f"{name}.meta")
+
+    def _write_atomic(self, path: str, content: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _checksum(self, path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _write_meta(self, generation: str, checksum: str):
+        meta = {"generation": str(generation), "sha256": checksum}
+        self._write_atomic(self.meta_path, json.dumps(meta).encode("utf-8"))
+
+    def load_path(self) -> Optional[Tuple[str, str]]:
+        """Get ``(generation, payload path)`` from the cache, or None on a miss"""
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            checksum = self._checksum(self.data_path)
+        except (OSError, ValueError):
+            return None
+
+        if checksum != meta.get("sha256"):
+            logger.warning("⚠️ Cached dataset checksum mismatch, ignoring cache")
+            return None
+
+        return str(meta["generation"]), self.data_path
+
+    def load(self) -> Optional[Tuple[str, bytes]]:
+        """Get ``(generation, payload)`` from the cache, or None on a miss"""
+        cached = self.load_path()
+        if cached is None:
+            return None
+
+        generation, path = cached
+        with open(path, "rb") as f:
+            return generation, f.read()
+
+    def save(self, generation: str, content: bytes):
+        """Store a payload and the generation it was downloaded at"""
+        os.makedirs(self.directory, exist_ok=True)
+        self._write_atomic(self.data_path, content)
+        self._write_meta(generation, hashlib.sha256(content).hexdigest())
+
+    def temp_path(self) -> str:
+        """Reserve a temporary file in the cache directory for a download"""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        os.close(fd)
+        return tmp_path
+
+    def save_file(self, generation: str, tmp_path: str):
+        """
+        Move a downloaded file from ``temp_path`` into the cache
+
+        The rename gives the payload a new inode, so processes still mapping
+        the previous file keep reading consistent pages.
+        """
+        checksum = self._checksum(tmp_path)
+        os.replace(tmp_path, self.data_path)
+        self._write_meta(generation, checksum)
@@ -0,0 +1,83 @@
+"""
+Background refresher that hot-swaps the budget dataset when a new version lands
+"""
+
+import logging
+import threading
+from typing import Callable, Optional
+
+from budget_store import BudgetStore
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetRefresher:
+    """
+    Poll the dataset source for a new version and publish it off the request path
+
+    ``fetch`` receives the currently published version and should perform a
+    conditional request (e.g. a GCS generation-not-match download), returning
+    None when the source is unchanged or a complete new store otherwise.
+    ``publish`` swaps the new store in with a single reference assignment, so
+    in-flight requests keep the snapshot they started with. A non-positive
+    ``interval`` disables polling but still allows one immediate revalidation.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Optional[str]], Optional[BudgetStore]],
+        current_version: Callable[[], Optional[str]],
+        publish: Callable[[BudgetStore], None],
+        interval: float = 300.0,
+    ):
+        self.fetch = fetch
+        self.current_version = current_version
+        self.publish = publish
+        self.interval = interval
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh_once(self) -> bool:
+        """Load and publish a new dataset version if one is available"""
+        store = self.fetch(self.current_version())
+        if store is None:
+            return False
+
+        logger.info(f"🔄 Published new dataset version {store.stats.version}")
+        self.publish(store)
+        return True
+
+    def _refresh_safely(self):
+        try:
+            self.refresh_once()
+        except Exception as e:
+            # Keep serving the current snapshot and retry on the next tick
+            logger.warning(f"⚠️ Dataset refresh failed: {e}")
+
+    def _run(self, immediate: bool):
+        if immediate:
+            self._refresh_safely()
+        if self.interval <= 0:
+            return
+        while not self._stop.wait(self.interval):
+            self._refresh_safely()
+
+    def start(self, immediate: bool = False):
+        """Start polling in a daemon thread, optionally revalidating right away"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(immediate,), name="dataset-refresher", daemon=True
+        )
+        self._thread.start()
+        if self.interval > 0:
+            logger.info(f"🔄 Dataset refresher polling every {self.interval:g}s")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop polling and wait for the thread to exit"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,109 @@
+"""
+Background database health monitor so health endpoints never touch PostgreSQL
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseStatus(NamedTuple):
+    """Result of the most recent database probe"""
+
+    # None until the first probe has finished
+    connected: Optional[bool] = None
+    latency_ms: Optional[float] = None
+    checked_at: Optional[float] = None
+    consecutive_failures: int = 0
+    error: Optional[str] = None
+
+
+class DatabaseMonitor:
+    """
+    Probe the database periodically in a daemon thread and cache the result
+
+    ``probe`` should run a trivial query and raise on failure. While the
+    database is up it is probed every ``interval`` seconds; after consecutive
+    failures the delay doubles up to ``max_interval``, so a down database is
+    not hammered with connection attempts that each wait for a timeout.
+    Readers get the cached ``status`` snapshot without any I/O.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], None],
+        interval: float = 30.0,
+        max_interval: float = 300.0,
+    ):
+        self.probe = probe
+        self.interval = interval
+        self.max_interval = max_interval
+
+        self.status = DatabaseStatus()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def connected(self) -> bool:
+        return bool(self.status.connected)
+
+    def next_delay(self) -> float:
+        """Seconds until the next probe, backing off while the database is down"""
+        failures = self.status.consecutive_failures
+        if failures == 0:
+            return self.interval
+        return min(self.interval * 2**failures, max(self.max_interval, self.interval))
+
+    def check_once(self) -> DatabaseStatus:
+        """Probe the database and publish the new status"""
+        previous = self.status
+        start = time.perf_counter()
+        try:
+            self.probe()
+        except Exception as e:
+            status = DatabaseStatus(
+                connected=False,
+                checked_at=time.time(),
+                consecutive_failures=previous.consecutive_failures + 1,
+                error=str(e),
+            )
+            # Log transitions only; probes repeat for as long as it is down
+            if previous.connected is not False:
+                logger.warning(f"⚠️ PostgreSQL unavailable: {e}")
+        else:
+            status = DatabaseStatus(
+                connected=True,
+                latency_ms=(time.perf_counter() - start) * 1000,
+                checked_at=time.time(),
+            )
+            if previous.connected is not True:
+                logger.info("🐘 PostgreSQL connection verified")
+
+        # Single reference assignment, so readers never see a partial status
+        self.status = status
+        return status
+
+    def _run(self):
+        self.check_once()
+        while not self._stop.wait(self.next_delay()):
+            self.check_once()
+
+    def start(self):
+        """Start probing in a daemon thread, beginning immediately"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="database-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop probing and wait for the thread to exit"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,90 @@
+"""
+Incremental parsing of a top-level JSON array from a stream of byte chunks
+"""
+
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array as the bytes arrive
+
+    Only the unparsed tail of the input is buffered, so memory stays bounded
+    by the chunk size plus the largest single element rather than by the
+    whole document. Raises ValueError for input that is not a JSON array.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+
+    buffer = ""
+    # start -> first -> (next <-> element) -> done
+    state = "start"
+
+    def parse(final: bool) -> Iterator[Any]:
+        nonlocal buffer, state
+        pos = 0
+        length = len(buffer)
+
+        while state != "done":
+            while pos < length and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == length:
+                break
+            char = buffer[pos]
+
+            if state == "start":
+                if char != "[":
+                    raise ValueError("Expected a JSON array")
+                pos += 1
+                state = "first"
+                continue
+
+            if state in ("first", "next") and char == "]":
+                pos += 1
+                state = "done"
+                break
+
+            if state == "next":
+                if char != ",":
+                    raise ValueError("Expected ',' or ']' in JSON array")
+                pos += 1
+                state = "element"
+                continue
+
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise ValueError("Truncated or malformed JSON array")
+                break
+
+            # A scalar cut at the chunk edge can still parse (e.g. "1.5" of
+            # "1.5e3"), so only accept an element once its delimiter arrived
+            if not final:
+                lookahead = end
+                while lookahead < length and buffer[lookahead] in _WHITESPACE:
+                    lookahead += 1
+                if lookahead == length or buffer[lookahead] not in ",]":
+                    break
+
+            yield element
+            pos = end
+            state = "next"
+
+        buffer = buffer[pos:]
+
+    for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        yield from parse(final=False)
+
+    buffer += text_decoder.decode(b"", final=True)
+    yield from parse(final=True)
+
+    if state != "done":
+        raise ValueError("Truncated JSON array")
+    if buffer.strip():
+        raise ValueError("Unexpected data after JSON array")
@@ -1,30 +1,75 @@
+import asyncio
+import base64
+import binascii
+import csv
+import io
+import itertools
 import json
 import logging
 import os
-from typing import List, Optional
+import tempfile
+from contextlib import asynccontextmanager, nullcontext
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
+import numpy as np
+from budget_store import BudgetStore, BudgetStoreBuilder
 from database import (
-    get_budget_drill_down,
-    get_db,
-    get_department_by_name,
-    get_sub_departments_by_department,
-    test_connection,
+    DATABASE_UNAVAILABLE_ERRORS,
+    async_engine,
+    engine,
+    get_async_db,
+    get_budget_drill_down_async,
+    get_department_with_sub_departments_async,
+    ping_database,
+    pool_stats,
 )
-from fastapi import Depends, FastAPI, HTTPException, Query
+from dataset_cache import DatasetCache
+from dataset_refresher import DatasetRefresher
+from db_monitor import DatabaseMonitor
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from google.api_core.exceptions import (
+    NotFound,
+    NotModified,
+    PreconditionFailed,
+    RequestRangeNotSatisfiable,
+)
 from google.cloud import storage
+from json_stream import iter_json_array
 from models import (
+    AggregateGroup,
+    AggregateResult,
     APIResponse,
+    BatchQuery,
+    BatchRequest,
+    BatchResponse,
+    BudgetComparison,
     BudgetDrillDown,
+    BudgetMatrix,
     BudgetRecord,
     BudgetSummary,
     DepartmentDetail,
     DepartmentTrend,
     DrillDownSummary,
+    GrowthMetrics,
     SubDepartment,
     YearSummary,
 )
-from sqlalchemy.orm import Session
+from response_cache import CachedResponse, ResponseCache, etag_matches, make_etag
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -46,79 +91,356 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
-# Global variable to store budget data
-budget_data: List[dict] = None
+# Global columnar store of the budget dataset. Replaced wholesale on reload, so
+# handlers read it once per request to work against a consistent snapshot.
+budget_store: Optional[BudgetStore] = None
 
 # Environment configuration
 ENVIRONMENT = os.getenv("ENVIRONMENT", "local")
 CLOUD_STORAGE_BUCKET = os.getenv("CLOUD_STORAGE_BUCKET", "")
 CLOUD_STORAGE_PREFIX = os.getenv("CLOUD_STORAGE_PREFIX", "data/processed")
+DATA_REFRESH_INTERVAL_SECONDS = float(os.getenv("DATA_REFRESH_INTERVAL_SECONDS", "300"))
+DATA_DOWNLOAD_CHUNK_BYTES = int(os.getenv("DATA_DOWNLOAD_CHUNK_BYTES", str(1 << 20)))
+DATA_LOAD_RETRY_SECONDS = float(os.getenv("DATA_LOAD_RETRY_SECONDS", "10"))
+NOT_READY_RETRY_AFTER_SECONDS = 5
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 << 20)))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "5000"))
+MAX_CAGR_WINDOW = 50
+
+
+def _parse_cagr_windows(value: str) -> Tuple[int, ...]:
+    """Parse comma-separated CAGR windows, failing fast on a bad setting"""
+    windows = tuple(
+        sorted({int(window) for window in value.split(",") if window.strip()})
+    )
+    if any(window < 1 or window > MAX_CAGR_WINDOW for window in windows):
+        raise ValueError(
+            f"GROWTH_CAGR_WINDOWS must be between 1 and {MAX_CAGR_WINDOW} years"
+        )
+    return windows
 
 
-def load_budget_data_from_cloud_storage():
-    """Load budget data from Google Cloud Storage"""
-    global budget_data
+GROWTH_CAGR_WINDOWS = _parse_cagr_windows(os.getenv("GROWTH_CAGR_WINDOWS", "3,5"))
+YEAR_TOP_K_DEFAULT = 10
+DB_HEALTH_INTERVAL_SECONDS = float(os.getenv("DB_HEALTH_INTERVAL_SECONDS", "30"))
+DB_HEALTH_MAX_INTERVAL_SECONDS = float(
+    os.getenv("DB_HEALTH_MAX_INTERVAL_SECONDS", "300")
+)
+# Opt-in: point at a mounted volume; unset keeps the dataset in memory only
+DATA_CACHE_DIR = os.getenv("DATA_CACHE_DIR", "")
+
+DATASET_BLOB_NAME = f"{CLOUD_STORAGE_PREFIX}/georgian_budget.json"
+DATASET_NPZ_BLOB_NAME = f"{CLOUD_STORAGE_PREFIX}/georgian_budget.npz"
+# Metadata set by the pipeline on the .npz: generation of the JSON it matches
+NPZ_SOURCE_GENERATION_KEY = "source_generation"
 
+_storage_client: Optional[storage.Client] = None
+dataset_cache: Optional[DatasetCache] = (
+    DatasetCache(DATA_CACHE_DIR) if DATA_CACHE_DIR else None
+)
+# Without a cache directory the columnar artifact is mapped from a temp file
+npz_cache: Optional[DatasetCache] = (
+    DatasetCache(DATA_CACHE_DIR, "georgian_budget.npz") if DATA_CACHE_DIR else None
+)
+dataset_refresher: Optional[DatasetRefresher] = None
+# Health endpoints read this cached status instead of querying PostgreSQL
+database_monitor = DatabaseMonitor(
+    ping_database,
+    interval=DB_HEALTH_INTERVAL_SECONDS,
+    max_interval=DB_HEALTH_MAX_INTERVAL_SECONDS,
+)
+dataset_load_task: Optional[asyncio.Task] = None
+# Serialized read responses, keyed by dataset version so a reload invalidates them
+response_cache = ResponseCache(
+    max_bytes=RESPONSE_CACHE_MAX_BYTES, max_entries=RESPONSE_CACHE_MAX_ENTRIES
+)
+# Last startup load failure, reported by the readiness probe
+dataset_load_error: Optional[str] = None
+
+
+def get_storage_bucket() -> storage.Bucket:
+    """Get the Cloud Storage bucket, reusing one client per process"""
+    global _storage_client
+
+    if _storage_client is None:
+        _storage_client = storage.Client()
+    return _storage_client.bucket(CLOUD_STORAGE_BUCKET)
+
+
+def build_budget_store(chunks: Iterable[bytes], version: str) -> BudgetStore:
+    """Incrementally parse a JSON dataset byte stream into a budget store"""
+    builder = BudgetStoreBuilder()
     try:
-        logger.info("☁️ Fetching budget data from Cloud Storage...")
+        for record in iter_json_array(chunks):
+            builder.add(record)
+    except ValueError as e:
+        raise Exception(f"Invalid JSON data structure - {e}")
 
-        # Initialize Cloud Storage client
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(CLOUD_STORAGE_BUCKET)
-
-        # Get JSON file from Cloud Storage (preferred over CSV)
-        json_blob = bucket.blob(f"{CLOUD_STORAGE_PREFIX}/georgian_budget.json")
-        if not json_blob.exists():
-            raise Exception(
-                f"""
-                JSON file not found in bucket:
-                    {CLOUD_STORAGE_BUCKET}/{CLOUD_STORAGE_PREFIX}/georgian_budget.json
-                """
-            )
+    # Validate data structure
+    if len(builder) == 0:
+        raise Exception("Invalid JSON data structure - expected non-empty list")
 
-        # Download and read JSON data
-        json_content = json_blob.download_as_text()
-        budget_data = json.loads(json_content)
+    return builder.build(version=version, cagr_windows=GROWTH_CAGR_WINDOWS)
 
-        # Validate data structure
-        if not isinstance(budget_data, list) or len(budget_data) == 0:
-            raise Exception("Invalid JSON data structure - expected non-empty list")
 
-        # Get data statistics
-        years = [record.get("year") for record in budget_data if record.get("year")]
-        departments = [
-            record.get("name") for record in budget_data if record.get("name")
-        ]
-        budgets = [record.get("budget") or 0.0 for record in budget_data]
+def iter_file_chunks(path: str) -> Iterator[bytes]:
+    """Read a local file in download-sized chunks"""
+    with open(path, "rb") as f:
+        yield from iter(lambda: f.read(DATA_DOWNLOAD_CHUNK_BYTES), b"")
 
-        if years and departments and budgets:
-            years_range = f"{min(years)}-{max(years)}"
-            departments_count = len(set(departments))
-            total_budget = sum(budgets)
 
-            logger.info(
-                f"✅ Loaded {len(budget_data)} budget records from Cloud Storage"
+def iter_blob_chunks(blob: storage.Blob, start: int) -> Iterator[bytes]:
+    """
+    Read the rest of a blob in ranged requests pinned to its generation
+
+    Pinning the generation makes a mid-download upload fail the read with
+    PreconditionFailed instead of splicing two versions together.
+    """
+    while True:
+        try:
+            chunk = blob.download_as_bytes(
+                start=start,
+                end=start + DATA_DOWNLOAD_CHUNK_BYTES - 1,
+                checksum=None,
+                if_generation_match=blob.generation,
             )
-            logger.info(
-                f"""
-                📅 Years: {years_range}
-                🏛️ Departments: {departments_count}
-                💰 Total: {total_budget:,.1f}M ₾
-                """
+        except RequestRangeNotSatisfiable:
+            # The previous chunk ended exactly at the end of the blob
+            return
+        if chunk:
+            yield chunk
+        if len(chunk) < DATA_DOWNLOAD_CHUNK_BYTES:
+            return
+        start += len(chunk)
+
+
+def tee_to_file(chunks: Iterable[bytes], path: str) -> Iterator[bytes]:
+    """
+    Pass chunks through while writing them to ``path``
+
+    A write failure only drops the file, so a full disk never fails the load.
+    """
+    f = open(path, "wb")
+    try:
+        for chunk in chunks:
+            if f is not None:
+                try:
+                    f.write(chunk)
+                except OSError as e:
+                    logger.warning(f"⚠️ Could not write dataset cache: {e}")
+                    f.close()
+                    f = None
+                    os.remove(path)
+            yield chunk
+    finally:
+        if f is not None:
+            f.close()
+
+
+def fetch_npz_budget_store(
+    known_version: Optional[str] = None,
+) -> Optional[BudgetStore]:
+    """
+    Download the columnar artifact and memory-map it
+
+    The download lands in the cache directory when one is configured, and in
+    an unlinked temp file otherwise: the mapping keeps its pages alive, and
+    nothing is left on disk once the store is released.
+
+    The JSON blob stays the source of truth: the artifact is only used while
+    its ``source_generation`` metadata names the current JSON generation, so
+    a stale artifact (left behind by a run that did not produce or upload
+    one) cannot hide newer JSON. Raises NotFound when there is no artifact
+    and ValueError when it does not match the JSON.
+    """
+    bucket = get_storage_bucket()
+    npz_blob = bucket.get_blob(DATASET_NPZ_BLOB_NAME)
+    if npz_blob is None:
+        raise NotFound(f"{DATASET_NPZ_BLOB_NAME} not found")
+    json_blob = bucket.get_blob(DATASET_BLOB_NAME)
+    source = (npz_blob.metadata or {}).get(NPZ_SOURCE_GENERATION_KEY)
+    if json_blob is None or source != str(json_blob.generation):
+        raise ValueError(
+            f"columnar artifact was built from JSON generation {source}, "
+            f"not the current {json_blob.generation if json_blob else None}"
+        )
+
+    generation = str(npz_blob.generation)
+    if generation == known_version:
+        return None
+
+    if npz_cache is not None:
+        tmp_path = npz_cache.temp_path()
+    else:
+        fd, tmp_path = tempfile.mkstemp(prefix="moneyflow-", suffix=".npz")
+        os.close(fd)
+    try:
+        # Pinned to the generation checked above
+        npz_blob.download_to_filename(tmp_path, if_generation_match=int(generation))
+        # Map and validate the download before it replaces the cached artifact;
+        # the mapping follows the file through the rename
+        store = BudgetStore.from_npz(
+            tmp_path, version=generation, cagr_windows=GROWTH_CAGR_WINDOWS
+        )
+        if npz_cache is not None:
+            npz_cache.save_file(generation, tmp_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return store
+
+
+def fetch_json_budget_store(
+    known_version: Optional[str] = None,
+) -> Optional[BudgetStore]:
+    """Stream the JSON dataset blob into a budget store"""
+    json_blob = get_storage_bucket().blob(DATASET_BLOB_NAME)
+    try:
+        # Generation comes back in the headers of the first ranged read
+        first_chunk = json_blob.download_as_bytes(
+            start=0,
+            end=DATA_DOWNLOAD_CHUNK_BYTES - 1,
+            checksum=None,
+            if_generation_not_match=int(known_version) if known_version else None,
+        )
+    except NotModified:
+        return None
+    except NotFound:
+        raise Exception(
+            f"""
+            JSON file not found in bucket:
+                {CLOUD_STORAGE_BUCKET}/{DATASET_BLOB_NAME}
+            """
+        )
+
+    generation = str(json_blob.generation)
+    chunks: Iterable[bytes] = [first_chunk]
+    if len(first_chunk) == DATA_DOWNLOAD_CHUNK_BYTES:
+        chunks = itertools.chain(chunks, iter_blob_chunks(json_blob, len(first_chunk)))
+
+    tmp_path = None
+    if dataset_cache is not None:
+        try:
+            tmp_path = dataset_cache.temp_path()
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write dataset cache: {e}")
+    if tmp_path is None:
+        return build_budget_store(chunks, generation)
+
+    # Spool the raw bytes to the cache as they are parsed, and only commit the
+    # file once the whole payload parsed successfully
+    try:
+        store = build_budget_store(tee_to_file(chunks, tmp_path), generation)
+        try:
+            dataset_cache.save_file(generation, tmp_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write dataset cache: {e}")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return store
+
+
+def fetch_budget_store(known_version: Optional[str] = None) -> Optional[BudgetStore]:
+    """
+    Fetch the dataset, preferring the columnar artifact over JSON
+
+    Stores are versioned by the generation of the blob they came from. With
+    ``known_version`` the download is conditional on the generation having
+    changed, and None is returned when it has not.
+    """
+    try:
+        return fetch_npz_budget_store(known_version)
+    except NotFound:
+        logger.info("No columnar dataset artifact found, falling back to JSON")
+    except (OSError, ValueError, PreconditionFailed) as e:
+        logger.warning(f"⚠️ Could not load columnar dataset artifact: {e}")
+
+    return fetch_json_budget_store(known_version)
+
+
+def load_cached_budget_store() -> Optional[BudgetStore]:
+    """
+    Build a budget store from the local dataset cache, if present
+
+    When both artifacts are cached the newer upload wins: the pipeline uploads
+    the .npz after the JSON it was built from, so a JSON generation above the
+    cached .npz generation means the .npz is stale.
+    """
+    cached = dataset_cache.load_path() if dataset_cache is not None else None
+    cached_npz = npz_cache.load_path() if npz_cache is not None else None
+
+    if cached_npz is not None and (
+        cached is None or int(cached_npz[0]) > int(cached[0])
+    ):
+        generation, path = cached_npz
+        try:
+            return BudgetStore.from_npz(
+                path, version=generation, cagr_windows=GROWTH_CAGR_WINDOWS
             )
-            logger.info(f"☁️ Data source: Cloud Storage bucket {CLOUD_STORAGE_BUCKET}")
-        else:
-            logger.warning("⚠️ Some budget records missing required fields")
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable columnar cache: {e}")
+
+    if cached is None:
+        return None
+
+    generation, path = cached
+    try:
+        return build_budget_store(iter_file_chunks(path), generation)
+    except Exception as e:
+        logger.warning(f"⚠️ Ignoring unreadable dataset cache: {e}")
+        return None
+
+
+def publish_budget_store(store: BudgetStore, source: str = "Cloud Storage"):
+    """Atomically swap in a fully built budget store"""
+    global budget_store
+
+    budget_store = store
+    # Keys carry the version, so this only frees memory held by the old dataset
+    response_cache.clear()
+
+    # Get data statistics
+    stats = store.stats
+
+    if stats.is_complete:
+        years_range = f"{stats.year_range[0]}-{stats.year_range[1]}"
+
+        logger.info(f"✅ Loaded {stats.records} budget records from {source}")
+        logger.info(
+            f"""
+            📅 Years: {years_range}
+            🏛️ Departments: {stats.departments_count}
+            💰 Total: {stats.total_budget:,.1f}M ₾
+            🔖 Version: {stats.version}
+            """
+        )
+        logger.info(f"☁️ Data source: Cloud Storage bucket {CLOUD_STORAGE_BUCKET}")
+    else:
+        logger.warning("⚠️ Some budget records missing required fields")
+
+
+def load_budget_data_from_cloud_storage():
+    """Load budget data from Google Cloud Storage"""
+    try:
+        logger.info("☁️ Fetching budget data from Cloud Storage...")
+
+        publish_budget_store(fetch_budget_store())
 
         # Try to get metadata from datapackage.json
         try:
-            meta_blob = bucket.blob(f"{CLOUD_STORAGE_PREFIX}/datapackage.json")
-            if meta_blob.exists():
-                metadata = json.loads(meta_blob.download_as_text())
-                last_update = metadata.get("updated", "Unknown")
-                logger.info(f"📊 Data last updated: {last_update}")
+            meta_blob = get_storage_bucket().blob(
+                f"{CLOUD_STORAGE_PREFIX}/datapackage.json"
+            )
+            metadata = json.loads(meta_blob.download_as_text())
+            last_update = metadata.get("updated", "Unknown")
+            logger.info(f"📊 Data last updated: {last_update}")
         except Exception as e:
             logger.warning(f"Could not fetch metadata from datapackage.json: {e}")
 
@@ -129,28 +451,223 @@ def load_budget_data_from_cloud_storage():
         )
 
 
-def load_budget_data():
-    """Load budget data from Cloud Storage"""
+def load_budget_data() -> bool:
+    """
+    Load budget data, preferring the local cache over Cloud Storage
+
+    Returns True when the dataset was served from cache and still needs to be
+    revalidated against Cloud Storage.
+    """
     if not CLOUD_STORAGE_BUCKET:
         raise HTTPException(
             status_code=500, detail="Cloud Storage bucket not configured"
         )
 
+    cached_store = load_cached_budget_store()
+    if cached_store is not None:
+        publish_budget_store(cached_store, source="local cache")
+        return True
+
     load_budget_data_from_cloud_storage()
+    return False
+
+
+def start_dataset_refresher(revalidate: bool = False):
+    """Start polling Cloud Storage for new dataset versions"""
+    global dataset_refresher
+
+    if not CLOUD_STORAGE_BUCKET:
+        return
+    if DATA_REFRESH_INTERVAL_SECONDS <= 0 and not revalidate:
+        return
+
+    dataset_refresher = DatasetRefresher(
+        fetch=fetch_budget_store,
+        current_version=lambda: budget_store.stats.version if budget_store else None,
+        publish=publish_budget_store,
+        interval=DATA_REFRESH_INTERVAL_SECONDS,
+    )
+    dataset_refresher.start(immediate=revalidate)
+
+
+async def load_budget_data_in_background():
+    """
+    Load the dataset off the event loop, retrying until a snapshot is published
+
+    Runs as a task so the server starts answering liveness probes immediately;
+    data endpoints report 503 until ``budget_store`` is set.
+    """
+    global dataset_load_error
+
+    while True:
+        try:
+            # Load budget data (cached copy first, Cloud Storage otherwise)
+            served_from_cache = await run_in_threadpool(load_budget_data)
+            break
+        except HTTPException as e:
+            dataset_load_error = e.detail
+        except Exception as e:
+            dataset_load_error = str(e)
+
+        if not CLOUD_STORAGE_BUCKET:
+            logger.error(f"❌ {dataset_load_error}")
+            return
+        logger.warning(
+            f"⚠️ Dataset load failed, retrying in {DATA_LOAD_RETRY_SECONDS:g}s"
+        )
+        await asyncio.sleep(DATA_LOAD_RETRY_SECONDS)
+
+    dataset_load_error = None
+
+    # Revalidate a cached copy in the background and pick up new pipeline outputs
+    # without restarting the instance
+    start_dataset_refresher(revalidate=served_from_cache)
 
 
 # Load data on startup
 @app.on_event("startup")
 async def startup_event():
-    # Test PostgreSQL connection
-    db_connected = test_connection()
-    if db_connected:
-        logger.info("🐘 PostgreSQL connection verified")
-    else:
-        logger.warning("⚠️ PostgreSQL connection failed - drill-down features disabled")
+    global dataset_load_task
+
+    dataset_load_task = asyncio.create_task(load_budget_data_in_background())
+    database_monitor.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if dataset_load_task is not None:
+        dataset_load_task.cancel()
+    if dataset_refresher is not None:
+        dataset_refresher.stop(timeout=5)
+    database_monitor.stop(timeout=5)
+
+
+def _not_ready() -> HTTPException:
+    """503 telling clients and probes to come back once the dataset is loaded"""
+    return HTTPException(
+        status_code=503,
+        detail="Budget data not loaded yet",
+        headers={"Retry-After": str(NOT_READY_RETRY_AFTER_SECONDS)},
+    )
+
 
-    # Load budget data from Cloud Storage
-    load_budget_data()
+T = TypeVar("T")
+
+
+async def _db_query(query: Awaitable[T]) -> T:
+    """Await a database query, reporting an unreachable database as a 503"""
+    try:
+        return await query
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        logger.warning(f"Database unavailable: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Database not available. Please start the database.",
+        )
+
+
+def _require_budget_store() -> BudgetStore:
+    """Get the loaded budget store or fail the request"""
+    store = budget_store
+    if store is None:
+        raise _not_ready()
+    return store
+
+
+def _json_bytes(content: Any) -> bytes:
+    """Serialize plain JSON content exactly as JSONResponse would"""
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _json_array(objects: List[str]) -> str:
+    """Join pre-serialized JSON values into an array"""
+    return "[" + ",".join(objects) + "]"
+
+
+def _nullable(values: np.ndarray) -> list:
+    """Array to (nested) lists with NaN as None, since JSON has no NaN"""
+    cells = values.astype(object)
+    cells[np.isnan(values)] = None
+    return cells.tolist()
+
+
+def _serialize(content: Any) -> CachedResponse:
+    """Normalize builder output (bytes, CachedResponse or models) to a body"""
+    if isinstance(content, CachedResponse):
+        return content
+    if isinstance(content, bytes):
+        return CachedResponse(content)
+    return CachedResponse(JSONResponse(jsonable_encoder(content)).body)
+
+
+def _etag(store: BudgetStore) -> str:
+    """ETag for responses built from ``store`` by this API version"""
+    return make_etag(store.stats.version, app.version)
+
+
+def _cached_content(
+    store: BudgetStore, route: str, params: dict, build: Callable[[], Any]
+) -> CachedResponse:
+    """Get a serialized body from the response cache, building it on a miss"""
+    key = (store.stats.version, route, tuple(sorted(params.items())))
+    cached = response_cache.get(key)
+    if cached is None:
+        cached = _serialize(build())
+        response_cache.put(key, cached)
+    return cached
+
+
+def _cached_response(
+    request: Request, store: BudgetStore, build: Callable[[], Any], **params
+) -> Response:
+    """
+    Serve a read endpoint through the version-keyed response cache
+
+    The serialized body is cached under (dataset version, route, parsed
+    parameters). ``build`` may return pre-serialized JSON bytes to skip model
+    encoding entirely, or a ``CachedResponse`` to cache extra headers
+    alongside the body. The body is resolved before answering a conditional
+    request with 304, so a resource that does not exist is still a 404; on a
+    cache hit that costs a lookup only.
+    """
+    cached = _cached_content(store, request.scope["route"].path, params, build)
+
+    headers = {"ETag": _etag(store), "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    if cached.headers:
+        headers.update(cached.headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+def _encode_cursor(version: str, row: int) -> str:
+    """Opaque pagination cursor: the last row id served from a dataset version"""
+    token = f"{version}:{row}".encode("utf-8")
+    return base64.urlsafe_b64encode(token).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, store: BudgetStore) -> int:
+    """Get the row id to resume after, rejecting cursors from other versions"""
+    try:
+        token = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        version, row = token.decode("utf-8").rsplit(":", 1)
+        row = int(row)
+        # Row ids are never negative; NumPy would wrap them to the dataset end
+        if row < 0:
+            raise ValueError(row)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+    if version != store.stats.version:
+        raise HTTPException(
+            status_code=410,
+            detail="Pagination cursor expired: the dataset was reloaded, "
+            "restart from the first page",
+        )
+    return row
 
 
 @app.get("/", response_model=APIResponse)
@@ -158,25 +675,21 @@ async def root():
     """Root endpoint with API information"""
     # Get real-time data stats
     data_stats = {}
-    if budget_data is not None:
-        years = [record.get("year") for record in budget_data if record.get("year")]
-        departments = [
-            record.get("name") for record in budget_data if record.get("name")
-        ]
-        budgets = [record.get("budget") or 0.0 for record in budget_data]
-
-        if years and departments and budgets:
-            data_stats = {
-                "records": len(budget_data),
-                "years": f"{min(years)}-{max(years)}",
-                "departments": len(set(departments)),
-                "total_budget_millions": f"{sum(budgets):,.1f}M ₾",
-                "data_source": "☁️ Cloud Storage",
-                "environment": ENVIRONMENT,
-                "drill_down_enabled": "🐘 PostgreSQL sub-departments available"
-                if test_connection()
-                else "⚠️ PostgreSQL not available",
-            }
+    store = budget_store
+    if store is not None and store.stats.is_complete:
+        stats = store.stats
+        data_stats = {
+            "records": stats.records,
+            "years": f"{stats.year_range[0]}-{stats.year_range[1]}",
+            "departments": stats.departments_count,
+            "total_budget_millions": f"{stats.total_budget:,.1f}M ₾",
+            "data_source": "☁️ Cloud Storage",
+            "dataset_version": stats.version,
+            "environment": ENVIRONMENT,
+            "drill_down_enabled": "🐘 PostgreSQL sub-departments available"
+            if database_monitor.connected
+            else "⚠️ PostgreSQL not available",
+        }
 
     return APIResponse(
         data={
@@ -187,12 +700,21 @@ async def root():
             "endpoints": [
                 "/docs - API documentation",
                 "/health - Health check",
+                "/health/live - Liveness probe",
+                "/health/ready - Readiness probe",
+                "/health/db-pool - Database connection pool stats",
                 "/budget - Get budget data",
                 "/summary - Data summary",
                 "/departments - List departments",
                 "/trends/{department} - Department trends",
                 "/years/{year} - Year summary",
                 "/search - Search departments",
+                "/export - Stream the filtered dataset as NDJSON or CSV",
+                "/aggregate - Budget metrics grouped by year or department",
+                "/matrix - Department x year budget grid",
+                "/growth - YoY change, share of total and CAGR per department",
+                "/compare - Per-department comparison of two years",
+                "/batch - Several read queries in one round trip (POST)",
                 "/drill-down/{department} - Sub-department breakdown",
                 "/drill-down/analysis/{department}/{year} - drill-down analysis",
             ],
@@ -200,201 +722,577 @@ async def root():
     )
 
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: a dataset snapshot has been published"""
+    store = budget_store
+    if store is None:
+        exc = _not_ready()
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"status": "loading", "error": dataset_load_error},
+            headers=exc.headers,
+        )
+
+    return {"status": "ready", "dataset_version": store.stats.version}
+
+
+@app.get("/health/db-pool")
+async def database_pool_stats():
+    """Connection pool occupancy and checkout wait times, per engine"""
+    return {"async": pool_stats(async_engine), "sync": pool_stats(engine)}
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    global budget_data
+    store = budget_store
 
-    # Check database connection
-    db_status = "connected" if test_connection() else "disconnected"
+    # Cached by the background monitor; never queries the database here
+    db = database_monitor.status
+    db_status = {True: "connected", False: "disconnected"}.get(db.connected, "unknown")
 
     return {
         "status": "healthy",
         "environment": ENVIRONMENT,
-        "data_loaded": budget_data is not None,
-        "records_count": len(budget_data) if budget_data is not None else 0,
+        "data_loaded": store is not None,
+        "records_count": store.stats.records if store is not None else 0,
+        "dataset_version": store.stats.version if store is not None else None,
         "database": db_status,
+        "database_latency_ms": db.latency_ms,
+        "database_checked_at": db.checked_at,
         "data_source": "cloud_storage",
         "cloud_storage_bucket": CLOUD_STORAGE_BUCKET,
     }
 
 
+def _budget_page_content(
+    store: BudgetStore,
+    year: Optional[int],
+    department: Optional[str],
+    min_budget: Optional[float],
+    max_budget: Optional[float],
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+) -> CachedResponse:
+    """One page of filtered records, plus the cursor for the next page if any"""
+    if cursor is not None and offset:
+        raise HTTPException(
+            status_code=400, detail="Use either cursor or offset, not both"
+        )
+    after = _decode_cursor(cursor, store) if cursor is not None else -1
+    filters = dict(
+        year=year, department=department, min_budget=min_budget, max_budget=max_budget
+    )
+
+    # One extra row tells whether there is a next page; an empty page has none
+    fetch = limit + 1 if limit > 0 else 0
+
+    if offset:
+        # Apply filters
+        rows = store.filter_rows(**filters)
+
+        # Apply pagination
+        rows = rows[offset : offset + fetch]
+    else:
+        rows = store.page_rows(fetch, after=after, **filters)
+
+    headers = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers = {"X-Next-Cursor": _encode_cursor(store.stats.version, int(rows[-1]))}
+
+    # Rows come straight from the typed store, so skip per-row BudgetRecord
+    # validation; response_model still documents the schema
+    body = _json_array(store.to_json_objects(rows)).encode("utf-8")
+    return CachedResponse(body, headers)
+
+
 @app.get("/budget", response_model=List[BudgetRecord])
 async def get_budget_data(
+    request: Request,
     year: Optional[int] = Query(None, description="Filter by year"),
     department: Optional[str] = Query(
         None, description="Filter by department name (partial match)"
     ),
     min_budget: Optional[float] = Query(None, description="Minimum budget amount"),
     max_budget: Optional[float] = Query(None, description="Maximum budget amount"),
-    limit: int = Query(100, le=1000, description="Limit number of results"),
+    limit: int = Query(100, ge=0, le=1000, description="Limit number of results"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(
+        None,
+        description="Resume after the page that returned this X-Next-Cursor value",
+    ),
 ):
-    """Get budget data with optional filters"""
-    global budget_data
-
-    if budget_data is None:
-        raise HTTPException(status_code=500, detail="Budget data not loaded")
-
-    # Apply filters
-    filtered_data = budget_data.copy()
-
-    if year:
-        filtered_data = [
-            record for record in filtered_data if record.get("year") == float(year)
-        ]
-
-    if department:
-        filtered_data = [
-            record
-            for record in filtered_data
-            if record.get("name")
-            and department.lower() in record.get("name", "").lower()
-        ]
+    """
+    Get budget data with optional filters
 
-    if min_budget is not None:
-        filtered_data = [
-            record
-            for record in filtered_data
-            if (record.get("budget") or 0.0) >= min_budget
-        ]
+    Pages are ordered by dataset row. When more rows match, the response
+    carries an ``X-Next-Cursor`` header; pass it back as ``cursor`` to fetch
+    the next page without rescanning the earlier ones.
+    """
+    store = _require_budget_store()
+    params = dict(
+        year=year,
+        department=department,
+        min_budget=min_budget,
+        max_budget=max_budget,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+    )
+    return _cached_response(
+        request, store, lambda: _budget_page_content(store, **params), **params
+    )
 
-    if max_budget is not None:
-        filtered_data = [
-            record
-            for record in filtered_data
-            if (record.get("budget") or 0.0) <= max_budget
-        ]
 
-    # Apply pagination
-    filtered_data = filtered_data[offset : offset + limit]
-
-    # Convert to list of BudgetRecord objects
-    records = []
-    for record in filtered_data:
-        # Handle null budget values by converting them to 0
-        budget_value = record.get("budget")
-        if budget_value is None:
-            budget_value = 0.0
-        else:
-            budget_value = float(budget_value)
-
-        records.append(
-            BudgetRecord(
-                year=int(float(record.get("year", 0))),
-                budget=budget_value,
-                name=str(record.get("name", "")),
+def _export_ndjson(store: BudgetStore, pages: Iterator[np.ndarray]) -> Iterator[bytes]:
+    """Encode row batches as newline-delimited JSON records"""
+    for rows in pages:
+        yield "".join(obj + "\n" for obj in store.to_json_objects(rows)).encode("utf-8")
+
+
+def _export_csv(store: BudgetStore, pages: Iterator[np.ndarray]) -> Iterator[bytes]:
+    """Encode row batches as CSV with a header row"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["year", "budget", "name"])
+    for rows in pages:
+        writer.writerows(
+            (year, budget, store.department_name(dept_id))
+            for year, budget, dept_id in zip(
+                store.years[rows].tolist(),
+                store.budgets[rows].tolist(),
+                store.department_ids[rows].tolist(),
             )
         )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
 
-    return records
 
+_EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", _export_ndjson),
+    "csv": ("text/csv; charset=utf-8", _export_csv),
+}
 
-@app.get("/summary", response_model=BudgetSummary)
-async def get_summary():
-    """Get overall budget data summary"""
-    global budget_data
 
-    if budget_data is None:
-        raise HTTPException(status_code=500, detail="Budget data not loaded")
+@app.get("/export")
+async def export_budget_data(
+    export_format: str = Query(
+        "ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"
+    ),
+    year: Optional[int] = Query(None, description="Filter by year"),
+    department: Optional[str] = Query(
+        None, description="Filter by department name (partial match)"
+    ),
+    min_budget: Optional[float] = Query(None, description="Minimum budget amount"),
+    max_budget: Optional[float] = Query(None, description="Maximum budget amount"),
+):
+    """Stream every budget record matching the filters as NDJSON or CSV"""
+    # Row ids are resolved once against the snapshot current at request time,
+    # so a reload mid-export cannot mix versions. Records are encoded in
+    # EXPORT_BATCH_ROWS slices; the row-id array is O(matching rows).
+    store = _require_budget_store()
+    rows = store.filter_rows(
+        year=year, department=department, min_budget=min_budget, max_budget=max_budget
+    )
 
-    years = [record.get("year") for record in budget_data if record.get("year")]
-    budgets = [record.get("budget") or 0.0 for record in budget_data]
-    departments = [record.get("name") for record in budget_data if record.get("name")]
+    def pages() -> Iterator[np.ndarray]:
+        for start in range(0, len(rows), EXPORT_BATCH_ROWS):
+            yield rows[start : start + EXPORT_BATCH_ROWS]
+
+    media_type, encode = _EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        encode(store, pages()),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="georgian_budget.{export_format}"'
+            ),
+            "ETag": _etag(store),
+        },
+    )
 
-    if not years or not budgets or not departments:
-        raise HTTPException(status_code=500, detail="Invalid data structure")
 
-    return BudgetSummary(
-        total_records=len(budget_data),
-        year_range=(min(years), max(years)),
-        total_budget=sum(budgets),
-        departments_count=len(set(departments)),
+@app.get("/aggregate", response_model=AggregateResult)
+async def aggregate_budget_data(
+    request: Request,
+    group_by: str = Query(
+        ..., pattern="^(year|department)$", description="year or department"
+    ),
+    metric: str = Query(
+        "sum", pattern="^(sum|mean|min|max|count)$", description="Budget metric"
+    ),
+    year: Optional[int] = Query(None, description="Filter by year"),
+    department: Optional[str] = Query(
+        None, description="Filter by department name (partial match)"
+    ),
+    min_budget: Optional[float] = Query(None, description="Minimum budget amount"),
+    max_budget: Optional[float] = Query(None, description="Maximum budget amount"),
+    min_year: Optional[int] = Query(None, description="First year to include"),
+    max_year: Optional[int] = Query(None, description="Last year to include"),
+):
+    """Aggregate budgets matching the ``/budget`` filters by year or department"""
+    store = _require_budget_store()
+
+    def build():
+        rows = store.filter_rows(
+            year=year,
+            department=department,
+            min_budget=min_budget,
+            max_budget=max_budget,
+        )
+        if min_year is not None:
+            rows = rows[store.years[rows] >= min_year]
+        if max_year is not None:
+            rows = rows[store.years[rows] <= max_year]
+
+        keys, values, counts = store.aggregate(rows, group_by, metric)
+        groups = [
+            AggregateGroup(
+                key=store.department_name(key) if group_by == "department" else key,
+                value=value,
+                count=count,
+            )
+            for key, value, count in zip(
+                keys.tolist(), values.tolist(), counts.tolist()
+            )
+        ]
+        if group_by == "department":
+            groups.sort(key=lambda group: group.key)
+
+        return AggregateResult(group_by=group_by, metric=metric, groups=groups)
+
+    return _cached_response(
+        request,
+        store,
+        build,
+        group_by=group_by,
+        metric=metric,
+        year=year,
+        department=department,
+        min_budget=min_budget,
+        max_budget=max_budget,
+        min_year=min_year,
+        max_year=max_year,
     )
 
 
-@app.get("/departments", response_model=List[str])
-async def get_departments():
-    """Get list of all departments"""
-    global budget_data
+def _summary_content(store: BudgetStore) -> BudgetSummary:
+    """Overall dataset summary"""
+    stats = store.stats
 
-    if budget_data is None:
-        raise HTTPException(status_code=500, detail="Budget data not loaded")
+    if not stats.is_complete:
+        raise HTTPException(status_code=500, detail="Invalid data structure")
 
-    departments = [record.get("name") for record in budget_data if record.get("name")]
-    return sorted(list(set(departments)))
+    return BudgetSummary(
+        total_records=stats.records,
+        year_range=stats.year_range,
+        total_budget=stats.total_budget,
+        departments_count=stats.departments_count,
+    )
 
 
-@app.get("/trends/{department}", response_model=DepartmentTrend)
-async def get_department_trend(department: str):
-    """Get budget trend for a specific department"""
-    global budget_data
+def _departments_content(store: BudgetStore) -> bytes:
+    """Sorted department names"""
+    return _json_bytes(list(store.stats.departments))
 
-    if budget_data is None:
-        raise HTTPException(status_code=500, detail="Budget data not loaded")
 
+def _department_trend_content(store: BudgetStore, department: str) -> DepartmentTrend:
+    """Yearly budgets and growth for a department (partial match)"""
     # Find department records (partial match)
-    dept_data = [
-        record
-        for record in budget_data
-        if record.get("name") and department.lower() in record.get("name", "").lower()
-    ]
+    rows = store.filter_rows(department=department)
 
-    if not dept_data:
+    if not len(rows):
         raise HTTPException(
             status_code=404, detail=f"Department '{department}' not found"
         )
 
     # Sort by year
-    dept_data = sorted(dept_data, key=lambda x: x.get("year", 0))
+    rows = rows[np.argsort(store.years[rows], kind="stable")]
+    years = store.years[rows]
+    budgets = store.budgets[rows]
 
     # Calculate growth rate (if we have more than one year)
     growth_rate = None
-    if len(dept_data) > 1:
-        first_budget = dept_data[0].get("budget") or 0.0
-        last_budget = dept_data[-1].get("budget") or 0.0
-        years_span = dept_data[-1].get("year", 0) - dept_data[0].get("year", 0)
+    if len(rows) > 1:
+        first_budget = float(budgets[0])
+        last_budget = float(budgets[-1])
+        years_span = int(years[-1] - years[0])
         if first_budget > 0 and years_span > 0:
             growth_rate = ((last_budget / first_budget) ** (1 / years_span) - 1) * 100
 
+    # Growth per entry of ``budgets`` when the name resolves to one named
+    # department; a mix of departments has no single series to compare
+    growth = {}
+    dept_ids = np.unique(store.department_ids[rows])
+    if len(dept_ids) == 1 and store.matrix_row(int(dept_ids[0])) is not None:
+        growth = {
+            metric: _nullable(values)
+            for metric, values in store.series_growth(rows).items()
+        }
+        growth["cagr"] = {
+            str(window): _nullable(store.series_cagr(rows, window))
+            for window in store.cagr_windows
+        }
+
     return DepartmentTrend(
-        department=dept_data[0].get("name", ""),
-        years=[int(float(record.get("year", 0))) for record in dept_data],
-        budgets=[record.get("budget") or 0.0 for record in dept_data],
-        total_budget=sum(record.get("budget") or 0.0 for record in dept_data),
-        avg_budget=sum(record.get("budget") or 0.0 for record in dept_data)
-        / len(dept_data),
+        department=store.department_name(store.department_ids[rows[0]]),
+        years=years.tolist(),
+        budgets=budgets.tolist(),
+        total_budget=float(budgets.sum()),
+        avg_budget=float(budgets.mean()),
         growth_rate=growth_rate,
+        **growth,
     )
 
 
-@app.get("/years/{year}", response_model=YearSummary)
-async def get_year_summary(year: int):
-    """Get budget summary for a specific year"""
-    global budget_data
+def _year_summary_content(
+    store: BudgetStore, year: int, top_k: int = YEAR_TOP_K_DEFAULT
+) -> bytes:
+    """Department budgets for one year, largest first, with rank and percentile"""
+    # Precomputed at load in rank order
+    rows = store.ranked_year_rows(year)
+
+    if not len(rows):
+        raise HTTPException(status_code=404, detail=f"No data found for year {year}")
 
-    if budget_data is None:
-        raise HTTPException(status_code=500, detail="Budget data not loaded")
+    departments = store.to_json_objects(
+        rows, fields=("name", "budget", "rank", "percentile")
+    )
 
-    year_data = [record for record in budget_data if record.get("year") == float(year)]
+    # Same fields and order as YearSummary
+    template = '{"year":%d,"total_budget":%r,"departments":%s,"top_departments":%s}'
+    body = template % (
+        year,
+        store.year_total(year),
+        _json_array(departments),
+        _json_array(departments[:top_k]),
+    )
+    return body.encode("utf-8")
 
-    if not year_data:
-        raise HTTPException(status_code=404, detail=f"No data found for year {year}")
 
-    # Sort by budget descending
-    year_data = sorted(year_data, key=lambda x: x.get("budget") or 0.0, reverse=True)
+@app.get("/matrix", response_model=BudgetMatrix)
+async def get_budget_matrix(
+    request: Request,
+    department: Optional[str] = Query(
+        None, description="Only departments matching this name (partial match)"
+    ),
+    min_year: Optional[int] = Query(None, description="First year to include"),
+    max_year: Optional[int] = Query(None, description="Last year to include"),
+):
+    """Get budgets as a dense department x year matrix with axis labels"""
+    store = _require_budget_store()
+
+    def build():
+        departments, years, values = store.matrix_slice(
+            department=department, min_year=min_year, max_year=max_year
+        )
+        return _json_bytes(
+            {
+                "departments": list(departments),
+                "years": years.tolist(),
+                "values": _nullable(values),
+            }
+        )
+
+    return _cached_response(
+        request,
+        store,
+        build,
+        department=department,
+        min_year=min_year,
+        max_year=max_year,
+    )
+
+
+@app.get("/growth", response_model=GrowthMetrics)
+async def get_growth_metrics(
+    request: Request,
+    department: Optional[str] = Query(
+        None, description="Only departments matching this name (partial match)"
+    ),
+    min_year: Optional[int] = Query(None, description="First year to include"),
+    max_year: Optional[int] = Query(None, description="Last year to include"),
+    window: Optional[List[int]] = Query(
+        None, description="CAGR window in years (repeatable)"
+    ),
+):
+    """Get YoY change, share of total and rolling CAGR for every department"""
+    store = _require_budget_store()
+
+    windows = tuple(sorted(set(window))) if window else GROWTH_CAGR_WINDOWS
+    if any(w < 1 or w > MAX_CAGR_WINDOW for w in windows):
+        raise HTTPException(
+            status_code=422,
+            detail=f"CAGR windows must be between 1 and {MAX_CAGR_WINDOW} years",
+        )
+
+    def build():
+        departments, years, metrics = store.growth_slice(
+            department=department,
+            min_year=min_year,
+            max_year=max_year,
+            windows=windows,
+        )
+        return _json_bytes(
+            {
+                "departments": list(departments),
+                "years": years.tolist(),
+                "budget": _nullable(metrics["budget"]),
+                "yoy_change": _nullable(metrics["yoy_change"]),
+                "yoy_percent": _nullable(metrics["yoy_percent"]),
+                "share_of_total": _nullable(metrics["share_of_total"]),
+                "cagr": {str(w): _nullable(metrics[f"cagr_{w}"]) for w in windows},
+            }
+        )
+
+    return _cached_response(
+        request,
+        store,
+        build,
+        department=department,
+        min_year=min_year,
+        max_year=max_year,
+        windows=windows,
+    )
+
+
+def _comparison_content(
+    year_a: int,
+    year_b: int,
+    names: Iterable[str],
+    budgets_a: np.ndarray,
+    budgets_b: np.ndarray,
+    total_a: float,
+    total_b: float,
+    department: Optional[str] = None,
+    allocations: Optional[np.ndarray] = None,
+) -> dict:
+    """Aligned budgets of two years with absolute and percentage changes"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = budgets_b - budgets_a
+        change_percent = np.where(budgets_a > 0, change / budgets_a * 100, np.nan)
+
+    columns = {
+        "name": names,
+        "budget_a": budgets_a.tolist(),
+        "budget_b": budgets_b.tolist(),
+        "change": change.tolist(),
+        "change_percent": _nullable(change_percent),
+    }
+    if allocations is not None:
+        columns["allocation_percentage"] = allocations.tolist()
+    items = [dict(zip(columns, values)) for values in zip(*columns.values())]
 
-    departments = []
-    for record in year_data:
-        departments.append(
-            {"name": record.get("name", ""), "budget": record.get("budget") or 0.0}
+    total_change = total_b - total_a
+    return {
+        "department": department,
+        "year_a": year_a,
+        "year_b": year_b,
+        "total_a": total_a,
+        "total_b": total_b,
+        "change": total_change,
+        "change_percent": total_change / total_a * 100 if total_a > 0 else None,
+        "items": items,
+    }
+
+
+@app.get("/compare", response_model=BudgetComparison)
+async def compare_years(
+    request: Request,
+    year_a: int = Query(..., description="Base year"),
+    year_b: int = Query(..., description="Year compared against the base year"),
+    department: Optional[str] = Query(
+        None, description="Only departments matching this name (partial match)"
+    ),
+):
+    """Compare per-department budgets of two years, aligned by department"""
+    store = _require_budget_store()
+
+    def build():
+        if not len(store.year_rows(year_a)) and not len(store.year_rows(year_b)):
+            raise HTTPException(
+                status_code=404, detail=f"No data found for years {year_a} and {year_b}"
+            )
+        names, budgets_a, budgets_b = store.compare_years(
+            year_a, year_b, department=department
+        )
+        return _json_bytes(
+            _comparison_content(
+                year_a,
+                year_b,
+                names,
+                budgets_a,
+                budgets_b,
+                float(budgets_a.sum()),
+                float(budgets_b.sum()),
+            )
         )
 
-    return YearSummary(
+    return _cached_response(
+        request,
+        store,
+        build,
+        year_a=year_a,
+        year_b=year_b,
+        department=department,
+    )
+
+
+@app.get("/summary", response_model=BudgetSummary)
+async def get_summary(request: Request):
+    """Get overall budget data summary"""
+    store = _require_budget_store()
+    return _cached_response(request, store, lambda: _summary_content(store))
+
+
+@app.get("/departments", response_model=List[str])
+async def get_departments(request: Request):
+    """Get list of all departments"""
+    store = _require_budget_store()
+    return _cached_response(request, store, lambda: _departments_content(store))
+
+
+@app.get("/trends/{department}", response_model=DepartmentTrend)
+async def get_department_trend(request: Request, department: str):
+    """Get budget trend for a specific department"""
+    store = _require_budget_store()
+    return _cached_response(
+        request,
+        store,
+        lambda: _department_trend_content(store, department),
+        department=department,
+    )
+
+
+@app.get("/years/{year}", response_model=YearSummary)
+async def get_year_summary(
+    request: Request,
+    year: int,
+    top_k: int = Query(
+        YEAR_TOP_K_DEFAULT,
+        ge=1,
+        le=1000,
+        description="Number of departments in top_departments",
+    ),
+):
+    """Get budget summary for a specific year"""
+    store = _require_budget_store()
+    return _cached_response(
+        request,
+        store,
+        lambda: _year_summary_content(store, year, top_k),
         year=year,
-        total_budget=sum(record.get("budget") or 0.0 for record in year_data),
-        departments=departments,
-        top_departments=departments[:10],  # Top 10 departments
+        top_k=top_k,
     )
 
 
@@ -404,20 +1302,14 @@ async def search_departments(
     limit: int = Query(10, le=50, description="Limit number of results"),
 ):
     """Search departments by name"""
-    global budget_data
-
-    if budget_data is None:
-        raise HTTPException(status_code=500, detail="Budget data not loaded")
+    store = _require_budget_store()
 
     # Search in department names
-    matching_depts = [
-        record.get("name")
-        for record in budget_data
-        if record.get("name") and q.lower() in record.get("name", "").lower()
+    unique_depts = [
+        store.department_name(dept_id)
+        for dept_id in store.matching_department_ids(q).tolist()
     ]
 
-    unique_depts = list(set(matching_depts))
-
     return {
         "query": q,
         "results": unique_depts[:limit],
@@ -426,16 +1318,13 @@ async def search_departments(
 
 
 # New PostgreSQL drill-down endpoints
-@app.get("/drill-down/{department}", response_model=DepartmentDetail)
-async def get_department_drill_down(
+async def _department_drill_down(
+    db: Optional[AsyncSession],
+    store: Optional[BudgetStore],
     department: str,
-    year: Optional[int] = Query(None, description="Year for budget data"),
-    db: Session = Depends(get_db),
-):
-    """
-    Get sub-department breakdown for a specific department
-    Combines PostgreSQL sub-department data with Cloud Storage main department data
-    """
+    year: Optional[int],
+) -> DepartmentDetail:
+    """Sub-department breakdown with amounts derived from the main budget"""
     # Check if database is available
     if db is None:
         raise HTTPException(
@@ -443,28 +1332,25 @@ async def get_department_drill_down(
             detail="database not available. Please start the database.",
         )
 
-    # Find department in PostgreSQL
-    dept = get_department_by_name(db, department)
+    # Department, sub-departments and the year's budgets in a fixed number
+    # of queries (no lazy load per sub-department)
+    dept = await _db_query(
+        get_department_with_sub_departments_async(db, department, year)
+    )
     if not dept:
         raise HTTPException(
             status_code=404,
             detail=f"Department '{department}' not found in drill-down database",
         )
 
-    # Get sub-departments with optional budget data
-    sub_depts = get_sub_departments_by_department(db, dept.id, year)
+    sub_depts = dept.sub_departments
 
     # Get main department budget from Cloud Storage data (if available)
     main_budget = None
-    if budget_data is not None and year:
-        dept_records = [
-            record
-            for record in budget_data
-            if record.get("name") == department and record.get("year") == float(year)
-        ]
-        if dept_records:
-            budget_value = dept_records[0].get("budget")
-            main_budget = float(budget_value) if budget_value is not None else 0.0
+    if store is not None and year:
+        row = store.find_row(department, year)
+        if row is not None:
+            main_budget = float(store.budgets[row])
 
     # Convert to response models
     sub_dept_models = []
@@ -476,12 +1362,11 @@ async def get_department_drill_down(
         if main_budget:
             # Calculate from allocation percentage (this is the correct approach)
             budget_amount = main_budget * float(sub_dept.allocation_percentage) / 100.0
-            # Try to get notes from stored budget allocations
-            if hasattr(sub_dept, "budget_allocations") and sub_dept.budget_allocations:
-                for budget in sub_dept.budget_allocations:
-                    if budget.year == year:
-                        notes = budget.notes  # Keep notes but calculate amount
-                        break
+            # Keep notes from the stored allocation but calculate the amount;
+            # only the requested year's allocation rows are loaded
+            allocation = next(iter(sub_dept.budget_allocations), None)
+            if allocation is not None:
+                notes = allocation.notes
 
         sub_dept_models.append(
             SubDepartment(
@@ -506,9 +1391,85 @@ async def get_department_drill_down(
     )
 
 
+@app.get("/drill-down/{department}", response_model=DepartmentDetail)
+async def get_department_drill_down(
+    department: str,
+    year: Optional[int] = Query(None, description="Year for budget data"),
+    db: Optional[AsyncSession] = Depends(get_async_db),
+):
+    """
+    Get sub-department breakdown for a specific department
+    Combines PostgreSQL sub-department data with Cloud Storage main department data
+    """
+    return await _department_drill_down(db, budget_store, department, year)
+
+
+@app.get("/drill-down/compare/{department}", response_model=BudgetComparison)
+async def compare_drill_down_years(
+    department: str,
+    year_a: int = Query(..., description="Base year"),
+    year_b: int = Query(..., description="Year compared against the base year"),
+    db: Optional[AsyncSession] = Depends(get_async_db),
+):
+    """
+    Compare a department's sub-department budgets between two years
+
+    Sub-department amounts are the main budget of each year split by the
+    allocation percentages, computed for both years at once.
+    """
+    store = _require_budget_store()
+
+    if db is None:
+        raise HTTPException(
+            status_code=503,
+            detail="database not available. Please start the database.",
+        )
+
+    # A year without a main budget counts as 0, but with neither year there
+    # is nothing to compare
+    row_a = store.find_row(department, year_a)
+    row_b = store.find_row(department, year_b)
+    if row_a is None and row_b is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No budget data found for {department} in {year_a} or {year_b}",
+        )
+
+    dept = await _db_query(get_department_with_sub_departments_async(db, department))
+    if not dept:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Department '{department}' not found in drill-down database",
+        )
+
+    sub_depts = dept.sub_departments
+
+    def main_budget(row: Optional[int]) -> float:
+        return float(store.budgets[row]) if row is not None else 0.0
+
+    total_a, total_b = main_budget(row_a), main_budget(row_b)
+    allocations = np.array(
+        [float(sub_dept.allocation_percentage) for sub_dept in sub_depts]
+    )
+    order = np.argsort(-allocations, kind="stable")
+    allocations = allocations[order]
+
+    return _comparison_content(
+        year_a,
+        year_b,
+        [sub_depts[i].name_english for i in order.tolist()],
+        total_a * allocations / 100.0,
+        total_b * allocations / 100.0,
+        total_a,
+        total_b,
+        department=dept.name_english,
+        allocations=allocations,
+    )
+
+
 @app.get("/drill-down/analysis/{department}/{year}", response_model=DrillDownSummary)
 async def get_drill_down_analysis(
-    department: str, year: int, db: Session = Depends(get_db)
+    department: str, year: int, db: Optional[AsyncSession] = Depends(get_async_db)
 ):
     """
     Get comprehensive drill-down analysis for a department and year
@@ -522,26 +1483,20 @@ async def get_drill_down_analysis(
         )
 
     # Get main department budget from Cloud Storage data
-    if budget_data is None:
-        raise HTTPException(
-            status_code=503, detail="Cloud Storage budget data not available"
-        )
+    store = _require_budget_store()
 
-    dept_records = [
-        record
-        for record in budget_data
-        if record.get("name") == department and record.get("year") == float(year)
-    ]
-    if not dept_records:
+    row = store.find_row(department, year)
+    if row is None:
         raise HTTPException(
             status_code=404, detail=f"No budget data found for {department} in {year}"
         )
 
-    budget_value = dept_records[0].get("budget")
-    main_budget = float(budget_value) if budget_value is not None else 0.0
+    main_budget = float(store.budgets[row])
 
     # Get drill-down data from PostgreSQL
-    drill_down_data = get_budget_drill_down(db, department, year, limit=50)
+    drill_down_data = await _db_query(
+        get_budget_drill_down_async(db, department, year, limit=50)
+    )
 
     # Convert to sub-department models and calculate totals
     sub_departments = []
@@ -586,7 +1541,7 @@ async def explore_drill_down_data(
     department: Optional[str] = Query(None, description="Filter by department name"),
     year: Optional[int] = Query(None, description="Filter by year"),
     limit: int = Query(100, description="Maximum number of records"),
-    db: Session = Depends(get_db),
+    db: Optional[AsyncSession] = Depends(get_async_db),
 ):
     """
     Explore drill-down data across departments and years
@@ -599,7 +1554,9 @@ async def explore_drill_down_data(
             detail="Database not available. Please start the database.",
         )
 
-    drill_down_data = get_budget_drill_down(db, department, year, limit)
+    drill_down_data = await _db_query(
+        get_budget_drill_down_async(db, department, year, limit)
+    )
 
     return [
         BudgetDrillDown(
@@ -618,6 +1575,91 @@ async def explore_drill_down_data(
     ]
 
 
+async def _batch_query_content(
+    query: BatchQuery, store: BudgetStore, db: Optional[AsyncSession]
+) -> CachedResponse:
+    """Evaluate one batch sub-query, sharing the endpoints' response cache"""
+    if query.type in ("trend", "drill_down") and not query.department:
+        raise HTTPException(status_code=422, detail="department is required")
+    if query.type == "year" and query.year is None:
+        raise HTTPException(status_code=422, detail="year is required")
+
+    if query.type == "summary":
+        return _cached_content(store, "/summary", {}, lambda: _summary_content(store))
+    if query.type == "departments":
+        return _cached_content(
+            store, "/departments", {}, lambda: _departments_content(store)
+        )
+    if query.type == "budget":
+        params = query.model_dump(exclude={"id", "type"})
+        return _cached_content(
+            store, "/budget", params, lambda: _budget_page_content(store, **params)
+        )
+    if query.type == "year":
+        return _cached_content(
+            store,
+            "/years/{year}",
+            {"year": query.year, "top_k": YEAR_TOP_K_DEFAULT},
+            lambda: _year_summary_content(store, query.year),
+        )
+    if query.type == "trend":
+        return _cached_content(
+            store,
+            "/trends/{department}",
+            {"department": query.department},
+            lambda: _department_trend_content(store, query.department),
+        )
+    # Drill-down reads PostgreSQL, so it is not cached
+    return _serialize(
+        await _department_drill_down(db, store, query.department, query.year)
+    )
+
+
+@app.post("/batch", response_model=BatchResponse)
+async def batch_query(batch: BatchRequest):
+    """
+    Run several read queries against one dataset snapshot in a single request
+
+    Each result carries the status and body the matching endpoint would have
+    returned, so one failing sub-query does not fail the batch.
+    """
+    store = _require_budget_store()
+
+    # Only open a database session when a sub-query needs PostgreSQL
+    needs_db = any(query.type == "drill_down" for query in batch.queries)
+    db_session = asynccontextmanager(get_async_db)() if needs_db else nullcontext()
+
+    results = []
+    async with db_session as db:
+        for query in batch.queries:
+            result = {"id": query.id}
+            try:
+                content = await _batch_query_content(query, store, db)
+            except HTTPException as e:
+                result.update(status=e.status_code, error=e.detail)
+                results.append(_json_bytes(result))
+                continue
+            except Exception as e:
+                # An unexpected failure is that item's 500, not the batch's
+                logger.error(f"❌ Batch query {query.type} failed: {e}")
+                result.update(status=500, error="Internal server error")
+                results.append(_json_bytes(result))
+                continue
+
+            cursor = (content.headers or {}).get("X-Next-Cursor")
+            if cursor:
+                result["next_cursor"] = cursor
+            result["status"] = 200
+            # Splice the already-serialized body in as the "data" member
+            results.append(_json_bytes(result)[:-1] + b',"data":' + content.body + b"}")
+
+    body = b'{"dataset_version":%s,"results":[%s]}' % (
+        _json_bytes(store.stats.version),
+        b",".join(results),
+    )
+    return Response(content=body, media_type="application/json")
+
+
 if __name__ == "__main__":
     import uvicorn
 
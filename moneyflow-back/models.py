@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -30,6 +30,33 @@ class DepartmentTrend(BaseModel):
     total_budget: float
     avg_budget: float
     growth_rate: Optional[float] = None
+    yoy_change: Optional[List[Optional[float]]] = Field(
+        None,
+        description="Change from the previous entry when it is the previous year, "
+        "per entry of budgets",
+    )
+    yoy_percent: Optional[List[Optional[float]]] = Field(
+        None, description="Percentage change from the previous year"
+    )
+    share_of_total: Optional[List[Optional[float]]] = Field(
+        None, description="Percentage of that year's total budget"
+    )
+    cagr: Optional[Dict[str, List[Optional[float]]]] = Field(
+        None, description="Compound annual growth rate (%) keyed by window in years"
+    )
+
+
+class RankedDepartment(BaseModel):
+    """Department budget ranked within its year"""
+
+    name: str
+    budget: float
+    rank: Optional[int] = Field(
+        None, description="1 for the largest budget; ties share a rank"
+    )
+    percentile: Optional[float] = Field(
+        None, description="Percentage of the year's departments at or below this budget"
+    )
 
 
 class YearSummary(BaseModel):
@@ -37,8 +64,119 @@ class YearSummary(BaseModel):
 
     year: int
     total_budget: float
-    departments: List[dict]
-    top_departments: List[dict]
+    departments: List[RankedDepartment]
+    top_departments: List[RankedDepartment]
+
+
+class AggregateGroup(BaseModel):
+    """Aggregated budget metric for one group"""
+
+    key: Union[int, str] = Field(..., description="Year or department name")
+    value: float = Field(..., description="Metric value for the group")
+    count: int = Field(..., description="Number of records in the group")
+
+
+class AggregateResult(BaseModel):
+    """Budget records grouped by year or department"""
+
+    group_by: str
+    metric: str
+    groups: List[AggregateGroup]
+
+
+class BudgetMatrix(BaseModel):
+    """Department x year grid of budgets"""
+
+    departments: List[str] = Field(..., description="Row labels")
+    years: List[int] = Field(..., description="Column labels")
+    values: List[List[Optional[float]]] = Field(
+        ..., description="Summed budget per department and year, null if none"
+    )
+
+
+class GrowthMetrics(BaseModel):
+    """Precomputed growth metrics on a department x year grid"""
+
+    departments: List[str] = Field(..., description="Row labels")
+    years: List[int] = Field(..., description="Column labels")
+    budget: List[List[Optional[float]]]
+    yoy_change: List[List[Optional[float]]] = Field(
+        ..., description="Change from the previous calendar year"
+    )
+    yoy_percent: List[List[Optional[float]]] = Field(
+        ..., description="Percentage change from the previous calendar year"
+    )
+    share_of_total: List[List[Optional[float]]] = Field(
+        ..., description="Percentage of the year's total budget"
+    )
+    cagr: Dict[str, List[List[Optional[float]]]] = Field(
+        ..., description="Compound annual growth rate (%) keyed by window in years"
+    )
+
+
+class ComparisonItem(BaseModel):
+    """Budgets of one department (or sub-department) in two years"""
+
+    name: str
+    budget_a: float = Field(..., description="Budget in year_a (0 if absent)")
+    budget_b: float = Field(..., description="Budget in year_b (0 if absent)")
+    change: float = Field(..., description="budget_b - budget_a")
+    change_percent: Optional[float] = Field(
+        None, description="Change relative to budget_a, null when budget_a is 0"
+    )
+    allocation_percentage: Optional[float] = None
+
+
+class BudgetComparison(BaseModel):
+    """Aligned per-department comparison of two years"""
+
+    department: Optional[str] = Field(
+        None, description="Parent department for a sub-department comparison"
+    )
+    year_a: int
+    year_b: int
+    total_a: float
+    total_b: float
+    change: float
+    change_percent: Optional[float] = None
+    items: List[ComparisonItem]
+
+
+class BatchQuery(BaseModel):
+    """One sub-query of a batch request, mirroring a read endpoint"""
+
+    id: Optional[str] = Field(None, description="Client id echoed in the result")
+    type: Literal["summary", "departments", "budget", "year", "trend", "drill_down"]
+    year: Optional[int] = None
+    department: Optional[str] = None
+    min_budget: Optional[float] = None
+    max_budget: Optional[float] = None
+    limit: int = Field(100, ge=0, le=1000)
+    offset: int = Field(0, ge=0)
+    cursor: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    """Sub-queries evaluated together against one dataset snapshot"""
+
+    queries: List[BatchQuery] = Field(..., min_length=1, max_length=50)
+
+
+class BatchResult(BaseModel):
+    """Outcome of one sub-query: the endpoint's body or its error"""
+
+    id: Optional[str] = None
+    status: int
+    data: Optional[Any] = None
+    error: Optional[str] = None
+    next_cursor: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    """Results in request order, all from the same dataset version"""
+
+    dataset_version: str
+    results: List[BatchResult]
 
 
 class APIResponse(BaseModel):
@@ -0,0 +1,63 @@
+"""
+N-gram substring index for case-insensitive department name matching
+"""
+
+from typing import Dict, FrozenSet, Iterable, List
+
+
+class NgramIndex:
+    """
+    Case-insensitive substring index over a fixed list of names
+
+    Every name is lowercased once and split into all of its grams of length
+    1..n. A query of at least ``n`` characters is resolved by intersecting the
+    posting sets of its n-grams and verifying the few surviving candidates;
+    shorter queries are themselves a gram and resolve with a single lookup.
+    """
+
+    def __init__(self, names: Iterable[str], n: int = 3):
+        if n < 1:
+            raise ValueError("N-gram size must be at least 1")
+
+        self.n = n
+        self._names = tuple(name.lower() for name in names)
+
+        postings: Dict[str, set] = {}
+        for name_id, name in enumerate(self._names):
+            for size in range(1, n + 1):
+                for start in range(len(name) - size + 1):
+                    postings.setdefault(name[start : start + size], set()).add(name_id)
+
+        self._postings: Dict[str, FrozenSet[int]] = {
+            gram: frozenset(ids) for gram, ids in postings.items()
+        }
+        self._all_ids = [name_id for name_id, name in enumerate(self._names) if name]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def search(self, query: str) -> List[int]:
+        """Get ids of names containing ``query``, in ascending id order"""
+        query = query.lower()
+        if not query:
+            return list(self._all_ids)
+
+        if len(query) <= self.n:
+            return sorted(self._postings.get(query, ()))
+
+        grams = {
+            query[start : start + self.n] for start in range(len(query) - self.n + 1)
+        }
+        posting_sets = sorted(
+            (self._postings.get(gram, frozenset()) for gram in grams), key=len
+        )
+
+        candidates = set(posting_sets[0])
+        for posting_set in posting_sets[1:]:
+            if not candidates:
+                break
+            candidates &= posting_set
+
+        return sorted(
+            name_id for name_id in candidates if query in self._names[name_id]
+        )
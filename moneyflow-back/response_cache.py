@@ -0,0 +1,100 @@
+"""
+In-memory cache of serialized API responses keyed by dataset version
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, NamedTuple, Optional
+
+
+def make_etag(version: str, schema: Optional[str] = None) -> str:
+    """
+    Strong ETag for every response computed from one dataset version
+
+    ``schema`` (the API version) is folded in so that a deploy changing the
+    response shapes does not revalidate bodies cached under the old one.
+    """
+    return f'"{schema}-{version}"' if schema else f'"{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an ``If-None-Match`` header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class CachedResponse(NamedTuple):
+    """A serialized response body plus any headers computed with it"""
+
+    body: bytes
+    headers: Optional[Dict[str, str]] = None
+
+
+class ResponseCache:
+    """
+    LRU cache of response bodies bounded by entry count and total body bytes
+
+    Keys are expected to start with the dataset version, so entries for a
+    superseded dataset are never served and simply age out (or are dropped
+    with ``clear`` when a new version is published).
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_entries: int = 1024):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """Get a cached response and mark it most recently used"""
+        with self._lock:
+            response = self._entries.get(key)
+            if response is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, key: Hashable, response: CachedResponse):
+        """Store a response, evicting least recently used entries to fit the caps"""
+        if len(response.body) > self.max_bytes or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.body)
+
+            self._entries[key] = response
+            self._size += len(response.body)
+
+            while self._size > self.max_bytes or len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+
+    def clear(self):
+        """Drop every cached body"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
@@ -0,0 +1,582 @@
+import json
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from budget_store import BudgetStore, BudgetStoreBuilder, DatasetStats
+
+SAMPLE_RECORDS = [
+    {"year": 2019.0, "name": "Education", "budget": 100.0},
+    {"year": 2020.0, "name": "Education", "budget": 120.0},
+    {"year": 2019.0, "name": "Health", "budget": None},
+    {"year": 2020.0, "name": "Health", "budget": 80.5},
+    {"year": 2020.0, "name": "Defense", "budget": ""},
+]
+
+
+@pytest.fixture
+def store():
+    return BudgetStore.from_records(SAMPLE_RECORDS)
+
+
+@pytest.mark.api
+class TestBudgetStoreConstruction:
+    """Test building the columnar store from JSON records"""
+
+    def test_columns_are_typed(self, store):
+        """Test that columns use compact NumPy dtypes"""
+        assert len(store) == 5
+        assert store.years.dtype == np.int32
+        assert store.budgets.dtype == np.float64
+        assert store.department_ids.dtype == np.int32
+
+    def test_department_names_are_interned(self, store):
+        """Test that each distinct name is stored once"""
+        assert store.department_names == ("Education", "Health", "Defense")
+        assert store.department_ids.tolist() == [0, 0, 1, 1, 2]
+
+    def test_missing_budgets_become_zero(self, store):
+        """Test that null and empty budgets are normalized to 0"""
+        assert store.budgets.tolist() == [100.0, 120.0, 0.0, 80.5, 0.0]
+
+    def test_columns_are_read_only(self, store):
+        """Test that shared columns cannot be mutated in place"""
+        with pytest.raises(ValueError):
+            store.budgets[0] = 1.0
+
+    def test_mismatched_columns_rejected(self):
+        """Test that column lengths must agree"""
+        with pytest.raises(ValueError):
+            BudgetStore([2020], [1.0, 2.0], [0], ["Education"])
+
+    def test_builder_matches_from_records(self, store):
+        """Test that records added one at a time build the same store"""
+        builder = BudgetStoreBuilder()
+        for record in SAMPLE_RECORDS:
+            builder.add(record)
+
+        assert len(builder) == 5
+        assert builder.build().stats == store.stats
+
+    def test_builder_rejects_non_objects(self):
+        """Test that array elements must be record objects"""
+        with pytest.raises(ValueError):
+            BudgetStoreBuilder().add([2020, "Education", 1.0])
+
+
+@pytest.mark.api
+class TestBudgetStoreQueries:
+    """Test row lookups and filters"""
+
+    def test_filter_rows_by_year(self, store):
+        """Test filtering rows by year"""
+        assert store.filter_rows(year=2020).tolist() == [1, 3, 4]
+
+    def test_filter_rows_by_department(self, store):
+        """Test case-insensitive partial department matching"""
+        assert store.filter_rows(department="EDU").tolist() == [0, 1]
+
+    def test_filter_rows_by_budget_range(self, store):
+        """Test min/max budget filters"""
+        rows = store.filter_rows(min_budget=80.5, max_budget=110.0)
+        assert rows.tolist() == [0, 3]
+
+    def test_filter_rows_combined(self, store):
+        """Test that filters are intersected"""
+        rows = store.filter_rows(year=2020, department="h", min_budget=50.0)
+        assert rows.tolist() == [3]
+
+    def test_find_row(self, store):
+        """Test exact department/year lookup"""
+        assert store.find_row("Health", 2020) == 3
+        assert store.find_row("Health", 2021) is None
+        assert store.find_row("health", 2020) is None
+
+    def test_find_row_keeps_first_duplicate(self):
+        """Test the first row wins for a repeated department and year"""
+        store = BudgetStore.from_records(
+            [
+                {"year": 2021, "name": "Health", "budget": 1.0},
+                {"year": 2020, "name": "Health", "budget": 2.0},
+                {"year": 2020, "name": "Health", "budget": 3.0},
+                {"year": None, "name": "Health", "budget": 4.0},
+            ]
+        )
+        assert store.find_row("Health", 2020) == 1
+        assert store.find_row("Health", 0) == 3
+        assert store.find_row("Health", 2020 + 2**32) is None
+
+    def test_year_index(self, store):
+        """Test the year -> rows index"""
+        assert store.year_rows(2019).tolist() == [0, 2]
+        assert store.year_rows(2030).tolist() == []
+
+    def test_department_index(self, store):
+        """Test the department -> rows index"""
+        assert store.department_rows(1).tolist() == [2, 3]
+        assert store.rows_for_departments([2, 0]).tolist() == [0, 1, 4]
+        assert store.rows_for_departments([]).tolist() == []
+
+    def test_budget_range_rows(self, store):
+        """Test binary-searched budget ranges are inclusive and in dataset order"""
+        assert store.budget_range_rows(80.5, 120.0).tolist() == [0, 1, 3]
+        assert store.budget_range_rows(min_budget=100.0).tolist() == [0, 1]
+        assert store.budget_range_rows(max_budget=0.0).tolist() == [2, 4]
+        assert store.budget_range_rows(200.0, 100.0).tolist() == []
+
+    def test_filter_rows_budget_range_most_selective(self, store):
+        """Test a narrow budget range intersected with wider index hits"""
+        rows = store.filter_rows(year=2020, department="e", min_budget=100.0)
+        assert rows.tolist() == [1]
+
+    def test_filter_rows_no_matches(self, store):
+        """Test that an empty index hit short-circuits the filters"""
+        assert store.filter_rows(year=2030, department="edu").tolist() == []
+        assert store.filter_rows(department="nothing").tolist() == []
+        assert store.filter_rows(year=2020, min_budget=1000.0).tolist() == []
+
+    @pytest.mark.parametrize(
+        "filters",
+        [
+            {},
+            {"year": 2020},
+            {"department": "e"},
+            {"min_budget": 50.0},
+            {"year": 2020, "department": "h", "max_budget": 100.0},
+            {"year": 2030},
+        ],
+    )
+    def test_page_rows_walks_filtered_rows(self, store, filters):
+        """Test keyset pages concatenate to the full filtered result"""
+        expected = store.filter_rows(**filters).tolist()
+        for limit in (1, 2, 10):
+            pages, after = [], -1
+            while True:
+                page = store.page_rows(limit, after=after, **filters).tolist()
+                assert len(page) <= limit
+                if not page:
+                    break
+                pages.extend(page)
+                after = page[-1]
+            assert pages == expected
+
+    def test_page_rows_sort_candidates_once(self, store):
+        """Test that later pages reuse the sorted candidate set"""
+        first = store.page_rows(1, min_budget=0.0)
+        with patch("budget_store.np.sort") as mock_sort:
+            second = store.page_rows(1, after=int(first[-1]), min_budget=0.0)
+            store.page_rows(1, after=int(second[-1]), min_budget=0.0)
+        mock_sort.assert_not_called()
+        assert second.tolist() == [1]
+
+    def test_candidate_cache_is_bounded(self, store):
+        """Test that least recently used candidate sets are dropped"""
+        with patch.object(BudgetStore, "CANDIDATE_CACHE_SIZE", 2):
+            for min_budget in (0.0, 80.0, 100.0):
+                store.budget_range_rows(min_budget=min_budget)
+        assert len(store._candidates) == 2
+
+    def test_page_rows_empty_limit(self, store):
+        """Test that a non-positive limit returns no rows"""
+        assert store.page_rows(0).tolist() == []
+
+    def test_to_json_objects_matches_json_dumps(self):
+        """Test the serialization fast path against json.dumps of the records"""
+        store = BudgetStore.from_records(
+            [
+                {"year": 2020, "name": 'განათლება "ministry"', "budget": 0.1},
+                {"year": 2021, "name": None, "budget": 1e21},
+            ]
+        )
+        expected = [
+            json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+            for record in store.to_records([0, 1])
+        ]
+        assert store.to_json_objects([0, 1]) == expected
+        assert store.to_json_objects([1], fields=("name", "budget")) == [
+            '{"name":"","budget":1e+21}'
+        ]
+
+    def test_to_records(self, store):
+        """Test materializing rows back into dicts"""
+        assert store.to_records([3, 0]) == [
+            {"year": 2020, "budget": 80.5, "name": "Health"},
+            {"year": 2019, "budget": 100.0, "name": "Education"},
+        ]
+
+
+@pytest.mark.api
+class TestAggregation:
+    """Test vectorized group-by aggregation"""
+
+    @pytest.mark.parametrize(
+        "metric,expected",
+        [
+            ("sum", [100.0, 200.5]),
+            ("mean", [50.0, 200.5 / 3]),
+            ("min", [0.0, 0.0]),
+            ("max", [100.0, 120.0]),
+            ("count", [2.0, 3.0]),
+        ],
+    )
+    def test_group_by_year(self, store, metric, expected):
+        """Test each metric grouped by year"""
+        keys, values, counts = store.aggregate(np.arange(len(store)), "year", metric)
+        assert keys.tolist() == [2019, 2020]
+        assert values.tolist() == pytest.approx(expected)
+        assert counts.tolist() == [2, 3]
+
+    def test_group_by_department(self, store):
+        """Test grouping by department id over a subset of rows"""
+        keys, values, counts = store.aggregate([1, 3, 4, 0], "department", "max")
+        assert keys.tolist() == [0, 1, 2]
+        assert values.tolist() == [120.0, 80.5, 0.0]
+        assert counts.tolist() == [2, 1, 1]
+
+    def test_empty_rows(self, store):
+        """Test that aggregating nothing returns empty groups"""
+        keys, values, counts = store.aggregate([], "year", "min")
+        assert len(keys) == len(values) == len(counts) == 0
+
+    def test_unknown_metric(self, store):
+        """Test that unsupported groupings and metrics are rejected"""
+        with pytest.raises(ValueError):
+            store.aggregate([0], "year", "median")
+        with pytest.raises(ValueError):
+            store.aggregate([0], "name", "sum")
+
+
+@pytest.mark.api
+class TestYearRankings:
+    """Test per-year rankings precomputed at load"""
+
+    def test_ranked_year_rows(self, store):
+        """Test rows come largest budget first and top_k slices them"""
+        ranked = store.ranked_year_rows(2020)
+        assert store.budgets[ranked].tolist() == [120.0, 80.5, 0.0]
+        assert store.ranked_year_rows(2020, top_k=1).tolist() == ranked[:1].tolist()
+        assert store.ranked_year_rows(1999).tolist() == []
+
+    def test_rank_and_percentile(self):
+        """Test ties share the best rank and percentile counts rows at or below"""
+        store = BudgetStore.from_records(
+            [
+                {"year": 2020, "name": "A", "budget": 5.0},
+                {"year": 2021, "name": "A", "budget": 1.0},
+                {"year": 2020, "name": "B", "budget": 9.0},
+                {"year": 2020, "name": "C", "budget": 5.0},
+            ]
+        )
+        assert store.year_rank.tolist() == [2, 1, 1, 2]
+        assert store.year_percentile.tolist() == [
+            pytest.approx(200 / 3),
+            100.0,
+            100.0,
+            pytest.approx(200 / 3),
+        ]
+        assert store.year_total(2020) == 19.0
+        assert store.year_total(1999) == 0.0
+
+    def test_ranked_json_fields(self, store):
+        """Test rank and percentile serialize like the other columns"""
+        row = int(store.ranked_year_rows(2019)[0])
+        assert json.loads(
+            store.to_json_objects([row], fields=("rank", "percentile"))[0]
+        ) == {
+            "rank": 1,
+            "percentile": 100.0,
+        }
+
+
+@pytest.mark.api
+class TestBudgetMatrix:
+    """Test the precomputed department x year matrix"""
+
+    def test_matrix_axes_and_values(self, store):
+        """Test rows are sorted names, columns years, gaps NaN"""
+        assert store.matrix_departments == ("Defense", "Education", "Health")
+        assert store.matrix_years.tolist() == [2019, 2020]
+        np.testing.assert_array_equal(
+            store.matrix, [[np.nan, 0.0], [100.0, 120.0], [0.0, 80.5]]
+        )
+        assert not store.matrix.flags.writeable
+
+    def test_duplicate_cells_are_summed(self):
+        """Test several records for one department and year add up"""
+        store = BudgetStore.from_records(
+            [
+                {"year": 2020, "name": "Health", "budget": 1.0},
+                {"year": 2020, "name": "Health", "budget": 2.5},
+            ]
+        )
+        assert store.matrix.tolist() == [[3.5]]
+
+    def test_records_without_year_are_excluded(self):
+        """Test year 0 records get no matrix column"""
+        store = BudgetStore.from_records(
+            [
+                {"year": None, "name": "Health", "budget": 5.0},
+                {"year": 2020, "name": "Health", "budget": 2.5},
+            ]
+        )
+        assert store.matrix_years.tolist() == [2020]
+        assert store.matrix.tolist() == [[2.5]]
+
+    def test_matrix_slice(self, store):
+        """Test slicing by department match and year range"""
+        departments, years, values = store.matrix_slice(
+            department="e", min_year=2020, max_year=2030
+        )
+        assert departments == ("Defense", "Education", "Health")
+        assert years.tolist() == [2020]
+        assert values.tolist() == [[0.0], [120.0], [80.5]]
+
+        departments, years, values = store.matrix_slice(department="health")
+        assert departments == ("Health",)
+        assert values.shape == (1, 2)
+
+        _, years, values = store.matrix_slice(min_year=2021)
+        assert years.tolist() == []
+        assert values.shape == (3, 0)
+
+    def test_compare_years(self, store):
+        """Test two matrix columns aligned per department, absent as zero"""
+        departments, budgets_a, budgets_b = store.compare_years(2019, 2020)
+        assert departments == ("Education", "Health", "Defense")
+        assert budgets_a.tolist() == [100.0, 0.0, 0.0]
+        assert budgets_b.tolist() == [120.0, 80.5, 0.0]
+
+        departments, budgets_a, budgets_b = store.compare_years(2018, 2019, "health")
+        assert departments == ("Health",)
+        assert (budgets_a.tolist(), budgets_b.tolist()) == ([0.0], [0.0])
+
+
+@pytest.mark.api
+class TestGrowthMetrics:
+    """Test growth metrics precomputed over the matrix"""
+
+    @pytest.fixture
+    def growth_store(self):
+        return BudgetStore.from_records(
+            [
+                {"year": 2017, "name": "Health", "budget": 100.0},
+                {"year": 2018, "name": "Health", "budget": 110.0},
+                {"year": 2020, "name": "Health", "budget": 121.0},
+                {"year": 2017, "name": "Roads", "budget": 0.0},
+                {"year": 2018, "name": "Roads", "budget": 90.0},
+                {"year": 2020, "name": "Roads", "budget": 79.0},
+            ]
+        )
+
+    def test_year_over_year(self, growth_store):
+        """Test YoY only compares consecutive calendar years"""
+        assert growth_store.matrix_years.tolist() == [2017, 2018, 2020]
+        np.testing.assert_allclose(
+            growth_store.yoy_change, [[np.nan, 10.0, np.nan], [np.nan, 90.0, np.nan]]
+        )
+        # Growth from a zero budget has no percentage
+        np.testing.assert_allclose(
+            growth_store.yoy_percent,
+            [[np.nan, 10.0, np.nan], [np.nan, np.nan, np.nan]],
+        )
+        assert not growth_store.yoy_percent.flags.writeable
+
+    def test_share_of_total(self, growth_store):
+        """Test each cell as a percentage of its year's total"""
+        np.testing.assert_allclose(
+            growth_store.share_of_total,
+            [[100.0, 55.0, 60.5], [0.0, 45.0, 39.5]],
+        )
+
+    def test_cagr_windows(self, growth_store):
+        """Test rolling CAGR over calendar-year windows"""
+        np.testing.assert_allclose(
+            growth_store.cagr(2),
+            [[np.nan, np.nan, 4.880885], [np.nan, np.nan, -6.310205]],
+            rtol=1e-6,
+        )
+        np.testing.assert_allclose(
+            growth_store.cagr(3)[0], [np.nan, np.nan, 6.560224], rtol=1e-6
+        )
+        assert growth_store.cagr(2) is growth_store.cagr(2)
+        with pytest.raises(ValueError):
+            growth_store.cagr(0)
+
+    def test_configured_windows_are_precomputed(self):
+        """Test windows passed in replace the defaults and are validated"""
+        store = BudgetStore.from_records(SAMPLE_RECORDS, cagr_windows=(1, 2))
+        assert store.cagr_windows == (1, 2)
+        assert sorted(store._cagr) == [1, 2]
+        assert set(store.growth_slice()[2]) >= {"cagr_1", "cagr_2"}
+
+        with pytest.raises(ValueError):
+            BudgetStore.from_records(SAMPLE_RECORDS, cagr_windows=(0,))
+
+    def test_series_growth_is_per_row(self):
+        """Test repeated years are measured per row, not as summed cells"""
+        store = BudgetStore.from_records(
+            [
+                {"year": 2019, "name": "Health", "budget": 50.0},
+                {"year": 2020, "name": "Health", "budget": 60.0},
+                {"year": 2020, "name": "Health", "budget": 20.0},
+                {"year": 2020, "name": "Roads", "budget": 20.0},
+                {"year": None, "name": "Health", "budget": 5.0},
+            ]
+        )
+        metrics = store.series_growth([4, 0, 1, 2])
+        np.testing.assert_allclose(
+            metrics["yoy_change"], [np.nan, np.nan, 10.0, np.nan]
+        )
+        np.testing.assert_allclose(
+            metrics["yoy_percent"], [np.nan, np.nan, 20.0, np.nan]
+        )
+        np.testing.assert_allclose(
+            metrics["share_of_total"], [np.nan, 100.0, 60.0, 20.0]
+        )
+
+    def test_series_cagr_matches_matrix(self, growth_store):
+        """Test per-row CAGR over calendar-year windows"""
+        rows = growth_store.department_rows(0)
+        np.testing.assert_allclose(
+            growth_store.series_cagr(rows, 2), [np.nan, np.nan, 4.880885], rtol=1e-6
+        )
+        np.testing.assert_allclose(
+            growth_store.series_cagr(rows, 3), growth_store.cagr(3)[0], rtol=1e-6
+        )
+        with pytest.raises(ValueError):
+            growth_store.series_cagr(rows, 0)
+
+    def test_series_cagr_repeated_year(self):
+        """Test only the first row of a repeated year gets a CAGR"""
+        store = BudgetStore.from_records(
+            [
+                {"year": 2018, "name": "Health", "budget": 100.0},
+                {"year": 2019, "name": "Health", "budget": 50.0},
+                {"year": 2020, "name": "Health", "budget": 121.0},
+                {"year": 2020, "name": "Health", "budget": 10.0},
+            ]
+        )
+        values = store.series_cagr([0, 1, 2, 3], 2)
+        np.testing.assert_allclose(values, [np.nan, np.nan, 10.0, np.nan])
+        assert store.series_cagr([], 2).tolist() == []
+
+    def test_growth_slice(self, growth_store):
+        """Test slicing metrics keeps look-back outside the year range"""
+        departments, years, metrics = growth_store.growth_slice(
+            department="health", min_year=2020, windows=[3]
+        )
+        assert departments == ("Health",)
+        assert years.tolist() == [2020]
+        assert set(metrics) == {
+            "budget",
+            "yoy_change",
+            "yoy_percent",
+            "share_of_total",
+            "cagr_3",
+        }
+        assert metrics["budget"].tolist() == [[121.0]]
+        assert metrics["cagr_3"][0, 0] == pytest.approx(6.560224)
+
+
+@pytest.mark.api
+class TestDatasetStats:
+    """Test the precomputed dataset statistics snapshot"""
+
+    def test_stats_values(self, store):
+        """Test statistics computed at load time"""
+        stats = store.stats
+        assert stats.records == 5
+        assert stats.year_range == (2019, 2020)
+        assert stats.departments == ("Defense", "Education", "Health")
+        assert stats.departments_count == 3
+        assert stats.total_budget == pytest.approx(300.5)
+        assert stats.is_complete
+
+    def test_stats_are_immutable(self, store):
+        """Test that the snapshot cannot be modified"""
+        with pytest.raises(AttributeError):
+            store.stats.records = 0
+
+    def test_content_hash_tracks_content(self, store):
+        """Test that identical data hashes identically and changes are detected"""
+        same = BudgetStore.from_records(SAMPLE_RECORDS)
+        changed = BudgetStore.from_records(SAMPLE_RECORDS[:-1])
+        assert same.stats.content_hash == store.stats.content_hash
+        assert changed.stats.content_hash != store.stats.content_hash
+
+    def test_version_defaults_to_hash_prefix(self, store):
+        """Test version defaults to the content hash unless given explicitly"""
+        assert store.stats.version == store.stats.content_hash[:16]
+        versioned = BudgetStore.from_records(SAMPLE_RECORDS, version="42")
+        assert versioned.stats.version == "42"
+
+    def test_incomplete_dataset(self):
+        """Test stats for a dataset without years or names"""
+        stats = DatasetStats.from_store(BudgetStore.from_records([{"budget": 1.0}]))
+        assert stats.year_range is None
+        assert not stats.is_complete
+
+
+@pytest.mark.api
+class TestColumnarArtifact:
+    """Test the memory-mapped .npz dataset artifact"""
+
+    def test_round_trip_is_memory_mapped(self, store, tmp_path):
+        """Test that columns are mapped from the file rather than copied"""
+        path = str(tmp_path / "georgian_budget.npz")
+        store.save_npz(path)
+
+        loaded = BudgetStore.from_npz(path, version="7")
+
+        assert isinstance(loaded.years.base, np.memmap)
+        assert isinstance(loaded.budgets.base, np.memmap)
+        assert loaded.department_names == store.department_names
+        assert loaded.to_records(range(len(store))) == store.to_records(
+            range(len(store))
+        )
+        assert loaded.stats.content_hash == store.stats.content_hash
+        assert loaded.stats.version == "7"
+
+    def test_round_trip_without_mmap(self, store, tmp_path):
+        """Test loading the artifact fully into memory"""
+        path = str(tmp_path / "georgian_budget.npz")
+        store.save_npz(path)
+
+        loaded = BudgetStore.from_npz(path, mmap=False)
+
+        assert loaded.stats.content_hash == store.stats.content_hash
+
+    def test_rejects_compressed_members(self, store, tmp_path):
+        """Test that compressed archives cannot be memory-mapped"""
+        path = str(tmp_path / "compressed.npz")
+        np.savez_compressed(
+            path,
+            format_version=np.array(1),
+            year=store.years,
+            budget=store.budgets,
+            department_id=store.department_ids,
+            department_name=np.array(store.department_names),
+        )
+
+        with pytest.raises(ValueError):
+            BudgetStore.from_npz(path)
+
+    def test_rejects_unknown_format(self, store, tmp_path):
+        """Test that artifacts with a different layout version are refused"""
+        path = str(tmp_path / "future.npz")
+        np.savez(path, format_version=np.array(99), year=store.years)
+
+        with pytest.raises(ValueError, match="Unsupported"):
+            BudgetStore.from_npz(path)
+
+    def test_rejects_non_zip_files(self, tmp_path):
+        """Test that corrupt downloads are reported as ValueError"""
+        path = tmp_path / "corrupt.npz"
+        path.write_bytes(b"not a zip")
+
+        with pytest.raises(ValueError):
+            BudgetStore.from_npz(str(path))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
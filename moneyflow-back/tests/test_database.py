@@ -1,13 +1,33 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+import os
+import sqlite3
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from database import (
+    Base,
+    Department,
+    SubDepartment,
+    SubDepartmentBudget,
+    WaitTimedQueuePool,
+    _async_database_url,
+    _budget_drill_down_query,
+    explain_budget_drill_down,
+    get_async_db,
+    get_budget_drill_down_async,
     get_db,
     get_department_by_name,
+    get_department_with_sub_departments,
+    get_department_with_sub_departments_async,
     get_sub_departments_by_department,
+    pool_stats,
     test_connection,
 )
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
 
 
 @pytest.mark.api
@@ -215,5 +235,226 @@ class TestDatabaseTransactionHandling:
         mock_session.close.assert_called_once()
 
 
+@pytest.mark.api
+class TestAsyncDatabase:
+    """Test the async session path used by request handlers"""
+
+    def test_async_database_url(self):
+        """Test plain PostgreSQL URLs are switched to the asyncpg driver"""
+        assert (
+            _async_database_url("postgresql://u:p@db:5432/budget")
+            == "postgresql+asyncpg://u:p@db:5432/budget"
+        )
+        assert _async_database_url("postgres://db/budget") == (
+            "postgresql+asyncpg://db/budget"
+        )
+        assert _async_database_url("sqlite+aiosqlite://") == "sqlite+aiosqlite://"
+
+    @patch("database.AsyncSessionLocal")
+    def test_get_async_db(self, mock_session_local):
+        """Test the session is yielded and closed afterwards"""
+        mock_session = AsyncMock()
+        mock_session_local.return_value = mock_session
+
+        async def use_session():
+            db_gen = get_async_db()
+            db = await db_gen.__anext__()
+            with pytest.raises(StopAsyncIteration):
+                await db_gen.__anext__()
+            return db
+
+        assert asyncio.run(use_session()) is mock_session
+        mock_session.close.assert_awaited_once()
+
+    def test_async_queries(self):
+        """Test async query helpers await the session and unwrap results"""
+        mock_db = AsyncMock()
+        result = mock_db.execute.return_value
+        result.scalars = MagicMock()
+        result.scalars.return_value.first.return_value = "department"
+        result.all = MagicMock(return_value=["row"])
+
+        async def run_queries():
+            return (
+                await get_department_with_sub_departments_async(
+                    mock_db, "Health", 2020
+                ),
+                await get_budget_drill_down_async(mock_db, "Health", 2020),
+            )
+
+        assert asyncio.run(run_queries()) == ("department", ["row"])
+        assert mock_db.execute.await_count == 2
+
+    def test_budget_drill_down_query(self):
+        """Test filters and limit in the shared drill-down statement"""
+        sql = str(
+            _budget_drill_down_query("Health", 2020, limit=5).compile(
+                dialect=postgresql.dialect()
+            )
+        )
+        assert "ILIKE" in sql
+        assert "sub_department_budgets.year =" in sql
+        assert "LIMIT" in sql
+
+
+@pytest.mark.api
+class TestDrillDownLoading:
+    """Test eager loading of the drill-down object graph"""
+
+    def setup_method(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.db = Session(self.engine)
+
+        department = Department(name_english="Health")
+        for i in range(5):
+            sub_department = SubDepartment(
+                name_english=f"Sub {i}", allocation_percentage=20
+            )
+            for year in (2019, 2020):
+                sub_department.budget_allocations.append(
+                    SubDepartmentBudget(year=year, budget_amount=i, notes=f"{year}")
+                )
+            department.sub_departments.append(sub_department)
+        self.db.add(department)
+        self.db.commit()
+        self.db.expunge_all()
+
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self.record)
+
+    def teardown_method(self):
+        self.db.close()
+
+    def record(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def test_fixed_number_of_queries(self):
+        """Test department, sub-departments and budgets load in three queries"""
+        dept = get_department_with_sub_departments(self.db, "Health", 2020)
+
+        notes = [
+            [budget.notes for budget in sub.budget_allocations]
+            for sub in dept.sub_departments
+        ]
+        assert notes == [["2020"]] * 5
+        assert len(self.statements) == 3
+
+    def test_sub_departments_load_only_the_year(self):
+        """Test the year filter applies to the eagerly loaded allocations"""
+        subs = get_sub_departments_by_department(self.db, 1, 2019)
+
+        assert [budget.year for sub in subs for budget in sub.budget_allocations] == [
+            2019
+        ] * 5
+        assert len(self.statements) == 2
+
+    def test_unknown_department(self):
+        """Test that a missing department returns None"""
+        assert get_department_with_sub_departments(self.db, "Unknown") is None
+
+
+@pytest.mark.api
+class TestTrigramSearch:
+    """Test trigram indexes for substring name search"""
+
+    def test_trigram_indexes_in_metadata(self):
+        """Test GIN trigram indexes are declared on every name column"""
+        ddl = {
+            str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+            for table in (Department.__table__, SubDepartment.__table__)
+            for index in table.indexes
+        }
+        for table in ("departments", "sub_departments"):
+            for column in ("name_english", "name_georgian"):
+                assert (
+                    f"CREATE INDEX idx_{table}_{column}_trgm ON {table} "
+                    f"USING gin ({column} gin_trgm_ops)"
+                ) in ddl
+
+    def test_explain_budget_drill_down(self):
+        """Test the drill-down query is explained with driver parameters"""
+        mock_db = MagicMock(spec=Session)
+        connection = mock_db.connection.return_value
+        connection.dialect = postgresql.psycopg2.dialect()
+        connection.exec_driver_sql.return_value = [
+            ("Bitmap Heap Scan on departments",),
+            ("  ->  Bitmap Index Scan on idx_departments_name_english_trgm",),
+        ]
+
+        plan = explain_budget_drill_down(mock_db, "Health", 2020, analyze=True)
+
+        assert plan[1].endswith("idx_departments_name_english_trgm")
+        sql, params = connection.exec_driver_sql.call_args.args
+        assert sql.startswith("EXPLAIN (ANALYZE, BUFFERS) SELECT")
+        assert "%%Health%%" not in sql
+        assert "%Health%" in params.values()
+
+    @pytest.mark.skipif(
+        not os.getenv("TEST_DATABASE_URL"),
+        reason="needs a PostgreSQL database initialized from fixtures/init",
+    )
+    def test_name_filter_uses_trigram_index(self):
+        """Test the planner can serve ILIKE '%name%' from the trigram index"""
+        with Session(create_engine(os.environ["TEST_DATABASE_URL"])) as db:
+            # Tiny fixture tables are cheaper to scan; force the index question
+            db.execute(text("SET enable_seqscan = off"))
+            plan = "\n".join(explain_budget_drill_down(db, "Health"))
+
+        assert "idx_departments_name_english_trgm" in plan
+
+
+@pytest.mark.api
+class TestConnectionPool:
+    """Test connection pool configuration and monitoring"""
+
+    @patch("database.SessionLocal")
+    def test_get_db_does_not_probe(self, mock_session_local):
+        """Test that no query runs when a session is handed out"""
+        mock_session = MagicMock(spec=Session)
+        mock_session_local.return_value = mock_session
+
+        next(get_db())
+
+        mock_session.execute.assert_not_called()
+
+    def test_pool_stats(self):
+        """Test pool occupancy and checkout waits are reported"""
+        engine = create_engine(
+            "sqlite://", poolclass=WaitTimedQueuePool, pool_size=2, max_overflow=1
+        )
+        with engine.connect():
+            stats = pool_stats(engine)
+
+        assert stats["size"] == 2
+        assert stats["checked_out"] == 1
+        assert stats["overflow"] == 0
+        assert stats["checkouts"] == 1
+        assert stats["max_wait_seconds"] >= 0.0
+        assert pool_stats(engine)["checked_out"] == 0
+
+    def test_pool_wait_excludes_connect_time(self):
+        """Test opening a new connection is not counted as waiting"""
+
+        def slow_connect():
+            time.sleep(0.05)
+            return sqlite3.connect(":memory:")
+
+        engine = create_engine(
+            "sqlite://",
+            creator=slow_connect,
+            poolclass=WaitTimedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+        )
+        with engine.connect():
+            pass
+        with engine.connect():
+            stats = pool_stats(engine)
+
+        assert stats["checkouts"] == 2
+        assert stats["max_wait_seconds"] < 0.05
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
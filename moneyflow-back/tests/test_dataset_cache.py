@@ -0,0 +1,76 @@
+import json
+
+import pytest
+from dataset_cache import DatasetCache
+
+PAYLOAD = b'[{"year": 2020, "name": "Education", "budget": 100.0}]'
+
+
+@pytest.mark.api
+class TestDatasetCache:
+    """Test the on-disk dataset snapshot cache"""
+
+    def test_empty_cache_is_a_miss(self, tmp_path):
+        """Test loading before anything was saved"""
+        assert DatasetCache(str(tmp_path / "missing")).load() is None
+
+    def test_round_trip(self, tmp_path):
+        """Test saving and loading a payload with its generation"""
+        cache = DatasetCache(str(tmp_path / "cache"))
+        cache.save("1700000000000001", PAYLOAD)
+
+        assert cache.load() == ("1700000000000001", PAYLOAD)
+
+    def test_save_replaces_previous_snapshot(self, tmp_path):
+        """Test that a newer generation overwrites the old one"""
+        cache = DatasetCache(str(tmp_path))
+        cache.save("1", b"[]")
+        cache.save("2", PAYLOAD)
+
+        assert cache.load() == ("2", PAYLOAD)
+        assert not [p for p in tmp_path.iterdir() if p.name.startswith(".tmp-")]
+
+    def test_checksum_mismatch_is_a_miss(self, tmp_path):
+        """Test that a payload not matching its metadata is ignored"""
+        cache = DatasetCache(str(tmp_path))
+        cache.save("1", PAYLOAD)
+        with open(cache.data_path, "wb") as f:
+            f.write(b"[]")
+
+        assert cache.load() is None
+
+    def test_corrupt_metadata_is_a_miss(self, tmp_path):
+        """Test that unreadable metadata is ignored"""
+        cache = DatasetCache(str(tmp_path))
+        cache.save("1", PAYLOAD)
+        with open(cache.meta_path, "w") as f:
+            f.write("{not json")
+
+        assert cache.load() is None
+
+    def test_save_file_moves_download_into_cache(self, tmp_path):
+        """Test committing a downloaded file under its generation"""
+        cache = DatasetCache(str(tmp_path), "georgian_budget.npz")
+        tmp_file = cache.temp_path()
+        with open(tmp_file, "wb") as f:
+            f.write(PAYLOAD)
+
+        cache.save_file("5", tmp_file)
+
+        assert cache.load_path() == ("5", cache.data_path)
+        assert cache.load() == ("5", PAYLOAD)
+        assert not [p for p in tmp_path.iterdir() if p.name.startswith(".tmp-")]
+
+    def test_metadata_format(self, tmp_path):
+        """Test the metadata file records generation and checksum"""
+        cache = DatasetCache(str(tmp_path))
+        cache.save("3", PAYLOAD)
+
+        with open(cache.meta_path) as f:
+            meta = json.load(f)
+        assert meta["generation"] == "3"
+        assert len(meta["sha256"]) == 64
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,82 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from budget_store import BudgetStore
+from dataset_refresher import DatasetRefresher
+
+
+def make_store(version):
+    return BudgetStore.from_records(
+        [{"year": 2020, "name": "Education", "budget": 100.0}], version=version
+    )
+
+
+@pytest.mark.api
+class TestDatasetRefresher:
+    """Test polling and publishing new dataset versions"""
+
+    def setup_method(self):
+        self.published = [make_store("1")]
+        self.latest = "1"
+        self.refresher = DatasetRefresher(
+            fetch=self.fetch,
+            current_version=lambda: self.published[-1].stats.version,
+            publish=self.published.append,
+            interval=0.01,
+        )
+
+    def fetch(self, known_version):
+        """Conditional fetch returning None when the version is unchanged"""
+        if self.latest is None or self.latest == known_version:
+            return None
+        return make_store(self.latest)
+
+    def test_unchanged_version_is_not_reloaded(self):
+        """Test that polling an unchanged version does nothing"""
+        assert self.refresher.refresh_once() is False
+        assert len(self.published) == 1
+
+    def test_new_version_is_published(self):
+        """Test that a new version is loaded and published"""
+        self.latest = "2"
+        assert self.refresher.refresh_once() is True
+        assert self.published[-1].stats.version == "2"
+
+    def test_failed_load_keeps_current_snapshot(self):
+        """Test that load errors never publish a partial dataset"""
+        self.latest = "2"
+        self.refresher.fetch = MagicMock(side_effect=Exception("GCS timeout"))
+        with pytest.raises(Exception, match="GCS timeout"):
+            self.refresher.refresh_once()
+        assert self.published[-1].stats.version == "1"
+
+    def test_background_thread_publishes_and_stops(self):
+        """Test the polling thread swaps in a new version and shuts down"""
+        published = threading.Event()
+        publish = self.refresher.publish
+        self.refresher.publish = lambda store: (publish(store), published.set())
+
+        self.latest = "3"
+        self.refresher.start()
+        try:
+            assert published.wait(timeout=2)
+        finally:
+            self.refresher.stop(timeout=2)
+
+        assert self.published[-1].stats.version == "3"
+        assert self.refresher._thread is None
+
+    def test_immediate_revalidation_without_polling(self):
+        """Test a one-shot revalidation when polling is disabled"""
+        self.refresher.interval = 0
+        self.latest = "4"
+        self.refresher.start(immediate=True)
+        self.refresher._thread.join(timeout=2)
+
+        assert self.published[-1].stats.version == "4"
+        assert not self.refresher._thread.is_alive()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
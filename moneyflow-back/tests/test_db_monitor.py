@@ -0,0 +1,65 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from db_monitor import DatabaseMonitor, DatabaseStatus
+
+
+@pytest.mark.api
+class TestDatabaseMonitor:
+    """Test background database probing and the cached status"""
+
+    def setup_method(self):
+        self.probe = MagicMock()
+        self.monitor = DatabaseMonitor(self.probe, interval=10.0, max_interval=60.0)
+
+    def test_status_unknown_before_first_probe(self):
+        """Test that nothing is reported as connected before a probe ran"""
+        assert self.monitor.status == DatabaseStatus()
+        assert self.monitor.connected is False
+
+    def test_successful_probe(self):
+        """Test that a successful probe records latency and resets failures"""
+        status = self.monitor.check_once()
+
+        assert status.connected is True
+        assert status.latency_ms >= 0.0
+        assert status.checked_at is not None
+        assert self.monitor.status is status
+        assert self.monitor.connected is True
+
+    def test_failed_probe_backs_off(self):
+        """Test that consecutive failures double the delay up to the cap"""
+        self.probe.side_effect = Exception("connection refused")
+
+        delays = []
+        for _ in range(4):
+            status = self.monitor.check_once()
+            delays.append(self.monitor.next_delay())
+
+        assert status.connected is False
+        assert status.consecutive_failures == 4
+        assert status.error == "connection refused"
+        assert delays == [20.0, 40.0, 60.0, 60.0]
+
+        # Recovery returns to the regular interval
+        self.probe.side_effect = None
+        assert self.monitor.check_once().consecutive_failures == 0
+        assert self.monitor.next_delay() == 10.0
+
+    def test_background_thread_probes_immediately(self):
+        """Test that start probes right away and stop joins the thread"""
+        probed = threading.Event()
+        self.probe.side_effect = probed.set
+
+        self.monitor.start()
+        try:
+            assert probed.wait(timeout=5)
+        finally:
+            self.monitor.stop(timeout=5)
+
+        assert self.monitor._thread is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+from json_stream import iter_json_array
+
+RECORDS = [
+    {"year": 2020, "name": "განათლება", "budget": 1.5e3},
+    {"year": 2021, "name": 'Health, "Social" [Care]', "budget": None},
+    [1, {"nested": [2, 3]}],
+    -12.25,
+    "text",
+    True,
+]
+
+
+def chunked(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.api
+class TestIterJsonArray:
+    """Test incremental parsing of a top-level JSON array"""
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 20])
+    def test_matches_json_loads_at_any_chunk_size(self, size):
+        """Test that chunk boundaries never change the parsed elements"""
+        payload = json.dumps(RECORDS, ensure_ascii=False, indent=2).encode("utf-8")
+        assert list(iter_json_array(chunked(payload, size))) == RECORDS
+
+    def test_elements_are_yielded_before_the_end(self):
+        """Test that elements stream out without reading the whole input"""
+        chunks = iter([b'[{"year": 2020}, ', b'{"year": 2021}', b"]"])
+        elements = iter_json_array(chunks)
+
+        assert next(elements) == {"year": 2020}
+        assert next(chunks) == b'{"year": 2021}'
+
+    def test_utf8_bom_and_empty_array(self):
+        """Test a byte order mark is skipped and an empty array is allowed"""
+        assert list(iter_json_array([b"\xef\xbb\xbf", b" [ ] \n"])) == []
+
+    @pytest.mark.parametrize(
+        "payload",
+        [b'{"year": 2020}', b"[1, 2", b"[1 2]", b"[1,]", b"[1] [2]", b""],
+    )
+    def test_rejects_invalid_arrays(self, payload):
+        """Test that non-arrays, truncation and trailing data are errors"""
+        with pytest.raises(ValueError):
+            list(iter_json_array(chunked(payload, 2)))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -1,8 +1,20 @@
-from unittest.mock import patch
+import asyncio
+import csv
+import io
+import json
+import os
+from unittest.mock import MagicMock, patch
 
+import main
 import pytest
+from budget_store import BudgetStore
+from dataset_cache import DatasetCache
+from db_monitor import DatabaseStatus
 from fastapi.testclient import TestClient
+from google.api_core.exceptions import NotFound, NotModified, RequestRangeNotSatisfiable
 from main import app
+from models import BatchResponse, BudgetRecord, YearSummary
+from sqlalchemy.exc import OperationalError
 
 client = TestClient(app)
 
@@ -21,6 +33,50 @@ class TestHealthEndpoints:
         assert "data_loaded" in data
         assert "database" in data
 
+    def test_health_reads_cached_database_status(self):
+        """Test that /health reports the monitor's status without probing"""
+        status = DatabaseStatus(connected=True, latency_ms=1.5, checked_at=1.0)
+        store = BudgetStore.from_records(
+            [{"year": 2020, "name": "Test Dept", "budget": 100.0}]
+        )
+        with patch.object(main.database_monitor, "status", status), patch(
+            "main.budget_store", store
+        ), patch("main.ping_database") as ping:
+            data = client.get("/health").json()
+            root = client.get("/").json()
+
+        assert data["database"] == "connected"
+        assert data["database_latency_ms"] == 1.5
+        stats = root["data"]["data_statistics"]
+        assert stats["drill_down_enabled"].endswith("sub-departments available")
+        ping.assert_not_called()
+
+    def test_liveness_endpoint(self):
+        """Test that liveness does not depend on data or the database"""
+        with patch("main.budget_store", None), patch("main.ping_database") as db:
+            response = client.get("/health/live")
+        assert response.status_code == 200
+        assert response.json() == {"status": "alive"}
+        db.assert_not_called()
+
+    def test_readiness_endpoint_before_load(self):
+        """Test that readiness fails fast until a snapshot is published"""
+        with patch("main.budget_store", None):
+            response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+        assert response.json()["status"] == "loading"
+
+    def test_readiness_endpoint_after_load(self):
+        """Test that readiness reports the published dataset version"""
+        store = BudgetStore.from_records(
+            [{"year": 2020, "name": "Test Dept", "budget": 100.0}], version="42"
+        )
+        with patch("main.budget_store", store):
+            response = client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready", "dataset_version": "42"}
+
     def test_docs_endpoint(self):
         """Test that docs endpoint is accessible"""
         response = client.get("/docs")
@@ -31,15 +87,14 @@ class TestHealthEndpoints:
 class TestBudgetEndpoints:
     """Test budget data endpoints"""
 
-    @patch("main.budget_data")
-    def test_summary_endpoint_with_data(self, mock_budget_data):
+    def test_summary_endpoint_with_data(self):
         """Test summary endpoint when budget data is available"""
-        mock_budget_data = [
+        records = [
             {"year": 2020, "name": "Test Dept", "budget": 100.0},
             {"year": 2020, "name": "Test Dept 2", "budget": 200.0},
         ]
 
-        with patch("main.budget_data", mock_budget_data):
+        with patch("main.budget_store", BudgetStore.from_records(records)):
             response = client.get("/summary")
             assert response.status_code == 200
             data = response.json()
@@ -48,27 +103,24 @@ class TestBudgetEndpoints:
             assert "departments_count" in data
             assert "total_budget" in data
 
-    @patch("main.budget_data")
-    def test_summary_endpoint_no_data(self, mock_budget_data):
+    def test_summary_endpoint_no_data(self):
         """Test summary endpoint when no budget data is available"""
-        mock_budget_data = None
-
-        with patch("main.budget_data", mock_budget_data):
+        with patch("main.budget_store", None):
             response = client.get("/summary")
-            assert response.status_code == 500
+            assert response.status_code == 503
+            assert response.headers["Retry-After"] == "5"
             data = response.json()
             assert "detail" in data
             assert "Budget data not loaded" in data["detail"]
 
-    @patch("main.budget_data")
-    def test_budget_endpoint_with_filters(self, mock_budget_data):
+    def test_budget_endpoint_with_filters(self):
         """Test budget endpoint with year and department filters"""
-        mock_budget_data = [
+        records = [
             {"year": 2020, "name": "Test Dept", "budget": 100.0},
             {"year": 2021, "name": "Test Dept", "budget": 150.0},
         ]
 
-        with patch("main.budget_data", mock_budget_data):
+        with patch("main.budget_store", BudgetStore.from_records(records)):
             response = client.get("/budget?year=2020&department=Test Dept")
             assert response.status_code == 200
             data = response.json()
@@ -76,29 +128,27 @@ class TestBudgetEndpoints:
             assert data[0]["year"] == 2020
             assert data[0]["name"] == "Test Dept"
 
-    @patch("main.budget_data")
-    def test_budget_endpoint_limit(self, mock_budget_data):
+    def test_budget_endpoint_limit(self):
         """Test budget endpoint with limit parameter"""
-        mock_budget_data = [
+        records = [
             {"year": 2020, "name": f"Dept {i}", "budget": 100.0 + i} for i in range(10)
         ]
 
-        with patch("main.budget_data", mock_budget_data):
+        with patch("main.budget_store", BudgetStore.from_records(records)):
             response = client.get("/budget?limit=5")
             assert response.status_code == 200
             data = response.json()
             assert len(data) == 5
 
-    @patch("main.budget_data")
-    def test_departments_endpoint(self, mock_budget_data):
+    def test_departments_endpoint(self):
         """Test departments endpoint"""
-        mock_budget_data = [
+        records = [
             {"year": 2020, "name": "Dept A", "budget": 100.0},
             {"year": 2020, "name": "Dept B", "budget": 200.0},
             {"year": 2021, "name": "Dept A", "budget": 150.0},
         ]
 
-        with patch("main.budget_data", mock_budget_data):
+        with patch("main.budget_store", BudgetStore.from_records(records)):
             response = client.get("/departments")
             assert response.status_code == 200
             data = response.json()
@@ -111,16 +161,15 @@ class TestBudgetEndpoints:
 class TestTrendsEndpoints:
     """Test trends analysis endpoints"""
 
-    @patch("main.budget_data")
-    def test_trends_endpoint(self, mock_budget_data):
+    def test_trends_endpoint(self):
         """Test trends endpoint for a specific department"""
-        mock_budget_data = [
+        records = [
             {"year": 2019, "name": "Test Dept", "budget": 100.0},
             {"year": 2020, "name": "Test Dept", "budget": 120.0},
             {"year": 2021, "name": "Test Dept", "budget": 150.0},
         ]
 
-        with patch("main.budget_data", mock_budget_data):
+        with patch("main.budget_store", BudgetStore.from_records(records)):
             response = client.get("/trends/Test Dept")
             assert response.status_code == 200
             data = response.json()
@@ -131,12 +180,11 @@ class TestTrendsEndpoints:
             assert "avg_budget" in data
             assert len(data["years"]) == 3
 
-    @patch("main.budget_data")
-    def test_trends_endpoint_department_not_found(self, mock_budget_data):
+    def test_trends_endpoint_department_not_found(self):
         """Test trends endpoint for non-existent department"""
-        mock_budget_data = [{"year": 2020, "name": "Other Dept", "budget": 100.0}]
+        records = [{"year": 2020, "name": "Other Dept", "budget": 100.0}]
 
-        with patch("main.budget_data", mock_budget_data):
+        with patch("main.budget_store", BudgetStore.from_records(records)):
             response = client.get("/trends/NonExistent")
             assert response.status_code == 404
             data = response.json()
@@ -148,16 +196,15 @@ class TestTrendsEndpoints:
 class TestYearEndpoints:
     """Test year-specific endpoints"""
 
-    @patch("main.budget_data")
-    def test_year_endpoint(self, mock_budget_data):
+    def test_year_endpoint(self):
         """Test year endpoint for a specific year"""
-        mock_budget_data = [
+        records = [
             {"year": 2020, "name": "Dept A", "budget": 100.0},
             {"year": 2020, "name": "Dept B", "budget": 200.0},
             {"year": 2021, "name": "Dept A", "budget": 150.0},
         ]
 
-        with patch("main.budget_data", mock_budget_data):
+        with patch("main.budget_store", BudgetStore.from_records(records)):
             response = client.get("/years/2020")
             assert response.status_code == 200
             data = response.json()
@@ -167,18 +214,47 @@ class TestYearEndpoints:
             assert "top_departments" in data
             assert len(data["departments"]) == 2
 
-    @patch("main.budget_data")
-    def test_year_endpoint_year_not_found(self, mock_budget_data):
+    def test_year_endpoint_year_not_found(self):
         """Test year endpoint for non-existent year"""
-        mock_budget_data = [{"year": 2020, "name": "Test Dept", "budget": 100.0}]
+        records = [{"year": 2020, "name": "Test Dept", "budget": 100.0}]
 
-        with patch("main.budget_data", mock_budget_data):
+        with patch("main.budget_store", BudgetStore.from_records(records)):
             response = client.get("/years/2025")
             assert response.status_code == 404
             data = response.json()
             assert "detail" in data
             assert "No data found for year 2025" in data["detail"]
 
+    def test_year_endpoint_top_k_and_ranks(self):
+        """Test top_k limits top departments and ties share a rank"""
+        store = BudgetStore.from_records(
+            [
+                {"year": 2020, "name": "Dept A", "budget": 100.0},
+                {"year": 2020, "name": "Dept B", "budget": 200.0},
+                {"year": 2020, "name": "Dept C", "budget": 100.0},
+                {"year": 2020, "name": "Dept D", "budget": 50.0},
+            ],
+            version="v1",
+        )
+        main.response_cache.clear()
+
+        with patch("main.budget_store", store):
+            response = client.get("/years/2020", params={"top_k": 2})
+            invalid = client.get("/years/2020", params={"top_k": 0})
+
+        assert invalid.status_code == 422
+        data = response.json()
+        assert data["total_budget"] == 450.0
+        assert [
+            (d["name"], d["rank"], d["percentile"]) for d in data["departments"]
+        ] == [
+            ("Dept B", 1, 100.0),
+            ("Dept A", 2, 75.0),
+            ("Dept C", 2, 75.0),
+            ("Dept D", 4, 25.0),
+        ]
+        assert data["top_departments"] == data["departments"][:2]
+
 
 @pytest.mark.api
 class TestErrorHandling:
@@ -189,17 +265,27 @@ class TestErrorHandling:
         response = client.get("/budget?year=invalid")
         assert response.status_code == 422  # FastAPI validation error
 
-    @patch("main.budget_data")
-    def test_invalid_limit_parameter(self, mock_budget_data):
+    def test_invalid_limit_parameter(self):
         """Test handling of invalid limit parameter"""
         # Mock budget data to avoid 500 error from missing data
-        mock_budget_data = [{"year": 2020, "name": "Test Dept", "budget": 100.0}]
+        records = [{"year": 2020, "name": "Test Dept", "budget": 100.0}]
 
-        with patch("main.budget_data", mock_budget_data):
+        with patch("main.budget_store", BudgetStore.from_records(records)):
             response = client.get("/budget?limit=-1")
-            # The limit parameter should be valid according to FastAPI validation
-            # but might cause issues in business logic
-            assert response.status_code in [200, 422, 400]
+            assert response.status_code == 422
+
+    def test_zero_limit_returns_empty_page(self):
+        """Test that limit=0 returns no records and no next cursor"""
+        records = [
+            {"year": 2020, "name": f"Dept {i}", "budget": 100.0 + i} for i in range(3)
+        ]
+
+        with patch("main.budget_store", BudgetStore.from_records(records)):
+            for path in ["/budget?limit=0", "/budget?limit=0&offset=1&year=2020"]:
+                response = client.get(path)
+                assert response.status_code == 200
+                assert response.json() == []
+                assert "X-Next-Cursor" not in response.headers
 
     def test_missing_endpoint(self):
         """Test 404 for non-existent endpoints"""
@@ -211,16 +297,15 @@ class TestErrorHandling:
 class TestSearchEndpoints:
     """Test search functionality"""
 
-    @patch("main.budget_data")
-    def test_search_departments(self, mock_budget_data):
+    def test_search_departments(self):
         """Test department search endpoint"""
-        mock_budget_data = [
+        records = [
             {"year": 2020, "name": "Test Department A", "budget": 100.0},
             {"year": 2020, "name": "Test Department B", "budget": 200.0},
             {"year": 2020, "name": "Other Dept", "budget": 300.0},
         ]
 
-        with patch("main.budget_data", mock_budget_data):
+        with patch("main.budget_store", BudgetStore.from_records(records)):
             response = client.get("/search?q=Test")
             assert response.status_code == 200
             data = response.json()
@@ -237,5 +322,940 @@ class TestSearchEndpoints:
         assert response.status_code == 422  # FastAPI validation error
 
 
+@pytest.mark.api
+class TestResponseCaching:
+    """Test version-keyed response caching and conditional requests"""
+
+    def setup_method(self):
+        self.store = BudgetStore.from_records(
+            [
+                {"year": 2020, "name": "Test Dept", "budget": 100.0},
+                {"year": 2021, "name": "Test Dept", "budget": 150.0},
+            ],
+            version="v1",
+        )
+        main.response_cache.clear()
+
+    def test_responses_carry_version_etag(self):
+        """Test that read endpoints return a strong ETag for the dataset"""
+        with patch("main.budget_store", self.store):
+            for path in ["/summary", "/departments", "/years/2020", "/budget"]:
+                response = client.get(path)
+                assert response.status_code == 200
+                assert response.headers["ETag"] == f'"{app.version}-v1"'
+
+    def test_matching_etag_returns_304_without_building(self):
+        """Test that a conditional request for a cached body skips the data"""
+        etag = f'"{app.version}-v1"'
+        with patch("main.budget_store", self.store):
+            client.get("/budget")
+            with patch.object(self.store, "filter_rows") as mock_filter:
+                response = client.get("/budget", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["ETag"] == f'"{app.version}-v1"'
+        assert response.content == b""
+        mock_filter.assert_not_called()
+
+    def test_matching_etag_for_missing_resource_is_404(self):
+        """Test that a conditional request does not hide a 404"""
+        with patch("main.budget_store", self.store):
+            response = client.get(
+                "/years/1800", headers={"If-None-Match": f'"{app.version}-v1"'}
+            )
+
+        assert response.status_code == 404
+
+    def test_etag_from_other_api_version_is_not_matched(self):
+        """Test that a bare dataset version ETag no longer revalidates"""
+        with patch("main.budget_store", self.store):
+            response = client.get("/summary", headers={"If-None-Match": '"v1"'})
+
+        assert response.status_code == 200
+
+    def test_repeat_requests_are_served_from_cache(self):
+        """Test that identical requests with equivalent params hit the cache"""
+        with patch("main.budget_store", self.store):
+            first = client.get("/trends/Test?")
+            with patch.object(self.store, "filter_rows") as mock_filter:
+                second = client.get("/trends/Test")
+            mock_filter.assert_not_called()
+
+        assert second.content == first.content
+        assert second.json()["years"] == [2020, 2021]
+
+    def test_new_version_changes_etag(self):
+        """Test that a reload invalidates cached bodies and ETags"""
+        with patch("main.budget_store", self.store):
+            client.get("/departments")
+            main.publish_budget_store(
+                BudgetStore.from_records(
+                    [{"year": 2020, "name": "New Dept", "budget": 1.0}], version="v2"
+                )
+            )
+            response = client.get(
+                "/departments", headers={"If-None-Match": f'"{app.version}-v1"'}
+            )
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] == f'"{app.version}-v2"'
+        assert response.json() == ["New Dept"]
+
+    def test_fast_path_matches_model_serialization(self):
+        """Test pre-serialized bodies equal the response_model encoding"""
+        with patch("main.budget_store", self.store):
+            budget = client.get("/budget")
+            year = client.get("/years/2020")
+
+        department = {
+            "name": "Test Dept",
+            "budget": 100.0,
+            "rank": 1,
+            "percentile": 100.0,
+        }
+        assert budget.json() == [
+            BudgetRecord(**record).model_dump()
+            for record in self.store.to_records([0, 1])
+        ]
+        assert year.json() == YearSummary(
+            year=2020,
+            total_budget=100.0,
+            departments=[department],
+            top_departments=[department],
+        ).model_dump(mode="json")
+
+    def test_openapi_schema_keeps_response_models(self):
+        """Test that the fast path leaves the documented schemas unchanged"""
+        paths = client.get("/openapi.json").json()["paths"]
+
+        def schema(path):
+            responses = paths[path]["get"]["responses"]
+            return responses["200"]["content"]["application/json"]["schema"]
+
+        assert schema("/budget")["items"]["$ref"].endswith("/BudgetRecord")
+        assert schema("/years/{year}")["$ref"].endswith("/YearSummary")
+
+    def test_errors_are_not_cached(self):
+        """Test that a 404 is not stored as a cached body"""
+        with patch("main.budget_store", self.store):
+            assert client.get("/years/1999").status_code == 404
+        assert len(main.response_cache) == 0
+
+
+@pytest.mark.api
+class TestBudgetPagination:
+    """Test cursor pagination of /budget"""
+
+    def setup_method(self):
+        self.store = BudgetStore.from_records(
+            [
+                {"year": 2000 + i, "name": f"Dept {i % 3}", "budget": float(i)}
+                for i in range(7)
+            ],
+            version="v1",
+        )
+        main.response_cache.clear()
+
+    def test_cursor_walks_all_pages(self):
+        """Test following X-Next-Cursor returns every row exactly once"""
+        records, params = [], {"limit": 3, "department": "Dept"}
+        with patch("main.budget_store", self.store):
+            while True:
+                response = client.get("/budget", params=params)
+                assert response.status_code == 200
+                records.extend(response.json())
+                if "X-Next-Cursor" not in response.headers:
+                    break
+                params["cursor"] = response.headers["X-Next-Cursor"]
+
+        assert [record["year"] for record in records] == list(range(2000, 2007))
+
+    def test_offset_pages_also_return_cursor(self):
+        """Test that offset pagination can hand over to a cursor"""
+        with patch("main.budget_store", self.store):
+            response = client.get("/budget", params={"limit": 2, "offset": 2})
+            cursor = response.headers["X-Next-Cursor"]
+            next_page = client.get("/budget", params={"limit": 2, "cursor": cursor})
+
+        assert [r["year"] for r in response.json()] == [2002, 2003]
+        assert [r["year"] for r in next_page.json()] == [2004, 2005]
+
+    def test_cursor_from_previous_version_is_rejected(self):
+        """Test that a reload invalidates outstanding cursors"""
+        cursor = main._encode_cursor("v0", 2)
+        with patch("main.budget_store", self.store):
+            response = client.get("/budget", params={"cursor": cursor})
+        assert response.status_code == 410
+
+    def test_negative_cursor_row_is_rejected(self):
+        """Test that a forged cursor cannot wrap around to the last rows"""
+        cursor = main._encode_cursor("v1", -5)
+        with patch("main.budget_store", self.store):
+            response = client.get("/budget", params={"cursor": cursor})
+        assert response.status_code == 400
+        assert "X-Next-Cursor" not in response.headers
+
+    @pytest.mark.parametrize(
+        "params",
+        [{"cursor": "not-a-cursor"}, {"cursor": "djE6Mg", "offset": 1}],
+    )
+    def test_invalid_cursor_requests(self, params):
+        """Test malformed cursors and mixing cursor with offset"""
+        with patch("main.budget_store", self.store):
+            response = client.get("/budget", params=params)
+        assert response.status_code == 400
+
+
+@pytest.mark.api
+class TestExportEndpoint:
+    """Test streaming bulk export"""
+
+    def setup_method(self):
+        self.store = BudgetStore.from_records(
+            [
+                {"year": 2019, "name": "Education", "budget": 100.0},
+                {"year": 2020, "name": 'Health, "Care"', "budget": 80.5},
+                {"year": 2020, "name": "Education", "budget": 120.0},
+            ],
+            version="v1",
+        )
+
+    @patch("main.EXPORT_BATCH_ROWS", 1)
+    def test_ndjson_matches_budget_filters(self):
+        """Test NDJSON export streams the same rows as /budget"""
+        params = {"year": 2020, "min_budget": 90.0}
+        with patch("main.budget_store", self.store):
+            main.response_cache.clear()
+            expected = client.get("/budget", params=params).json()
+            response = client.get("/export", params=params)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = response.text.splitlines()
+        assert [json.loads(line) for line in lines] == expected
+
+    @patch("main.EXPORT_BATCH_ROWS", 1)
+    def test_export_filters_once(self):
+        """Test that the filters are resolved once, not per batch"""
+        with patch("main.budget_store", self.store), patch.object(
+            self.store, "filter_rows", wraps=self.store.filter_rows
+        ) as mock_filter, patch.object(self.store, "page_rows") as mock_page:
+            response = client.get("/export", params={"department": "edu"})
+
+        assert len(response.text.splitlines()) == 2
+        mock_filter.assert_called_once()
+        mock_page.assert_not_called()
+
+    @patch("main.EXPORT_BATCH_ROWS", 2)
+    def test_csv_export(self):
+        """Test CSV export quotes names and includes a header"""
+        with patch("main.budget_store", self.store):
+            response = client.get("/export", params={"format": "csv"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "georgian_budget.csv" in response.headers["content-disposition"]
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows == [
+            ["year", "budget", "name"],
+            ["2019", "100.0", "Education"],
+            ["2020", "80.5", 'Health, "Care"'],
+            ["2020", "120.0", "Education"],
+        ]
+
+    def test_unknown_format_rejected(self):
+        """Test that only ndjson and csv are accepted"""
+        with patch("main.budget_store", self.store):
+            response = client.get("/export", params={"format": "xml"})
+        assert response.status_code == 422
+
+
+@pytest.mark.api
+class TestAggregateEndpoint:
+    """Test grouped aggregation over the filtered dataset"""
+
+    def setup_method(self):
+        self.store = BudgetStore.from_records(
+            [
+                {"year": 2010, "name": "Health", "budget": 10.0},
+                {"year": 2010, "name": "Education", "budget": 30.0},
+                {"year": 2011, "name": "Education", "budget": 50.0},
+                {"year": 2012, "name": "Education", "budget": 70.0},
+            ],
+            version="v1",
+        )
+        main.response_cache.clear()
+
+    def test_sum_by_year_with_filters(self):
+        """Test summing by year honours the /budget filters"""
+        with patch("main.budget_store", self.store):
+            response = client.get(
+                "/aggregate", params={"group_by": "year", "department": "edu"}
+            )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "group_by": "year",
+            "metric": "sum",
+            "groups": [
+                {"key": 2010, "value": 30.0, "count": 1},
+                {"key": 2011, "value": 50.0, "count": 1},
+                {"key": 2012, "value": 70.0, "count": 1},
+            ],
+        }
+
+    def test_mean_by_department_for_year_range(self):
+        """Test averaging by department within a year range"""
+        with patch("main.budget_store", self.store):
+            response = client.get(
+                "/aggregate",
+                params={
+                    "group_by": "department",
+                    "metric": "mean",
+                    "min_year": 2010,
+                    "max_year": 2011,
+                },
+            )
+
+        assert response.json()["groups"] == [
+            {"key": "Education", "value": 40.0, "count": 2},
+            {"key": "Health", "value": 10.0, "count": 1},
+        ]
+        assert response.headers["ETag"] == f'"{app.version}-v1"'
+
+    def test_invalid_metric(self):
+        """Test that unknown metrics are rejected by validation"""
+        with patch("main.budget_store", self.store):
+            response = client.get(
+                "/aggregate", params={"group_by": "year", "metric": "median"}
+            )
+        assert response.status_code == 422
+
+
+@pytest.mark.api
+class TestMatrixEndpoint:
+    """Test the department x year matrix endpoint"""
+
+    def test_matrix_with_slicing(self):
+        """Test axis labels, null gaps and year slicing"""
+        store = BudgetStore.from_records(
+            [
+                {"year": 2019, "name": "Health", "budget": 5.0},
+                {"year": 2020, "name": "Education", "budget": 10.0},
+                {"year": 2021, "name": "Education", "budget": 12.0},
+            ],
+            version="v1",
+        )
+        main.response_cache.clear()
+        with patch("main.budget_store", store):
+            response = client.get("/matrix", params={"min_year": 2020})
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "departments": ["Education", "Health"],
+            "years": [2020, 2021],
+            "values": [[10.0, 12.0], [None, None]],
+        }
+
+
+@pytest.mark.api
+class TestGrowthEndpoint:
+    """Test the precomputed growth metrics endpoint"""
+
+    def setup_method(self):
+        self.store = BudgetStore.from_records(
+            [
+                {"year": 2019, "name": "Health", "budget": 50.0},
+                {"year": 2020, "name": "Health", "budget": 60.0},
+                {"year": 2020, "name": "Education", "budget": 40.0},
+                {"year": 2021, "name": "Education", "budget": 50.0},
+            ],
+            version="v1",
+        )
+        main.response_cache.clear()
+
+    def test_growth_for_all_departments(self):
+        """Test every metric is returned for every department and year"""
+        with patch("main.budget_store", self.store):
+            response = client.get("/growth", params={"window": 1})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["departments"] == ["Education", "Health"]
+        assert data["years"] == [2019, 2020, 2021]
+        assert data["yoy_change"] == [[None, None, 10.0], [None, 10.0, None]]
+        assert data["yoy_percent"] == [[None, None, 25.0], [None, 20.0, None]]
+        assert data["share_of_total"] == [[None, 40.0, 100.0], [100.0, 60.0, None]]
+        assert data["cagr"]["1"][0] == [None, None, 25.0]
+        assert data["cagr"]["1"][1][1] == pytest.approx(20.0)
+
+    def test_default_windows_and_slicing(self):
+        """Test configured windows apply when none are requested"""
+        with patch("main.budget_store", self.store):
+            response = client.get(
+                "/growth", params={"department": "health", "max_year": 2020}
+            )
+
+        data = response.json()
+        assert data["departments"] == ["Health"]
+        assert data["years"] == [2019, 2020]
+        assert sorted(data["cagr"]) == sorted(map(str, main.GROWTH_CAGR_WINDOWS))
+
+    def test_invalid_window(self):
+        """Test that windows outside the allowed range are rejected"""
+        with patch("main.budget_store", self.store):
+            response = client.get("/growth", params={"window": 0})
+        assert response.status_code == 422
+
+    def test_trend_includes_growth(self):
+        """Test that a single-department trend carries per-year growth"""
+        with patch("main.budget_store", self.store):
+            response = client.get("/trends/health")
+
+        data = response.json()
+        assert data["years"] == [2019, 2020]
+        assert data["yoy_change"] == [None, 10.0]
+        assert data["yoy_percent"] == [None, 20.0]
+        assert data["share_of_total"] == [100.0, 60.0]
+        assert data["cagr"] == {"3": [None, None], "5": [None, None]}
+
+    def test_trend_growth_matches_budgets_per_entry(self):
+        """Test growth lines up with budgets when a year repeats"""
+        store = BudgetStore.from_records(
+            [
+                {"year": 2019, "name": "Health", "budget": 50.0},
+                {"year": 2020, "name": "Health", "budget": 60.0},
+                {"year": 2020, "name": "Health", "budget": 40.0},
+            ],
+            version="v1",
+        )
+        with patch("main.budget_store", store):
+            data = client.get("/trends/health").json()
+
+        assert data["budgets"] == [50.0, 60.0, 40.0]
+        assert data["yoy_change"] == [None, 10.0, None]
+        assert data["share_of_total"] == [100.0, 60.0, 40.0]
+        assert sorted(data["cagr"]) == sorted(map(str, store.cagr_windows))
+
+    def test_cagr_windows_setting_is_validated(self):
+        """Test that bad GROWTH_CAGR_WINDOWS values fail at import"""
+        assert main._parse_cagr_windows("5, 3,3,") == (3, 5)
+        for value in ("0", "3,51", "three"):
+            with pytest.raises(ValueError):
+                main._parse_cagr_windows(value)
+
+
+@pytest.mark.api
+class TestCompareEndpoint:
+    """Test server-side comparison of two years"""
+
+    def setup_method(self):
+        self.store = BudgetStore.from_records(
+            [
+                {"year": 2019, "name": "Health", "budget": 50.0},
+                {"year": 2019, "name": "Roads", "budget": 20.0},
+                {"year": 2020, "name": "Health", "budget": 60.0},
+                {"year": 2020, "name": "Education", "budget": 80.0},
+            ],
+            version="v1",
+        )
+        main.response_cache.clear()
+
+    def test_departments_aligned_across_years(self):
+        """Test union of departments, zero for absent years, sorted by year_b"""
+        with patch("main.budget_store", self.store):
+            response = client.get("/compare", params={"year_a": 2019, "year_b": 2020})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["total_a"], data["total_b"], data["change"]) == (70.0, 140.0, 70.0)
+        assert data["change_percent"] == 100.0
+        assert [
+            (i["name"], i["budget_a"], i["budget_b"], i["change"], i["change_percent"])
+            for i in data["items"]
+        ] == [
+            ("Education", 0.0, 80.0, 80.0, None),
+            ("Health", 50.0, 60.0, 10.0, 20.0),
+            ("Roads", 20.0, 0.0, -20.0, -100.0),
+        ]
+
+    def test_department_filter_and_missing_years(self):
+        """Test the name filter and 404 when neither year has data"""
+        with patch("main.budget_store", self.store):
+            filtered = client.get(
+                "/compare", params={"year_a": 2019, "year_b": 2021, "department": "he"}
+            )
+            missing = client.get("/compare", params={"year_a": 1990, "year_b": 1991})
+
+        assert [i["name"] for i in filtered.json()["items"]] == ["Health"]
+        assert filtered.json()["items"][0]["budget_b"] == 0.0
+        assert missing.status_code == 404
+
+    @patch("main.get_department_with_sub_departments_async")
+    def test_drill_down_comparison(self, mock_get_dept):
+        """Test sub-department amounts split both years' main budgets"""
+        mock_get_dept.return_value = MagicMock(
+            id=1,
+            name_english="Health",
+            sub_departments=[
+                MagicMock(name_english="Clinics", allocation_percentage=40),
+                MagicMock(name_english="Hospitals", allocation_percentage=60),
+            ],
+        )
+        main.app.dependency_overrides[main.get_async_db] = lambda: MagicMock()
+        try:
+            with patch("main.budget_store", self.store):
+                response = client.get(
+                    "/drill-down/compare/Health",
+                    params={"year_a": 2019, "year_b": 2020},
+                )
+        finally:
+            main.app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["department"] == "Health"
+        assert (data["total_a"], data["total_b"]) == (50.0, 60.0)
+        assert [
+            (i["name"], i["budget_a"], i["budget_b"], i["allocation_percentage"])
+            for i in data["items"]
+        ] == [("Hospitals", 30.0, 36.0, 60.0), ("Clinics", 20.0, 24.0, 40.0)]
+        assert data["items"][0]["change_percent"] == pytest.approx(20.0)
+
+    @patch("main.get_department_with_sub_departments_async")
+    def test_drill_down_comparison_without_either_year(self, mock_get_dept):
+        """Test that no main budget in both years is a 404, not zero change"""
+        main.app.dependency_overrides[main.get_async_db] = lambda: MagicMock()
+        try:
+            with patch("main.budget_store", self.store):
+                response = client.get(
+                    "/drill-down/compare/Health",
+                    params={"year_a": 2001, "year_b": 2002},
+                )
+        finally:
+            main.app.dependency_overrides.clear()
+
+        assert response.status_code == 404
+        assert "No budget data found" in response.json()["detail"]
+        mock_get_dept.assert_not_called()
+
+
+@pytest.mark.api
+class TestDatabaseAccess:
+    """Test drill-down database errors and pool monitoring"""
+
+    @patch("main.get_department_with_sub_departments_async")
+    def test_unreachable_database_is_503(self, mock_get_dept):
+        """Test connection failures on first query report 503, not 500"""
+        mock_get_dept.side_effect = OperationalError("SELECT", {}, Exception("down"))
+        main.app.dependency_overrides[main.get_async_db] = lambda: MagicMock()
+        try:
+            response = client.get("/drill-down/Health")
+        finally:
+            main.app.dependency_overrides.clear()
+
+        assert response.status_code == 503
+        assert "Database not available" in response.json()["detail"]
+
+    def test_drill_down_analysis_before_load_is_retryable(self):
+        """Test the analysis reports a not-yet-loaded dataset like other reads"""
+        main.app.dependency_overrides[main.get_async_db] = lambda: MagicMock()
+        try:
+            with patch("main.budget_store", None):
+                response = client.get("/drill-down/analysis/Health/2020")
+        finally:
+            main.app.dependency_overrides.clear()
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+
+    def test_pool_stats_endpoint(self):
+        """Test pool stats are reported for both engines"""
+        response = client.get("/health/db-pool")
+
+        assert response.status_code == 200
+        data = response.json()
+        for name in ("async", "sync"):
+            assert {"size", "checked_out", "overflow", "max_wait_seconds"} <= set(
+                data[name]
+            )
+
+
+@pytest.mark.api
+class TestBatchEndpoint:
+    """Test evaluating several sub-queries in one request"""
+
+    def setup_method(self):
+        self.store = BudgetStore.from_records(
+            [
+                {"year": 2020, "name": "Education", "budget": 100.0},
+                {"year": 2020, "name": "Health", "budget": 50.0},
+                {"year": 2021, "name": "Education", "budget": 120.0},
+            ],
+            version="v1",
+        )
+        main.response_cache.clear()
+
+    def test_results_match_individual_endpoints(self):
+        """Test each sub-query returns the same body as its endpoint"""
+        queries = [
+            {"id": "s", "type": "summary"},
+            {"id": "d", "type": "departments"},
+            {"id": "b", "type": "budget", "year": 2020, "limit": 1},
+            {"id": "y", "type": "year", "year": 2021},
+            {"id": "t", "type": "trend", "department": "edu"},
+        ]
+        with patch("main.budget_store", self.store):
+            response = client.post("/batch", json={"queries": queries})
+            expected = [
+                client.get(path).json()
+                for path in [
+                    "/summary",
+                    "/departments",
+                    "/budget?year=2020&limit=1",
+                    "/years/2021",
+                    "/trends/edu",
+                ]
+            ]
+
+        assert response.status_code == 200
+        data = BatchResponse.model_validate(response.json())
+        assert data.dataset_version == "v1"
+        assert [r.id for r in data.results] == ["s", "d", "b", "y", "t"]
+        assert [r.data for r in data.results] == expected
+        assert data.results[2].next_cursor is not None
+
+    def test_failed_sub_queries_are_reported_per_item(self):
+        """Test that errors stay with their sub-query"""
+        queries = [
+            {"type": "year", "year": 1999},
+            {"type": "trend"},
+            {"type": "departments"},
+        ]
+        with patch("main.budget_store", self.store):
+            response = client.post("/batch", json={"queries": queries})
+
+        results = response.json()["results"]
+        assert [r["status"] for r in results] == [404, 422, 200]
+        assert "No data found" in results[0]["error"]
+        assert results[2]["data"] == ["Education", "Health"]
+
+    def test_unexpected_errors_are_reported_per_item(self):
+        """Test that an unexpected failure becomes that sub-query's 500"""
+        queries = [{"type": "summary"}, {"type": "departments"}]
+        with patch("main.budget_store", self.store), patch(
+            "main._summary_content", side_effect=RuntimeError("boom")
+        ):
+            response = client.post("/batch", json={"queries": queries})
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["status"] for r in results] == [500, 200]
+        assert results[0]["error"] == "Internal server error"
+
+    def test_drill_down_without_database(self):
+        """Test drill-down sub-queries open a session and report its absence"""
+
+        async def no_database():
+            yield None
+
+        queries = [{"type": "drill_down", "department": "Education", "year": 2020}]
+        with patch("main.budget_store", self.store), patch(
+            "main.get_async_db", no_database
+        ):
+            response = client.post("/batch", json={"queries": queries})
+
+        assert response.json()["results"][0]["status"] == 503
+
+    def test_empty_batch_rejected(self):
+        """Test that a batch needs at least one query"""
+        with patch("main.budget_store", self.store):
+            response = client.post("/batch", json={"queries": []})
+        assert response.status_code == 422
+
+
+@pytest.mark.api
+class TestDatasetLoading:
+    """Test loading and hot-swapping the dataset from Cloud Storage"""
+
+    @staticmethod
+    def _serve_blobs(mock_get_bucket, npz_blob, json_blob):
+        """Route bucket lookups to the .npz and JSON blob mocks"""
+        blobs = {
+            main.DATASET_NPZ_BLOB_NAME: npz_blob,
+            main.DATASET_BLOB_NAME: json_blob,
+        }
+        mock_get_bucket.return_value.get_blob.side_effect = blobs.get
+        mock_get_bucket.return_value.blob.side_effect = blobs.get
+
+    @patch("main.npz_cache", None)
+    @patch("main.dataset_cache", None)
+    @patch("main.get_storage_bucket")
+    def test_fetch_budget_store_uses_blob_generation(self, mock_get_bucket):
+        """Test that the store is versioned by the downloaded blob generation"""
+        blob = mock_get_bucket.return_value.blob.return_value
+        blob.generation = 1700000000000001
+        blob.download_as_bytes.return_value = (
+            b'[{"year": 2020, "name": "Test Dept", "budget": 100.0}]'
+        )
+
+        store = main.fetch_budget_store()
+
+        assert store.stats.version == "1700000000000001"
+        blob.download_as_bytes.assert_called_once_with(
+            start=0,
+            end=main.DATA_DOWNLOAD_CHUNK_BYTES - 1,
+            checksum=None,
+            if_generation_not_match=None,
+        )
+
+    @patch("main.npz_cache", None)
+    @patch("main.DATA_DOWNLOAD_CHUNK_BYTES", 16)
+    @patch("main.get_storage_bucket")
+    def test_fetch_budget_store_streams_ranged_chunks(self, mock_get_bucket, tmp_path):
+        """Test that the blob is read in generation-pinned ranges and cached"""
+        payload = (
+            b'[{"year": 2020, "name": "Test Dept", "budget": 100.0},'
+            b' {"year": 2021, "name": "Test Dept", "budget": 150.0}]'
+        )
+
+        def download_as_bytes(start, end, checksum, **conditions):
+            if start >= len(payload):
+                raise RequestRangeNotSatisfiable("past end")
+            return payload[start : end + 1]
+
+        blob = mock_get_bucket.return_value.blob.return_value
+        blob.generation = 11
+        blob.download_as_bytes.side_effect = download_as_bytes
+
+        cache = DatasetCache(str(tmp_path))
+        with patch("main.dataset_cache", cache):
+            store = main.fetch_budget_store()
+
+        assert len(store) == 2
+        assert store.to_records(store.filter_rows(year=2021)) == [
+            {"year": 2021, "budget": 150.0, "name": "Test Dept"}
+        ]
+        assert cache.load() == ("11", payload)
+        calls = blob.download_as_bytes.call_args_list
+        assert len(calls) == -(-len(payload) // 16)
+        assert all(c.kwargs["if_generation_match"] == 11 for c in calls[1:])
+
+    @patch("main.npz_cache", None)
+    @patch("main.dataset_cache", None)
+    @patch("main.get_storage_bucket")
+    def test_fetch_budget_store_not_modified(self, mock_get_bucket):
+        """Test that an unchanged generation is a conditional no-op"""
+        blob = mock_get_bucket.return_value.blob.return_value
+        blob.download_as_bytes.side_effect = NotModified("unchanged")
+
+        assert main.fetch_budget_store("1700000000000001") is None
+        blob.download_as_bytes.assert_called_once_with(
+            start=0,
+            end=main.DATA_DOWNLOAD_CHUNK_BYTES - 1,
+            checksum=None,
+            if_generation_not_match=1700000000000001,
+        )
+
+    @patch("main.npz_cache", None)
+    @patch("main.dataset_cache", None)
+    @patch("main.get_storage_bucket")
+    def test_fetch_budget_store_missing_blob(self, mock_get_bucket):
+        """Test that a missing dataset blob is reported"""
+        blob = mock_get_bucket.return_value.blob.return_value
+        blob.download_as_bytes.side_effect = NotFound("missing")
+
+        with pytest.raises(Exception, match="JSON file not found"):
+            main.fetch_budget_store()
+
+    @patch("main.npz_cache", None)
+    @patch("main.get_storage_bucket")
+    def test_fetch_budget_store_writes_cache(self, mock_get_bucket, tmp_path):
+        """Test that a fresh download is persisted to the local cache"""
+        payload = b'[{"year": 2020, "name": "Test Dept", "budget": 100.0}]'
+        blob = mock_get_bucket.return_value.blob.return_value
+        blob.generation = 7
+        blob.download_as_bytes.return_value = payload
+
+        cache = DatasetCache(str(tmp_path))
+        with patch("main.dataset_cache", cache):
+            main.fetch_budget_store()
+
+        assert cache.load() == ("7", payload)
+
+    @patch("main.get_storage_bucket")
+    def test_fetch_budget_store_prefers_columnar_artifact(
+        self, mock_get_bucket, tmp_path
+    ):
+        """Test that the .npz artifact is downloaded into the cache and mapped"""
+        source = BudgetStore.from_records(
+            [{"year": 2020, "name": "Test Dept", "budget": 100.0}]
+        )
+        source_path = str(tmp_path / "source.npz")
+        source.save_npz(source_path)
+
+        def download_to_filename(path, if_generation_match=None):
+            with open(source_path, "rb") as src, open(path, "wb") as dst:
+                dst.write(src.read())
+
+        npz_blob = MagicMock(generation=9, metadata={"source_generation": "5"})
+        npz_blob.download_to_filename.side_effect = download_to_filename
+        self._serve_blobs(mock_get_bucket, npz_blob, MagicMock(generation=5))
+
+        npz_cache = DatasetCache(str(tmp_path / "cache"), "georgian_budget.npz")
+        with patch("main.npz_cache", npz_cache):
+            store = main.fetch_budget_store()
+            assert main.fetch_budget_store("9") is None
+
+        assert store.stats.version == "9"
+        assert store.stats.content_hash == source.stats.content_hash
+        assert npz_cache.load_path() == ("9", npz_cache.data_path)
+        npz_blob.download_to_filename.assert_called_once()
+        assert npz_blob.download_to_filename.call_args.kwargs == {
+            "if_generation_match": 9
+        }
+        mock_get_bucket.return_value.blob.assert_not_called()
+
+    @patch("main.npz_cache", None)
+    @patch("main.dataset_cache", None)
+    @patch("main.get_storage_bucket")
+    def test_columnar_artifact_without_cache_dir(self, mock_get_bucket, tmp_path):
+        """Test that the .npz is mapped from a removed temp file without a cache"""
+        source = BudgetStore.from_records(
+            [{"year": 2020, "name": "Test Dept", "budget": 100.0}]
+        )
+        source_path = str(tmp_path / "source.npz")
+        source.save_npz(source_path)
+        downloads = []
+
+        def download_to_filename(path, if_generation_match=None):
+            downloads.append(path)
+            with open(source_path, "rb") as src, open(path, "wb") as dst:
+                dst.write(src.read())
+
+        npz_blob = MagicMock(generation=9, metadata={"source_generation": "5"})
+        npz_blob.download_to_filename.side_effect = download_to_filename
+        json_blob = MagicMock(generation=5)
+        self._serve_blobs(mock_get_bucket, npz_blob, json_blob)
+
+        store = main.fetch_budget_store()
+
+        assert store.stats.version == "9"
+        assert store.to_records([0])[0]["name"] == "Test Dept"
+        assert not os.path.exists(downloads[0])
+        json_blob.download_as_bytes.assert_not_called()
+
+    @patch("main.dataset_cache", None)
+    @patch("main.get_storage_bucket")
+    def test_stale_columnar_artifact_falls_back_to_json(
+        self, mock_get_bucket, tmp_path
+    ):
+        """Test that an .npz built from older JSON is not served"""
+        npz_blob = MagicMock(generation=9, metadata={"source_generation": "5"})
+        json_blob = MagicMock(generation=6)
+        json_blob.download_as_bytes.return_value = (
+            b'[{"year": 2021, "name": "New Dept", "budget": 1.0}]'
+        )
+        self._serve_blobs(mock_get_bucket, npz_blob, json_blob)
+
+        npz_cache = DatasetCache(str(tmp_path), "georgian_budget.npz")
+        with patch("main.npz_cache", npz_cache):
+            # The served version is the stale artifact's, so JSON is not skipped
+            store = main.fetch_budget_store("9")
+
+        assert store.stats.version == "6"
+        npz_blob.download_to_filename.assert_not_called()
+
+    @patch("main.dataset_cache", None)
+    @patch("main.get_storage_bucket")
+    def test_fetch_budget_store_falls_back_to_json(self, mock_get_bucket, tmp_path):
+        """Test that JSON is used when the pipeline produced no .npz artifact"""
+        json_blob = MagicMock(generation=5)
+        json_blob.download_as_bytes.return_value = (
+            b'[{"year": 2020, "name": "Test Dept", "budget": 100.0}]'
+        )
+        self._serve_blobs(mock_get_bucket, None, json_blob)
+
+        npz_cache = DatasetCache(str(tmp_path), "georgian_budget.npz")
+        with patch("main.npz_cache", npz_cache):
+            store = main.fetch_budget_store()
+
+        assert store.stats.version == "5"
+        assert npz_cache.load_path() is None
+        assert not list(tmp_path.iterdir())
+
+    @patch("main.npz_cache", None)
+    @patch("main.CLOUD_STORAGE_BUCKET", "test-bucket")
+    @patch("main.load_budget_data_from_cloud_storage")
+    def test_load_budget_data_prefers_cache(self, mock_load_from_gcs, tmp_path):
+        """Test that startup serves a cached snapshot without touching GCS"""
+        cache = DatasetCache(str(tmp_path))
+        cache.save("7", b'[{"year": 2020, "name": "Cached Dept", "budget": 1.0}]')
+
+        with patch("main.dataset_cache", cache), patch("main.budget_store", None):
+            assert main.load_budget_data() is True
+            assert main.budget_store.stats.version == "7"
+
+        mock_load_from_gcs.assert_not_called()
+
+    def test_cached_json_newer_than_cached_npz_wins(self, tmp_path):
+        """Test that startup serves the newest of the two cached artifacts"""
+        cache = DatasetCache(str(tmp_path))
+        npz_cache = DatasetCache(str(tmp_path), "georgian_budget.npz")
+        npz_path = str(tmp_path / "old.npz")
+        BudgetStore.from_records(
+            [{"year": 2020, "name": "Old Dept", "budget": 1.0}]
+        ).save_npz(npz_path)
+        npz_cache.save_file("8", npz_path)
+
+        cache.save("7", b'[{"year": 2021, "name": "Older Dept", "budget": 2.0}]')
+        with patch("main.dataset_cache", cache), patch("main.npz_cache", npz_cache):
+            assert main.load_cached_budget_store().stats.version == "8"
+
+        cache.save("9", b'[{"year": 2021, "name": "New Dept", "budget": 2.0}]')
+        with patch("main.dataset_cache", cache), patch("main.npz_cache", npz_cache):
+            store = main.load_cached_budget_store()
+
+        assert store.stats.version == "9"
+        assert store.department_names == ("New Dept",)
+
+    @patch("main.CLOUD_STORAGE_BUCKET", "test-bucket")
+    @patch("main.DATA_LOAD_RETRY_SECONDS", 0)
+    @patch("main.start_dataset_refresher")
+    def test_background_load_retries_until_published(self, mock_start_refresher):
+        """Test that a failed startup load is retried off the request path"""
+        with patch(
+            "main.load_budget_data", side_effect=[Exception("GCS timeout"), False]
+        ) as mock_load:
+            asyncio.run(main.load_budget_data_in_background())
+
+        assert mock_load.call_count == 2
+        assert main.dataset_load_error is None
+        mock_start_refresher.assert_called_once_with(revalidate=False)
+
+    @patch("main.CLOUD_STORAGE_BUCKET", "")
+    @patch("main.start_dataset_refresher")
+    def test_background_load_stops_without_bucket(self, mock_start_refresher):
+        """Test that a missing bucket is reported instead of retried forever"""
+        with patch("main.dataset_load_error", None):
+            asyncio.run(main.load_budget_data_in_background())
+            assert main.dataset_load_error == "Cloud Storage bucket not configured"
+        mock_start_refresher.assert_not_called()
+
+    def test_publish_budget_store_swaps_snapshot(self):
+        """Test that publishing replaces the store served by endpoints"""
+        old_store = BudgetStore.from_records(
+            [{"year": 2020, "name": "Old Dept", "budget": 100.0}]
+        )
+        new_store = BudgetStore.from_records(
+            [{"year": 2021, "name": "New Dept", "budget": 200.0}]
+        )
+
+        with patch("main.budget_store", old_store):
+            assert client.get("/departments").json() == ["Old Dept"]
+            main.publish_budget_store(new_store)
+            assert client.get("/departments").json() == ["New Dept"]
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
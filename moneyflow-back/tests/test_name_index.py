@@ -0,0 +1,64 @@
+import pytest
+from name_index import NgramIndex
+
+NAMES = [
+    "Education",
+    "Health",
+    "Social Protection",
+    "Public Order and Safety",
+    "",
+    "განათლება",
+]
+
+
+@pytest.fixture
+def index():
+    return NgramIndex(NAMES)
+
+
+@pytest.mark.api
+class TestNgramIndex:
+    """Test n-gram substring matching"""
+
+    def test_long_query_uses_trigrams(self, index):
+        """Test queries longer than n are intersected and verified"""
+        assert index.search("protection") == [2]
+        assert index.search("tion") == [0, 2]
+
+    def test_short_queries(self, index):
+        """Test queries up to n characters resolve with a single lookup"""
+        assert index.search("he") == [1]
+        assert index.search("o") == [0, 2, 3]
+        assert index.search("ion") == [0, 2]
+
+    def test_case_insensitive(self, index):
+        """Test that matching ignores case"""
+        assert index.search("EDUCATION") == [0]
+        assert index.search("pUbLiC") == [3]
+
+    def test_candidates_are_verified(self, index):
+        """Test that names sharing all trigrams but not the substring are rejected"""
+        index = NgramIndex(["abcXbcd", "abcd"])
+        assert index.search("abcd") == [1]
+
+    def test_unicode_names(self, index):
+        """Test Georgian department names"""
+        assert index.search("განათ") == [5]
+
+    def test_no_match(self, index):
+        """Test queries without matches"""
+        assert index.search("zzz") == []
+        assert index.search("healthy") == []
+
+    def test_empty_query_matches_all_named(self, index):
+        """Test that an empty query returns every non-empty name"""
+        assert index.search("") == [0, 1, 2, 3, 5]
+
+    def test_invalid_gram_size(self):
+        """Test that n must be positive"""
+        with pytest.raises(ValueError):
+            NgramIndex(NAMES, n=0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
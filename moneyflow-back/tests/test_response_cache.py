@@ -0,0 +1,80 @@
+import pytest
+from response_cache import CachedResponse, ResponseCache, etag_matches, make_etag
+
+
+@pytest.mark.api
+class TestResponseCache:
+    """Test the bounded LRU of serialized responses"""
+
+    def test_get_and_put(self):
+        """Test that stored bodies are returned and misses counted"""
+        cache = ResponseCache()
+        assert cache.get(("v1", "/summary", ())) is None
+
+        cache.put(("v1", "/summary", ()), CachedResponse(b"{}", {"X-Test": "1"}))
+        assert cache.get(("v1", "/summary", ())) == (b"{}", {"X-Test": "1"})
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_evicts_least_recently_used_entry(self):
+        """Test that the entry cap evicts the coldest entry first"""
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", CachedResponse(b"1"))
+        cache.put("b", CachedResponse(b"2"))
+        cache.get("a")
+        cache.put("c", CachedResponse(b"3"))
+
+        assert cache.get("b") is None
+        assert cache.get("a").body == b"1"
+        assert cache.get("c").body == b"3"
+
+    def test_memory_cap(self):
+        """Test that total body size stays under the byte cap"""
+        cache = ResponseCache(max_bytes=10)
+        cache.put("a", CachedResponse(b"12345"))
+        cache.put("b", CachedResponse(b"123456"))
+        cache.put("too-big", CachedResponse(b"x" * 11))
+
+        assert cache.size_bytes == 6
+        assert cache.get("a") is None
+        assert cache.get("too-big") is None
+
+    def test_replace_and_clear(self):
+        """Test that replacing an entry and clearing keep sizes consistent"""
+        cache = ResponseCache()
+        cache.put("a", CachedResponse(b"12345"))
+        cache.put("a", CachedResponse(b"12"))
+        assert cache.size_bytes == 2
+
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.size_bytes == 0
+
+
+@pytest.mark.api
+class TestEtags:
+    """Test ETag generation and If-None-Match comparison"""
+
+    def test_etag_is_quoted_version(self):
+        assert make_etag("abc123") == '"abc123"'
+
+    def test_etag_includes_schema(self):
+        assert make_etag("abc123", "1.0.0") == '"1.0.0-abc123"'
+
+    @pytest.mark.parametrize(
+        "header,expected",
+        [
+            ('"abc123"', True),
+            ('W/"abc123"', True),
+            ('"old", "abc123"', True),
+            ("*", True),
+            ('"old"', False),
+            ("abc123", False),
+            (None, False),
+        ],
+    )
+    def test_if_none_match(self, header, expected):
+        assert etag_matches(header, '"abc123"') is expected
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -1,4 +1,5 @@
 import os
+from urllib.parse import urlencode
 
 import requests
 from flask import Flask, jsonify, render_template, request, send_from_directory
@@ -20,6 +21,17 @@ def fetch_api_data(endpoint):
         return None
 
 
+def post_api_data(endpoint, payload):
+    """Post a JSON payload to the API"""
+    try:
+        response = requests.post(f"{API_BASE_URL}{endpoint}", json=payload, timeout=30)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        print(f"Error posting data to API: {e}")
+        return None
+
+
 @app.route("/")
 def dashboard():
     """Main dashboard page"""
@@ -78,6 +90,43 @@ def api_budget():
     return jsonify(budget_data or [])
 
 
+@app.route("/api/aggregate")
+def api_aggregate():
+    """Get budget metrics grouped by year or department"""
+    allowed = (
+        "group_by",
+        "metric",
+        "year",
+        "department",
+        "min_budget",
+        "max_budget",
+        "min_year",
+        "max_year",
+    )
+    params = {key: request.args[key] for key in allowed if request.args.get(key)}
+
+    endpoint = f"/aggregate?{urlencode(params)}"
+    aggregate_data = fetch_api_data(endpoint)
+    return jsonify(aggregate_data or {"groups": []})
+
+
+@app.route("/api/compare")
+def api_compare():
+    """Get per-department budgets of two years with changes"""
+    allowed = ("year_a", "year_b", "department")
+    params = {key: request.args[key] for key in allowed if request.args.get(key)}
+
+    compare_data = fetch_api_data(f"/compare?{urlencode(params)}")
+    return jsonify(compare_data or {"error": "Comparison not available"})
+
+
+@app.route("/api/batch", methods=["POST"])
+def api_batch():
+    """Run several API queries in one round trip"""
+    batch_data = post_api_data("/batch", request.get_json(silent=True) or {})
+    return jsonify(batch_data or {"results": []})
+
+
 @app.route("/api/departments")
 def api_departments():
     """Get list of departments"""
@@ -95,7 +144,13 @@ def api_trends(department):
 @app.route("/api/year/<int:year>")
 def api_year(year):
     """Get year summary"""
-    year_data = fetch_api_data(f"/years/{year}")
+    top_k = request.args.get("top_k")
+
+    endpoint = f"/years/{year}"
+    if top_k:
+        endpoint += "?" + urlencode({"top_k": top_k})
+
+    year_data = fetch_api_data(endpoint)
     return jsonify(year_data or {"error": "Year not found"})
 
 
@@ -113,6 +168,17 @@ def api_drill_down(department):
     return jsonify(drill_down_data or {"error": "Department not found"})
 
 
+@app.route("/api/drill-down/compare/<department>")
+def api_drill_down_compare(department):
+    """Get sub-department budgets of a department in two years"""
+    allowed = ("year_a", "year_b")
+    params = {key: request.args[key] for key in allowed if request.args.get(key)}
+
+    endpoint = f"/drill-down/compare/{department}?{urlencode(params)}"
+    compare_data = fetch_api_data(endpoint)
+    return jsonify(compare_data or {"error": "Comparison not available"})
+
+
 @app.route("/api/drill-down/analysis/<department>/<int:year>")
 def api_drill_down_analysis(department, year):
     """Get comprehensive drill-down analysis for a department and year"""
@@ -2,12 +2,18 @@ let currentData = [];
 let allDepartments = [];
 let yearChart, departmentChart;
 let latestYear = null; // Store the latest available year
+let datasetSummary = null; // Summary from the init batch, reused by the metric cards
 
 // Initialize dashboard
 async function init() {
     await checkApiHealth();
-    await loadSummary();
-    await loadDepartments();
+    // Summary and departments come from one snapshot in a single round trip
+    const [summary, departments] = await fetchBatch([
+        { type: 'summary' },
+        { type: 'departments' }
+    ]);
+    loadSummary(summary);
+    loadDepartments(departments);
     setupCharts(); // Setup charts first
     await loadInitialData(); // Then load data
 }
@@ -27,10 +33,29 @@ async function checkApiHealth() {
     }
 }
 
-async function loadSummary() {
+async function fetchBatch(queries) {
+    // Returns each sub-query's data in order, or null where it failed
     try {
-        const response = await fetch('/api/summary');
-        const summary = await response.json();
+        const response = await fetch('/api/batch', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ queries })
+        });
+        const batch = await response.json();
+        return queries.map((_, i) => {
+            const result = (batch.results || [])[i];
+            return result && result.status === 200 ? result.data : null;
+        });
+    } catch (error) {
+        console.error('Error fetching batch:', error);
+        return queries.map(() => null);
+    }
+}
+
+function loadSummary(summary) {
+    try {
+        if (!summary) throw new Error('Summary not available');
+        datasetSummary = summary;
 
         document.getElementById('year-range').textContent = summary.year_range ? `${summary.year_range[0]}-${summary.year_range[1]}` : '-';
         document.getElementById('total-budget').textContent = summary.total_budget ? summary.total_budget.toLocaleString(undefined, {maximumFractionDigits: 1}) + 'M ₾' : '-';
@@ -54,10 +79,10 @@ async function loadSummary() {
     }
 }
 
-async function loadDepartments() {
+function loadDepartments(departments) {
     try {
-        const response = await fetch('/api/departments');
-        allDepartments = await response.json();
+        if (!departments) throw new Error('Departments not available');
+        allDepartments = departments;
 
         const departmentFilter = document.getElementById('department-filter');
         allDepartments.forEach(dept => {
@@ -119,6 +144,17 @@ async function updateCharts() {
     }
 }
 
+// Summary loaded by init(), fetched once here only if that batch failed
+async function getSummary() {
+    if (!datasetSummary) {
+        const response = await fetch('/api/summary');
+        const summary = await response.json();
+        if (!response.ok) return summary;
+        datasetSummary = summary;
+    }
+    return datasetSummary;
+}
+
 async function updateMetricsCards(year, department) {
     try {
         // Update Years Covered
@@ -127,8 +163,7 @@ async function updateMetricsCards(year, department) {
             document.getElementById('year-range').textContent = year;
         } else {
             // All years selected - get from summary
-            const response = await fetch('/api/summary');
-            const summary = await response.json();
+            const summary = await getSummary();
             if (summary.year_range) {
                 document.getElementById('year-range').textContent = `${summary.year_range[0]}-${summary.year_range[1]}`;
             }
@@ -144,9 +179,10 @@ async function updateMetricsCards(year, department) {
             }
         } else if (year) {
             // Specific year, all departments
-            const yearData = currentData.filter(record => record.year == year);
-            if (yearData.length > 0) {
-                const totalBudget = yearData.reduce((sum, record) => sum + record.budget, 0);
+            const response = await fetch(`/api/aggregate?group_by=year&metric=sum&year=${year}`);
+            const aggregate = await response.json();
+            if (aggregate.groups && aggregate.groups.length > 0) {
+                const totalBudget = aggregate.groups[0].value;
                 document.getElementById('total-budget').textContent = totalBudget.toLocaleString(undefined, {maximumFractionDigits: 1}) + 'M ₾';
             }
         } else if (department) {
@@ -158,8 +194,7 @@ async function updateMetricsCards(year, department) {
             }
         } else {
             // All years and all departments - get from summary
-            const response = await fetch('/api/summary');
-            const summary = await response.json();
+            const summary = await getSummary();
             if (summary.total_budget) {
                 document.getElementById('total-budget').textContent = summary.total_budget.toLocaleString(undefined, {maximumFractionDigits: 1}) + 'M ₾';
             }
@@ -189,8 +224,7 @@ async function updateMetricsCards(year, department) {
             }
         } else {
             // All departments selected - get total departments count from summary
-            const response = await fetch('/api/summary');
-            const summary = await response.json();
+            const summary = await getSummary();
             if (summary.departments_count) {
                 document.getElementById('departments-count').textContent = summary.departments_count;
             }
@@ -273,21 +307,20 @@ function updateYearChart() {
     }
 }
 
-function updateTimeSeriesChart() {
-    console.log('🔍 updateTimeSeriesChart called with currentData:', {
-        length: currentData ? currentData.length : 'undefined',
-        sample: currentData ? currentData.slice(0, 3) : 'undefined'
-    });
-
-    const yearData = {};
-    currentData.forEach(record => {
-        yearData[record.year] = (yearData[record.year] || 0) + record.budget;
-    });
+async function updateTimeSeriesChart() {
+    console.log('🔍 updateTimeSeriesChart called');
 
-    console.log('📊 Processed yearData:', yearData);
+    // Yearly totals are aggregated server-side over the whole dataset
+    let groups = [];
+    try {
+        const response = await fetch('/api/aggregate?group_by=year&metric=sum');
+        groups = (await response.json()).groups || [];
+    } catch (error) {
+        console.error('Error fetching yearly totals:', error);
+    }
 
-    const years = Object.keys(yearData).sort();
-    const budgets = years.map(year => yearData[year]);
+    const years = groups.map(group => String(group.key));
+    const budgets = groups.map(group => group.value);
 
     console.log('📊 Final chart data:', { years, budgets });
 
@@ -362,61 +395,29 @@ function updateDepartmentTimeSeriesChart(department) {
     console.log('🔍 Department time series chart updated');
 }
 
+function formatChangePercent(item) {
+    if (item.change_percent === null || item.change_percent === undefined) {
+        return item.budget_b > 0 ? '+∞%' : '0%';
+    }
+    const change = item.change_percent;
+    return change >= 0 ? `+${change.toFixed(1)}%` : `${change.toFixed(1)}%`;
+}
+
 async function updateYearComparisonChart(selectedYear) {
     try {
         // Fetch data for the selected year and previous year
         const previousYear = parseInt(selectedYear) - 1;
 
-        // Get data for both years
-        let currentYearUrl = `/api/budget?year=${selectedYear}&limit=1000`;
-        let previousYearUrl = `/api/budget?year=${previousYear}&limit=1000`;
+        // Aligned per-department budgets and changes for both years
+        const response = await fetch(`/api/compare?year_a=${previousYear}&year_b=${selectedYear}`);
+        const comparison = await response.json();
+        const items = comparison.items || [];
 
-        const [currentResponse, previousResponse] = await Promise.all([
-            fetch(currentYearUrl),
-            fetch(previousYearUrl)
-        ]);
-
-        const currentYearData = await currentResponse.json();
-        const previousYearData = await previousResponse.json();
-
-        // Create department comparison data
-        const comparisonData = {};
-
-        // Process current year data
-        currentYearData.forEach(record => {
-            comparisonData[record.name] = {
-                current: record.budget,
-                previous: 0
-            };
-        });
-
-        // Process previous year data
-        previousYearData.forEach(record => {
-            if (comparisonData[record.name]) {
-                comparisonData[record.name].previous = record.budget;
-            } else {
-                comparisonData[record.name] = {
-                    current: 0,
-                    previous: record.budget
-                };
-            }
-        });
-
-        // Convert to chart format and sort by current year budget
-        const departments = Object.keys(comparisonData);
-        const sortedDepartments = departments.sort((a, b) => comparisonData[b].current - comparisonData[a].current);
-
-        const currentBudgets = sortedDepartments.map(dept => comparisonData[dept].current);
-        const previousBudgets = sortedDepartments.map(dept => comparisonData[dept].previous);
-
-        // Calculate percentage changes for tooltip
-        const percentageChanges = sortedDepartments.map(dept => {
-            const current = comparisonData[dept].current;
-            const previous = comparisonData[dept].previous;
-            if (previous === 0) return current > 0 ? '+∞%' : '0%';
-            const change = ((current - previous) / previous) * 100;
-            return change >= 0 ? `+${change.toFixed(1)}%` : `${change.toFixed(1)}%`;
-        });
+        // Already sorted by selected year budget
+        const sortedDepartments = items.map(item => item.name);
+        const currentBudgets = items.map(item => item.budget_b);
+        const previousBudgets = items.map(item => item.budget_a);
+        const percentageChanges = items.map(item => formatChangePercent(item));
 
         // Update chart type and options for comparison
         // Destroy and recreate chart to ensure proper bar chart rendering
@@ -487,9 +488,9 @@ async function updateYearComparisonChart(selectedYear) {
         ];
 
         // Show summary info
-        const totalCurrent = currentBudgets.reduce((sum, budget) => sum + budget, 0);
-        const totalPrevious = previousBudgets.reduce((sum, budget) => sum + budget, 0);
-        const totalChange = totalPrevious > 0 ? ((totalCurrent - totalPrevious) / totalPrevious) * 100 : 0;
+        const totalCurrent = comparison.total_b || 0;
+        const totalPrevious = comparison.total_a || 0;
+        const totalChange = comparison.change_percent || 0;
         const changeText = totalChange >= 0 ? `+${totalChange.toFixed(1)}%` : `${totalChange.toFixed(1)}%`;
         const changeColor = totalChange >= 0 ? '#45b089' : '#FF6B6B';
 
@@ -607,84 +608,22 @@ async function updateSubDepartmentYearComparison(department, selectedYear) {
 
         console.log('🔍 updateSubDepartmentYearComparison called with:', { department, selectedYear, previousYear });
 
-        // Fetch drill-down data for both years
-        const [currentResponse, previousResponse] = await Promise.all([
-            fetch(`/api/drill-down/${encodeURIComponent(department)}?year=${selectedYear}`),
-            fetch(`/api/drill-down/${encodeURIComponent(department)}?year=${previousYear}`)
-        ]);
+        // Sub-department budgets of both years in one request
+        const response = await fetch(`/api/drill-down/compare/${encodeURIComponent(department)}?year_a=${previousYear}&year_b=${selectedYear}`);
+        const comparison = await response.json();
 
-        const currentYearData = await currentResponse.json();
-        const previousYearData = await previousResponse.json();
-
-        console.log('📊 Current year data:', currentYearData);
-        console.log('📊 Previous year data:', previousYearData);
-        console.log('📊 Current year sub-departments:', currentYearData.sub_departments);
-        console.log('📊 Previous year sub-departments:', previousYearData.sub_departments);
-
-        if (currentYearData.error || !currentYearData.sub_departments) {
-            console.log('⚠️ Current year drill-down failed, falling back to main department comparison');
+        if (comparison.error || !comparison.items || comparison.items.length === 0) {
+            console.log('⚠️ Drill-down comparison failed, falling back to main department comparison');
             updateYearComparisonChart(selectedYear);
             return;
         }
 
-        const currentSubDepts = currentYearData.sub_departments || [];
-        const previousSubDepts = previousYearData.sub_departments || [];
-
-        // Create comparison data for sub-departments
-        const comparisonData = {};
-
-        // First, collect all unique sub-department names from both years
-        const allSubDeptNames = new Set();
-        currentSubDepts.forEach(sub => allSubDeptNames.add(sub.name_english));
-        previousSubDepts.forEach(sub => allSubDeptNames.add(sub.name_english));
-
-        console.log('🔍 All unique sub-department names:', Array.from(allSubDeptNames));
-
-        // Initialize all sub-departments with 0 values
-        allSubDeptNames.forEach(name => {
-            comparisonData[name] = {
-                current: 0,
-                previous: 0,
-                allocation: 0
-            };
-        });
-
-        // Process current year sub-departments
-        currentSubDepts.forEach(sub => {
-            if (comparisonData[sub.name_english]) {
-                comparisonData[sub.name_english].current = sub.budget_amount || 0;
-                comparisonData[sub.name_english].allocation = sub.allocation_percentage;
-            }
-        });
-
-        // Process previous year sub-departments
-        previousSubDepts.forEach(sub => {
-            if (comparisonData[sub.name_english]) {
-                comparisonData[sub.name_english].previous = sub.budget_amount || 0;
-                // Keep the current year allocation if we have it, otherwise use previous year
-                if (!comparisonData[sub.name_english].allocation) {
-                    comparisonData[sub.name_english].allocation = sub.allocation_percentage;
-                }
-            }
-        });
-
-        console.log('📊 Comparison data after processing:', comparisonData);
-
-        // Sort by current year budget
-        const subDeptNames = Object.keys(comparisonData);
-        const sortedSubDepts = subDeptNames.sort((a, b) => comparisonData[b].current - comparisonData[a].current);
-
-        const currentBudgets = sortedSubDepts.map(name => comparisonData[name].current);
-        const previousBudgets = sortedSubDepts.map(name => comparisonData[name].previous);
-
-        // Calculate percentage changes
-        const percentageChanges = sortedSubDepts.map(name => {
-            const current = comparisonData[name].current;
-            const previous = comparisonData[name].previous;
-            if (previous === 0) return current > 0 ? '+∞%' : '0%';
-            const change = ((current - previous) / previous) * 100;
-            return change >= 0 ? `+${change.toFixed(1)}%` : `${change.toFixed(1)}%`;
-        });
+        // Already sorted by selected year budget
+        const items = comparison.items;
+        const sortedSubDepts = items.map(item => item.name);
+        const currentBudgets = items.map(item => item.budget_b);
+        const previousBudgets = items.map(item => item.budget_a);
+        const percentageChanges = items.map(item => formatChangePercent(item));
 
         // Update chart for sub-department comparison
         // Destroy and recreate chart to ensure proper bar chart rendering
@@ -758,8 +697,7 @@ async function updateSubDepartmentYearComparison(department, selectedYear) {
             callbacks: {
                 afterBody: function(context) {
                     const dataIndex = context[0].dataIndex;
-                    const subDeptName = sortedSubDepts[dataIndex];
-                    const allocation = comparisonData[subDeptName].allocation;
+                    const allocation = items[dataIndex].allocation_percentage;
                     return `Change: ${percentageChanges[dataIndex]} | Allocation: ${allocation}%`;
                 }
             }
@@ -772,8 +710,8 @@ async function updateSubDepartmentYearComparison(department, selectedYear) {
         };
 
         // Show summary info
-        const totalCurrent = currentYearData.total_budget || currentBudgets.reduce((sum, budget) => sum + budget, 0);
-        const totalPrevious = previousYearData.total_budget || previousBudgets.reduce((sum, budget) => sum + budget, 0);
+        const totalCurrent = comparison.total_b || currentBudgets.reduce((sum, budget) => sum + budget, 0);
+        const totalPrevious = comparison.total_a || previousBudgets.reduce((sum, budget) => sum + budget, 0);
         const totalChange = totalPrevious > 0 ? ((totalCurrent - totalPrevious) / totalPrevious) * 100 : 0;
         const changeText = totalChange >= 0 ? `+${totalChange.toFixed(1)}%` : `${totalChange.toFixed(1)}%`;
         const changeColor = totalChange >= 0 ? '#45b089' : '#FF6B6B';
@@ -114,6 +114,51 @@ class TestAPIEndpoints:
         assert len(data) == 1
         assert data[0]["name"] == "Test Dept"
 
+    @patch("app.fetch_api_data")
+    def test_api_aggregate_proxy(self, mock_fetch, client):
+        """Test API aggregate endpoint forwards only supported parameters"""
+        mock_fetch.return_value = {
+            "group_by": "year",
+            "metric": "sum",
+            "groups": [{"key": 2020, "value": 100.0, "count": 1}],
+        }
+
+        response = client.get(
+            "/api/aggregate?group_by=year&department=A B&min_budget=5&x=1"
+        )
+        assert response.status_code == 200
+        assert json.loads(response.data)["groups"][0]["key"] == 2020
+        mock_fetch.assert_called_once_with(
+            "/aggregate?group_by=year&department=A+B&min_budget=5"
+        )
+
+    @patch("app.fetch_api_data")
+    def test_api_compare_proxy(self, mock_fetch, client):
+        """Test API compare endpoints forward the two years"""
+        mock_fetch.return_value = {"year_a": 2019, "year_b": 2020, "items": []}
+
+        response = client.get("/api/compare?year_a=2019&year_b=2020&x=1")
+        assert response.status_code == 200
+        assert json.loads(response.data)["year_b"] == 2020
+        mock_fetch.assert_called_once_with("/compare?year_a=2019&year_b=2020")
+
+        mock_fetch.reset_mock()
+        client.get("/api/drill-down/compare/Health?year_a=2019&year_b=2020")
+        mock_fetch.assert_called_once_with(
+            "/drill-down/compare/Health?year_a=2019&year_b=2020"
+        )
+
+    @patch("app.post_api_data")
+    def test_api_batch_proxy(self, mock_post, client):
+        """Test API batch endpoint forwards the queries in one request"""
+        queries = {"queries": [{"type": "summary"}, {"type": "departments"}]}
+        mock_post.return_value = {"dataset_version": "1", "results": []}
+
+        response = client.post("/api/batch", json=queries)
+        assert response.status_code == 200
+        assert json.loads(response.data)["dataset_version"] == "1"
+        mock_post.assert_called_once_with("/batch", queries)
+
     @patch("app.fetch_api_data")
     def test_api_budget_default_limit(self, mock_fetch, client):
         """Test API budget endpoint with default limit"""
@@ -198,6 +243,23 @@ class TestAPIEndpoints:
         assert data["year"] == 2020
         assert data["total_budget"] == 500000.0
 
+    @patch("app.fetch_api_data")
+    def test_api_year_forwards_top_k(self, mock_fetch, client):
+        """Test API year endpoint forwards top_k"""
+        mock_fetch.return_value = {"year": 2020, "top_departments": []}
+
+        response = client.get("/api/year/2020?top_k=5")
+        assert response.status_code == 200
+        mock_fetch.assert_called_once_with("/years/2020?top_k=5")
+
+    @patch("app.fetch_api_data")
+    def test_api_year_encodes_top_k(self, mock_fetch, client):
+        """Test API year endpoint encodes top_k instead of splicing it raw"""
+        mock_fetch.return_value = {"year": 2020}
+
+        client.get("/api/year/2020?top_k=5%26x%3D1")
+        mock_fetch.assert_called_once_with("/years/2020?top_k=5%26x%3D1")
+
     @patch("app.fetch_api_data")
     def test_api_year_not_found(self, mock_fetch, client):
         """Test API year endpoint for non-existent year"""
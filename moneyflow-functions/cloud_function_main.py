@@ -35,6 +35,11 @@ GEOSTAT_URL = os.environ.get(
 )
 
 
+# Columnar artifacts and the JSON they are built from; the API only serves an
+# artifact whose "source_generation" metadata names the current JSON generation
+COLUMNAR_SOURCES = {"georgian_budget.npz": "georgian_budget.json"}
+
+
 # Simple JSON response helper (replaces Flask jsonify)
 def jsonify(data, status_code=200):
     """Simple JSON response helper"""
@@ -134,6 +139,7 @@ def run_datapackage_pipeline(pipeline_dir: str, work_dir: str) -> tuple:
         datapackage_path = os.path.join(
             work_dir, "data", "processed", "datapackage.json"
         )
+        npz_path = os.path.join(work_dir, "data", "processed", "georgian_budget.npz")
 
         # Verify files exist
         if not os.path.exists(csv_path):
@@ -142,13 +148,17 @@ def run_datapackage_pipeline(pipeline_dir: str, work_dir: str) -> tuple:
             raise FileNotFoundError(f"JSON output not found: {json_path}")
         if not os.path.exists(datapackage_path):
             raise FileNotFoundError(f"Datapackage output not found: {datapackage_path}")
+        if not os.path.exists(npz_path):
+            # The API falls back to JSON when the columnar artifact is missing
+            logger.warning(f"⚠️ Columnar output not found: {npz_path}")
 
         logger.info("📁 Output files generated:")
         logger.info(f"  CSV: {csv_path}")
         logger.info(f"  JSON: {json_path}")
         logger.info(f"  Datapackage: {datapackage_path}")
+        logger.info(f"  Columnar: {npz_path}")
 
-        return csv_path, json_path, datapackage_path
+        return csv_path, json_path, datapackage_path, npz_path
 
     except Exception as e:
         logger.error(f"❌ Pipeline execution failed: {e}")
@@ -164,6 +174,7 @@ def upload_to_storage(files: list, bucket_name: str) -> list:
         bucket = storage_client.bucket(bucket_name)
 
         uploaded_files = []
+        generations = {}
         for file_path in files:
             if os.path.exists(file_path):
                 # Determine destination path in storage
@@ -172,7 +183,14 @@ def upload_to_storage(files: list, bucket_name: str) -> list:
 
                 # Upload file
                 blob = bucket.blob(destination_blob_name)
+                source = COLUMNAR_SOURCES.get(filename)
+                if source is not None:
+                    if source not in generations:
+                        logger.warning(f"⚠️ Skipping {filename}: {source} not uploaded")
+                        continue
+                    blob.metadata = {"source_generation": str(generations[source])}
                 blob.upload_from_filename(file_path)
+                generations[filename] = blob.generation
 
                 logger.info(f"✅ Uploaded {filename} to {destination_blob_name}")
                 uploaded_files.append(destination_blob_name)
@@ -186,6 +204,18 @@ def upload_to_storage(files: list, bucket_name: str) -> list:
         raise
 
 
+def storage_urls(uploaded_files: list) -> dict:
+    """gs:// URLs of the outputs, listing the columnar artifact only if uploaded"""
+    urls = {
+        "csv": f"gs://{DATA_BUCKET_NAME}/processed/georgian_budget.csv",
+        "json": f"gs://{DATA_BUCKET_NAME}/processed/georgian_budget.json",
+        "datapackage": f"gs://{DATA_BUCKET_NAME}/processed/datapackage.json",
+    }
+    if "processed/georgian_budget.npz" in uploaded_files:
+        urls["columnar"] = f"gs://{DATA_BUCKET_NAME}/processed/georgian_budget.npz"
+    return urls
+
+
 def process_budget_data(trigger_data: dict) -> dict:
     """Main processing function for both event and HTTP triggers"""
     logger.info("🚀 Starting Georgian Budget Data Pipeline")
@@ -199,12 +229,19 @@ def process_budget_data(trigger_data: dict) -> dict:
             pipeline_dir, data_dir = setup_pipeline_environment(work_dir)
 
             # Run the datapackage-pipelines
-            csv_path, json_path, datapackage_path = run_datapackage_pipeline(
-                pipeline_dir, work_dir
-            )
+            (
+                csv_path,
+                json_path,
+                datapackage_path,
+                npz_path,
+            ) = run_datapackage_pipeline(pipeline_dir, work_dir)
 
             # Upload to Cloud Storage
-            files_to_upload = [csv_path, json_path, datapackage_path]
+            files_to_upload = [
+                f
+                for f in [csv_path, json_path, datapackage_path, npz_path]
+                if os.path.exists(f)
+            ]
             uploaded_files = upload_to_storage(files_to_upload, DATA_BUCKET_NAME)
 
             # Create success result
@@ -214,13 +251,7 @@ def process_budget_data(trigger_data: dict) -> dict:
                 "trigger_type": trigger_data.get("trigger_type", "unknown"),
                 "uploaded_files": uploaded_files,
                 "bucket": DATA_BUCKET_NAME,
-                "urls": {
-                    "csv": f"gs://{DATA_BUCKET_NAME}/processed/georgian_budget.csv",
-                    "json": f"gs://{DATA_BUCKET_NAME}/processed/georgian_budget.json",
-                    "datapackage": (
-                        f"gs://{DATA_BUCKET_NAME}/processed/datapackage.json"
-                    ),
-                },
+                "urls": storage_urls(uploaded_files),
             }
 
             logger.info("🎉 Pipeline completed successfully: {}".format(result))
@@ -301,14 +332,17 @@ def manual_trigger_simple(request_data):
                 pipeline_dir, data_dir = setup_pipeline_environment(work_dir)
 
                 # Run the datapackage-pipelines exactly as in GitHub Actions
-                csv_path, json_path, datapackage_path = run_datapackage_pipeline(
-                    pipeline_dir, work_dir
-                )
+                (
+                    csv_path,
+                    json_path,
+                    datapackage_path,
+                    npz_path,
+                ) = run_datapackage_pipeline(pipeline_dir, work_dir)
 
                 # Upload to Cloud Storage
                 files_to_upload = [
                     f
-                    for f in [csv_path, json_path, datapackage_path]
+                    for f in [csv_path, json_path, datapackage_path, npz_path]
                     if os.path.exists(f)
                 ]
                 uploaded_files = upload_to_storage(files_to_upload, DATA_BUCKET_NAME)
@@ -320,15 +354,7 @@ def manual_trigger_simple(request_data):
                     "trigger_type": trigger_message.get("trigger_type", "unknown"),
                     "uploaded_files": uploaded_files,
                     "bucket": DATA_BUCKET_NAME,
-                    "urls": {
-                        "csv": f"gs://{DATA_BUCKET_NAME}/processed/georgian_budget.csv",
-                        "json": (
-                            f"gs://{DATA_BUCKET_NAME}/processed/georgian_budget.json"
-                        ),
-                        "datapackage": (
-                            f"gs://{DATA_BUCKET_NAME}/processed/datapackage.json"
-                        ),
-                    },
+                    "urls": storage_urls(uploaded_files),
                 }
 
                 logger.info(
@@ -397,14 +423,17 @@ def manual_trigger(request_data):
                 pipeline_dir, data_dir = setup_pipeline_environment(work_dir)
 
                 # Run the datapackage-pipelines exactly as in GitHub Actions
-                csv_path, json_path, datapackage_path = run_datapackage_pipeline(
-                    pipeline_dir, work_dir
-                )
+                (
+                    csv_path,
+                    json_path,
+                    datapackage_path,
+                    npz_path,
+                ) = run_datapackage_pipeline(pipeline_dir, work_dir)
 
                 # Upload to Cloud Storage
                 files_to_upload = [
                     f
-                    for f in [csv_path, json_path, datapackage_path]
+                    for f in [csv_path, json_path, datapackage_path, npz_path]
                     if os.path.exists(f)
                 ]
                 uploaded_files = upload_to_storage(files_to_upload, DATA_BUCKET_NAME)
@@ -416,15 +445,7 @@ def manual_trigger(request_data):
                     "trigger_type": trigger_message.get("trigger_type", "unknown"),
                     "uploaded_files": uploaded_files,
                     "bucket": DATA_BUCKET_NAME,
-                    "urls": {
-                        "csv": f"gs://{DATA_BUCKET_NAME}/processed/georgian_budget.csv",
-                        "json": (
-                            f"gs://{DATA_BUCKET_NAME}/processed/georgian_budget.json"
-                        ),
-                        "datapackage": (
-                            f"gs://{DATA_BUCKET_NAME}/processed/datapackage.json"
-                        ),
-                    },
+                    "urls": storage_urls(uploaded_files),
                 }
 
                 logger.info(
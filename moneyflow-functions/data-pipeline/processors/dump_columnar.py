@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+import os
+
+import numpy as np
+from datapackage_pipelines.wrapper import ingest, spew
+
+# Must match NPZ_FORMAT_VERSION / NPZ_COLUMNS in moneyflow-back/budget_store.py
+FORMAT_VERSION = 1
+
+
+def parse_year(value):
+    """Coerce a year value to int, treating missing values as 0"""
+    if value is None or value == "":
+        return 0
+    return int(float(value))
+
+
+def parse_budget(value):
+    """Coerce a budget value to float, treating missing values as 0"""
+    if value is None or value == "":
+        return 0.0
+    return float(value)
+
+
+def write_columnar(path, years, budgets, department_ids, department_names):
+    """Write the uncompressed columnar artifact the API memory-maps"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    # np.savez appends .npz, so write to a temp name and rename atomically
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(
+        tmp_path,
+        format_version=np.array(FORMAT_VERSION, dtype=np.int32),
+        year=np.array(years, dtype=np.int32),
+        budget=np.array(budgets, dtype=np.float64),
+        department_id=np.array(department_ids, dtype=np.int32),
+        department_name=np.array(department_names, dtype=np.str_),
+    )
+    os.replace(tmp_path, path)
+
+
+def process_resource(rows, path):
+    """Pass rows through unchanged while collecting them into columns"""
+    name_ids = {}
+    years = []
+    budgets = []
+    department_ids = []
+
+    for row in rows:
+        name = row.get("name")
+        name = str(name) if name else ""
+        if name not in name_ids:
+            name_ids[name] = len(name_ids)
+
+        years.append(parse_year(row.get("year")))
+        budgets.append(parse_budget(row.get("budget")))
+        department_ids.append(name_ids[name])
+
+        yield row
+
+    write_columnar(path, years, budgets, department_ids, list(name_ids))
+
+
+if __name__ == "__main__":
+    parameters, datapackage, resources = ingest()
+
+    out_path = parameters.get("out-path", "../data/processed")
+    resource_name = parameters.get("resource", "georgian_budget")
+
+    # Process each resource
+    def process_resources(resources):
+        for resource, rows in zip(datapackage["resources"], resources):
+            if resource["name"] == resource_name:
+                path = os.path.join(out_path, f"{resource_name}.npz")
+                yield process_resource(rows, path)
+            else:
+                yield rows
+
+    spew(datapackage, process_resources(resources))